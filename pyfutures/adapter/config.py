@@ -28,7 +28,12 @@ class InteractiveBrokersInstrumentProviderConfig(InstrumentProviderConfig, froze
 
 
 class InteractiveBrokersDataClientConfig(LiveDataClientConfig, frozen=True):
-    pass
+    # quote ticks are delivered one at a time unless batching is configured,
+    # then in batches of up to quote_batch_size ticks or every quote_batch_interval_ms,
+    # conflate_quotes delivers the latest quote per interval only
+    quote_batch_size: int | None = None
+    quote_batch_interval_ms: int | None = None
+    conflate_quotes: bool = False
 
 
 class InteractiveBrokersExecClientConfig(LiveExecClientConfig, frozen=True):
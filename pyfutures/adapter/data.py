@@ -3,6 +3,7 @@ import functools
 
 import pandas as pd
 from ibapi.common import BarData
+from ibapi.common import HistoricalTickBidAsk
 from nautilus_trader.cache.cache import Cache
 from nautilus_trader.common.component import LiveClock
 from nautilus_trader.common.component import MessageBus
@@ -11,16 +12,20 @@ from nautilus_trader.live.data_client import LiveMarketDataClient
 from nautilus_trader.model.data import Bar
 from nautilus_trader.model.data import BarType
 from nautilus_trader.model.identifiers import ClientId
+from nautilus_trader.model.identifiers import InstrumentId
 from nautilus_trader.model.instruments.base import Instrument
 
 from pyfutures.adapter import IB_VENUE
 from pyfutures.adapter.config import InteractiveBrokersDataClientConfig
 from pyfutures.adapter.parsing import AdapterParser
 from pyfutures.adapter.providers import InteractiveBrokersInstrumentProvider
+from pyfutures.client.batching import QuoteTickBatch
 from pyfutures.client.client import InteractiveBrokersClient
 from pyfutures.client.enums import BarSize
 from pyfutures.client.enums import WhatToShow
 from pyfutures.client.historic import InteractiveBrokersHistoricClient
+from pyfutures.client.objects import ClientSubscription
+from pyfutures.client.pool import InteractiveBrokersClientPool
 
 
 class InteractiveBrokersDataClient(LiveMarketDataClient):
@@ -31,7 +36,7 @@ class InteractiveBrokersDataClient(LiveMarketDataClient):
     def __init__(
         self,
         loop: asyncio.AbstractEventLoop,
-        client: InteractiveBrokersClient,
+        client: InteractiveBrokersClient | InteractiveBrokersClientPool,
         msgbus: MessageBus,
         cache: Cache,
         clock: LiveClock,
@@ -52,6 +57,8 @@ class InteractiveBrokersDataClient(LiveMarketDataClient):
             # ),
         )
         self._client = client
+        self._config = config
+        self._quote_subscriptions: dict[InstrumentId, ClientSubscription] = {}
 
         self._historic = InteractiveBrokersHistoricClient(
             client=client,
@@ -65,7 +72,7 @@ class InteractiveBrokersDataClient(LiveMarketDataClient):
         return self._instrument_provider  # type: ignore
 
     @property
-    def client(self) -> InteractiveBrokersClient:
+    def client(self) -> InteractiveBrokersClient | InteractiveBrokersClientPool:
         return self._client
 
     @property
@@ -105,6 +112,56 @@ class InteractiveBrokersDataClient(LiveMarketDataClient):
         )
         self._handle_data(nautilus_bar)
 
+    async def _subscribe_quote_ticks(self, instrument_id: InstrumentId) -> None:
+        if not (instrument := self._cache.instrument(instrument_id)):
+            self._log.error(
+                f"Cannot subscribe to quote ticks for {instrument_id}, Instrument not found."
+            )
+            return
+
+        if (
+            self._config.quote_batch_size is None
+            and self._config.quote_batch_interval_ms is None
+            and not self._config.conflate_quotes
+        ):
+            callback = functools.partial(
+                self._quote_tick_callback, instrument=instrument
+            )
+        else:
+            callback = functools.partial(
+                self._quote_tick_batch_callback, instrument=instrument
+            )
+
+        self._quote_subscriptions[instrument_id] = self._client.subscribe_quote_ticks(
+            contract=self._parser.instrument_id_to_contract(instrument_id),
+            callback=callback,
+            batch_size=self._config.quote_batch_size,
+            batch_interval_ms=self._config.quote_batch_interval_ms,
+            conflate=self._config.conflate_quotes,
+        )
+
+    async def _unsubscribe_quote_ticks(self, instrument_id: InstrumentId) -> None:
+        subscription = self._quote_subscriptions.pop(instrument_id, None)
+        if subscription is not None:
+            subscription.cancel()
+
+    def _quote_tick_callback(
+        self, tick: HistoricalTickBidAsk, instrument: Instrument
+    ) -> None:
+        self._handle_data(
+            self._parser.historical_tick_to_nautilus_quote_tick(
+                instrument=instrument, tick=tick
+            )
+        )
+
+    def _quote_tick_batch_callback(
+        self, batch: QuoteTickBatch, instrument: Instrument
+    ) -> None:
+        for tick in self._parser.quote_tick_batch_to_nautilus_quote_ticks(
+            batch=batch, instrument=instrument
+        ):
+            self._handle_data(tick)
+
     async def _request_bars(
         self,
         bar_type: BarType,
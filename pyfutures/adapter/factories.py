@@ -14,10 +14,10 @@ from pyfutures.adapter.config import InteractiveBrokersExecClientConfig
 from pyfutures.adapter.data import InteractiveBrokersDataClient
 from pyfutures.adapter.execution import InteractiveBrokersExecClient
 from pyfutures.adapter.providers import InteractiveBrokersInstrumentProvider
-from pyfutures.client.client import InteractiveBrokersClient
+from pyfutures.client.pool import InteractiveBrokersClientPool
 
 
-CLIENT = None
+POOL = None
 PROVIDER = None
 DATA_CLIENT = None
 EXEC_CLIENT = None
@@ -30,15 +30,19 @@ def get_provider_cached(client, config):
     return PROVIDER
 
 
-def get_client_cached(loop):
-    global CLIENT
-    if CLIENT is None:
-        CLIENT = InteractiveBrokersClient(
+def get_pool_cached(loop):
+    """
+    order traffic uses a dedicated connection so data requests never delay an order ack
+    """
+    global POOL
+    if POOL is None:
+        POOL = InteractiveBrokersClientPool(
             loop=loop,
             host="127.0.0.1",
             port=4002,
+            client_ids=(1, 2, 3),
         )
-    return CLIENT
+    return POOL
 
 
 # fmt: on
@@ -56,7 +60,7 @@ class InteractiveBrokersLiveDataClientFactory(LiveDataClientFactory):
         cache: Cache,
         clock: LiveClock,
     ) -> InteractiveBrokersDataClient:
-        client = get_client_cached(loop)
+        client = get_pool_cached(loop)
         provider = get_provider_cached(client, config.instrument_provider)
 
         global DATA_CLIENT
@@ -87,8 +91,9 @@ class InteractiveBrokersLiveExecClientFactory(LiveExecClientFactory):
         cache: Cache,
         clock: LiveClock,
     ) -> InteractiveBrokersExecClient:
-        client = get_client_cached(loop)
-        provider = get_provider_cached(client, config.instrument_provider)
+        pool = get_pool_cached(loop)
+        client = pool.order_client
+        provider = get_provider_cached(pool, config.instrument_provider)
 
         global EXEC_CLIENT
         if EXEC_CLIENT is None:
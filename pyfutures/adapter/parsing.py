@@ -1,6 +1,7 @@
 import time
 from decimal import Decimal
 
+import numpy as np
 import pandas as pd
 from ibapi.common import BarData
 from ibapi.common import HistoricalTickBidAsk
@@ -31,6 +32,7 @@ from nautilus_trader.model.objects import Currency
 from nautilus_trader.model.objects import Price
 from nautilus_trader.model.objects import Quantity
 
+from pyfutures.client.batching import QuoteTickBatch
 from pyfutures.client.parsing import ClientParser
 from pyfutures.continuous.contract_month import ContractMonth
 
@@ -113,6 +115,31 @@ class AdapterParser:
             ts_init=dt_to_unix_nanos(tick.time),
         )
 
+    @staticmethod
+    def quote_tick_batch_to_nautilus_quote_ticks(
+        instrument: Instrument,
+        batch: QuoteTickBatch,
+    ) -> list[QuoteTick]:
+        ts = batch.time * 1_000_000_000
+        return [
+            QuoteTick(
+                instrument_id=instrument.id,
+                bid_price=instrument.make_price(bid_price),
+                ask_price=instrument.make_price(ask_price),
+                bid_size=instrument.make_qty(0 if np.isnan(bid_size) else bid_size),
+                ask_size=instrument.make_qty(0 if np.isnan(ask_size) else ask_size),
+                ts_event=ts_event,
+                ts_init=ts_event,
+            )
+            for bid_price, ask_price, bid_size, ask_size, ts_event in zip(
+                batch.bid_price.tolist(),
+                batch.ask_price.tolist(),
+                batch.bid_size.tolist(),
+                batch.ask_size.tolist(),
+                ts.tolist(),
+            )
+        ]
+
     @staticmethod
     def bar_data_to_nautilus_bar(
         bar_type: BarType,
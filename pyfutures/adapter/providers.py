@@ -10,6 +10,7 @@ from nautilus_trader.model.instruments.futures_contract import FuturesContract
 from pyfutures.adapter.config import InteractiveBrokersInstrumentProviderConfig
 from pyfutures.adapter.parsing import AdapterParser
 from pyfutures.client.client import InteractiveBrokersClient
+from pyfutures.client.pool import InteractiveBrokersClientPool
 from pyfutures.continuous.contract_month import ContractMonth
 from pyfutures.continuous.cycle import RollCycle
 
@@ -21,7 +22,7 @@ class InteractiveBrokersInstrumentProvider(InstrumentProvider):
 
     def __init__(
         self,
-        client: InteractiveBrokersClient,
+        client: InteractiveBrokersClient | InteractiveBrokersClientPool,
         config: InteractiveBrokersInstrumentProviderConfig = None,
     ):
         config = config or InteractiveBrokersInstrumentProviderConfig()
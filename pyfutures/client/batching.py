@@ -0,0 +1,118 @@
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+from decimal import Decimal
+
+import numpy as np
+from ibapi.common import UNSET_DECIMAL
+
+
+@dataclass
+class QuoteTickBatch:
+    """
+    Tick-by-tick BidAsk quotes of one subscription as columns.
+    The arrays are views onto buffers reused by the next batch, copy them to keep them
+    after the callback has returned.
+    """
+
+    time: np.ndarray  # int64 epoch seconds
+    bid_price: np.ndarray  # float64
+    ask_price: np.ndarray  # float64
+    bid_size: np.ndarray  # float64, nan when unset
+    ask_size: np.ndarray  # float64, nan when unset
+    mask: np.ndarray  # int64 tickAttribBidAsk bits
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+
+class QuoteTickBatcher:
+    """
+    Collects the quote ticks of a subscription into preallocated arrays
+    and passes them to the callback as a QuoteTickBatch.
+
+    batch mode: flushed every max_ticks ticks or interval_seconds after the first tick of a batch
+    conflate mode: only the latest quote is kept and flushed every interval_seconds
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[QuoteTickBatch], None],
+        max_ticks: int = 256,
+        interval_seconds: float = 0.1,
+        conflate: bool = False,
+        loop: asyncio.AbstractEventLoop | None = None,
+    ):
+        assert max_ticks > 0
+        self._callback = callback
+        self._capacity = 1 if conflate else max_ticks
+        self._interval_seconds = interval_seconds
+        self._conflate = conflate
+        self._loop = loop or asyncio.get_event_loop()
+
+        self._time = np.empty(self._capacity, dtype=np.int64)
+        self._bid_price = np.empty(self._capacity, dtype=np.float64)
+        self._ask_price = np.empty(self._capacity, dtype=np.float64)
+        self._bid_size = np.empty(self._capacity, dtype=np.float64)
+        self._ask_size = np.empty(self._capacity, dtype=np.float64)
+        self._mask = np.empty(self._capacity, dtype=np.int64)
+
+        self._count = 0
+        self._timer: asyncio.TimerHandle | None = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __call__(self, tick: tuple) -> None:
+        """
+        tick = (time, bidPrice, askPrice, bidSize, askSize, mask)
+        """
+        i = 0 if self._conflate else self._count
+        (
+            self._time[i],
+            self._bid_price[i],
+            self._ask_price[i],
+            bid_size,
+            ask_size,
+            self._mask[i],
+        ) = tick
+        self._bid_size[i] = _size_to_float(bid_size)
+        self._ask_size[i] = _size_to_float(ask_size)
+        self._count = i + 1
+
+        if self._count == self._capacity and not self._conflate:
+            self.flush()
+        elif self._timer is None:
+            self._timer = self._loop.call_later(self._interval_seconds, self._on_timer)
+
+    def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        count = self._count
+        if count == 0:
+            return
+        self._count = 0
+
+        self._callback(
+            QuoteTickBatch(
+                time=self._time[:count],
+                bid_price=self._bid_price[:count],
+                ask_price=self._ask_price[:count],
+                bid_size=self._bid_size[:count],
+                ask_size=self._ask_size[:count],
+                mask=self._mask[:count],
+            )
+        )
+
+    def close(self) -> None:
+        self.flush()
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self.flush()
+
+
+def _size_to_float(size: Decimal) -> float:
+    return np.nan if size == UNSET_DECIMAL else float(size)
@@ -0,0 +1,226 @@
+import asyncio
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from pyfutures.client.cache import BaseCache
+from pyfutures.client.cache import RequestsCache
+from pyfutures.client.checkpoint import TaskCheckpoint
+from pyfutures.client.checkpoint import write_part
+from pyfutures.client.enums import BarSize
+from pyfutures.client.enums import TaskStatus
+from pyfutures.client.enums import WhatToShow
+from pyfutures.client.historic import InteractiveBrokersHistoricClient
+from pyfutures.client.objects import BulkProgress
+from pyfutures.client.objects import BulkTask
+from pyfutures.client.objects import SeamStats
+from pyfutures.logger import LoggerAdapter
+
+
+class BulkDownloader:
+    """
+    Downloads the bars of a universe through one InteractiveBrokersHistoricClient,
+    every request shares its event loop and PacingScheduler.
+
+    Each row, bar size and what to show over the range is a task in the TaskCheckpoint path/tasks.sqlite,
+    a finished task is written to path/<uname>/<bar_size>-<what_to_show>-<start>_<end>.parquet.
+    A download run again resumes from the tasks not finished, the tasks interrupted while running are requeued.
+    """
+
+    def __init__(
+        self,
+        historic: InteractiveBrokersHistoricClient,
+        path: Path,
+        concurrency: int = 4,
+        max_attempts: int = 3,
+        cache: BaseCache | Path | None = None,
+    ):
+        """
+        concurrency: number of tasks downloaded at the same time, subject to the pacing of the historic client
+        max_attempts: a task that raises, or has windows that timed out, is retried until it has been
+            attempted max_attempts times, then it is FAILED
+        cache: requests cache passed to request_bars
+        """
+        self.path = Path(path)
+        self._historic = historic
+        self._concurrency = concurrency
+        self._max_attempts = max_attempts
+        self._cache = cache
+        self._checkpoint = TaskCheckpoint(self.path / "tasks.sqlite")
+        self._log = LoggerAdapter.from_name(name=type(self).__name__)
+
+        self._rows: dict[str, object] = {}
+        self._started: float | None = None
+        self._finished_run = 0
+        self._rows_run = 0
+
+    def add(
+        self,
+        rows: list,
+        start_time: pd.Timestamp,
+        end_time: pd.Timestamp,
+        bar_sizes: list[BarSize],
+        what_to_show: list[WhatToShow] | None = None,
+        priority: int = 0,
+    ) -> int:
+        """
+        rows: universe rows with a uname, contract_cont and market_schedule, see IBTestProviderStubs.universe_rows
+        what_to_show: defaults to BID_ASK, which is written as BID, ASK and MIDPOINT parts
+        Only the tasks of the rows added are downloaded by run(), tasks already in the checkpoint keep their status.
+        Returns the number of new tasks.
+        """
+        added = 0
+        for row in rows:
+            self._rows[row.uname] = row
+            for bar_size in bar_sizes:
+                for _what_to_show in what_to_show or [WhatToShow.BID_ASK]:
+                    task = BulkTask(
+                        key=self._task_key(
+                            row.uname, bar_size, _what_to_show, start_time, end_time
+                        ),
+                        uname=row.uname,
+                        bar_size=bar_size,
+                        what_to_show=_what_to_show,
+                        start_time=start_time,
+                        end_time=end_time,
+                        priority=priority,
+                    )
+                    added += self._checkpoint.add(task)
+
+        self._log.info(f"Added {added} tasks, {len(self._checkpoint)} in total")
+        return added
+
+    def reprioritise(
+        self,
+        priority: int,
+        uname: str | None = None,
+        bar_size: BarSize | None = None,
+        what_to_show: WhatToShow | None = None,
+    ) -> int:
+        """
+        Sets the priority of the pending tasks matching every filter passed, it applies to a running download
+        Returns the number of tasks.
+        """
+        return self._checkpoint.reprioritise(
+            priority=priority,
+            uname=uname,
+            bar_size=bar_size,
+            what_to_show=what_to_show,
+        )
+
+    def progress(self) -> BulkProgress:
+        counts = self._checkpoint.counts()
+        return BulkProgress(
+            total=sum(counts.values()),
+            finished=counts[TaskStatus.FINISHED],
+            failed=counts[TaskStatus.FAILED],
+            finished_run=self._finished_run,
+            rows=self._rows_run,
+            elapsed_seconds=0.0
+            if self._started is None
+            else time.perf_counter() - self._started,
+        )
+
+    def failed(self) -> dict[str, str]:
+        return self._checkpoint.failed()
+
+    async def run(self, retry_failed: bool = False) -> BulkProgress:
+        """
+        Downloads the pending tasks highest priority first
+        retry_failed: the FAILED tasks are PENDING again
+        """
+        interrupted = self._checkpoint.requeue(TaskStatus.RUNNING)
+        if interrupted > 0:
+            self._log.info(f"Resuming {interrupted} interrupted tasks")
+
+        if retry_failed:
+            self._checkpoint.requeue(TaskStatus.FAILED)
+
+        self._started = time.perf_counter()
+        self._finished_run = 0
+        self._rows_run = 0
+
+        await asyncio.gather(*(self._worker() for _ in range(self._concurrency)))
+
+        progress = self.progress()
+        self._log.info(f"Finished run: {progress}")
+        return progress
+
+    def close(self) -> None:
+        if isinstance(self._cache, RequestsCache):
+            self._cache.flush()
+        self._checkpoint.close()
+
+    async def _worker(self) -> None:
+        while True:
+            task = self._checkpoint.take_next(unames=list(self._rows))
+            if task is None:
+                return  # no pending tasks
+
+            try:
+                rows = await self._download(task)
+            except Exception as e:
+                if task.attempts < self._max_attempts:
+                    status = TaskStatus.PENDING
+                else:
+                    status = TaskStatus.FAILED
+                self._checkpoint.set_status(task.key, status, error=repr(e))
+                self._log.error(
+                    f"{task.key} | attempt {task.attempts}/{self._max_attempts} failed: {e!r}"
+                )
+                continue
+
+            self._checkpoint.set_status(task.key, TaskStatus.FINISHED, rows=rows)
+            self._finished_run += 1
+            self._rows_run += rows
+            self._log.info(f"{task.key} | {rows} rows | {self.progress()}")
+
+    async def _download(self, task: BulkTask) -> int:
+        row = self._rows[task.uname]
+        split_bid_ask = task.what_to_show == WhatToShow.BID_ASK
+        stats = SeamStats()
+
+        results = await self._historic.request_bars(
+            contract=row.contract_cont,
+            bar_size=task.bar_size,
+            what_to_show=task.what_to_show,
+            start_time=task.start_time,
+            end_time=task.end_time,
+            as_dataframe=True,
+            cache=self._cache,
+            schedule=row.market_schedule,
+            split_bid_ask=split_bid_ask,
+            stats=stats,
+        )
+        if len(stats.failed) > 0:
+            # nothing is written, the windows downloaded are cached for the next attempt
+            raise asyncio.TimeoutError(
+                f"{len(stats.failed)} windows timed out, first {stats.failed[0][0]} -> {stats.failed[0][1]}"
+            )
+
+        if not split_bid_ask:
+            results = {task.what_to_show: results}
+
+        for what_to_show, df in results.items():
+            write_part(path=self._part_path(task, what_to_show), df=df)
+
+        return sum(len(df) for df in results.values())
+
+    def _part_path(self, task: BulkTask, what_to_show: WhatToShow) -> Path:
+        bar_size = str(task.bar_size).replace(" ", "-")
+        return (
+            self.path
+            / task.uname
+            / f"{bar_size}-{what_to_show.name}-{task.start_time.value}_{task.end_time.value}.parquet"
+        )
+
+    @staticmethod
+    def _task_key(
+        uname: str,
+        bar_size: BarSize,
+        what_to_show: WhatToShow,
+        start_time: pd.Timestamp,
+        end_time: pd.Timestamp,
+    ) -> str:
+        return f"{uname}={bar_size.name}={what_to_show.name}={start_time.value}_{end_time.value}"
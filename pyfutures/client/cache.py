@@ -1,16 +1,33 @@
+import asyncio
+import bisect
+import functools
+import itertools
 import pickle
+import pydoc
+import sqlite3
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable
 from collections.abc import Callable
+from collections.abc import Hashable
 from pathlib import Path
 from typing import Any
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from ibapi.common import BarData
 from ibapi.contract import Contract as IBContract
 from ibapi.contract import ContractDetails as IBContractDetails
 
+from pyfutures.client.columns import BarColumns
 from pyfutures.client.enums import BarSize
 from pyfutures.client.enums import Duration
 from pyfutures.client.enums import WhatToShow
 from pyfutures.client.objects import ClientException
+from pyfutures.client.objects import MetadataEntry
+from pyfutures.client.objects import NegativeCachePolicy
 from pyfutures.client.parsing import ClientParser
 from pyfutures.logger import LoggerAdapter
 
@@ -25,6 +42,9 @@ class BaseCache:
     def __len__(self) -> int:
         return len(list(self.path.rglob("*.pkl")))
 
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
     @staticmethod
     def _read_pickle(path: Path) -> Exception:
         with open(path, "rb") as f:
@@ -33,6 +53,19 @@ class BaseCache:
                 cached = ClientException.from_dict(cached)
         return cached
 
+    @staticmethod
+    def _error_to_bytes(value: Exception) -> bytes:
+        if isinstance(value, ClientException):
+            value = value.to_dict()
+        return pickle.dumps(value)
+
+    @staticmethod
+    def _error_from_bytes(data: bytes) -> Exception:
+        cached = pickle.loads(data)
+        if isinstance(cached, dict):
+            cached = ClientException.from_dict(cached)
+        return cached
+
     @staticmethod
     def _sanitize_filename(filename):
         """
@@ -58,6 +91,37 @@ class RequestsCache(BaseCache):
         self._parser = ClientParser()
         self._log = LoggerAdapter.from_name(name=type(self).__name__)
 
+    def __contains__(self, key: str) -> bool:
+        return self._parquet_path(key).exists() or self._pickle_path(key).exists()
+
+    def flush(self) -> None:
+        """
+        Writes any buffered entries, every set is written immediately here
+        """
+
+    def get_table(self, key: str) -> pa.Table | Exception | None:
+        """
+        Returns the cached bars as the stored Arrow table, the file is memory-mapped
+        """
+        parquet_path = self._parquet_path(key)
+        if parquet_path.exists():
+            return pq.read_table(parquet_path, memory_map=True)
+
+        pickle_path = self._pickle_path(key)
+        if pickle_path.exists():
+            return self._read_pickle(pickle_path)
+
+        return None
+
+    def get_columns(self, key: str) -> BarColumns | Exception | None:
+        """
+        Returns the cached bars as BarColumns without building a BarData per row
+        """
+        cached = self.get_table(key)
+        if isinstance(cached, pa.Table):
+            return BarColumns.from_arrow(cached)
+        return cached
+
     def get(
         self,
         key: str,
@@ -69,8 +133,14 @@ class RequestsCache(BaseCache):
         elif not pickle_path.exists() and not parquet_path.exists():
             return None
         elif parquet_path.exists():
-            cached = pd.read_parquet(parquet_path)
-            cached = self._parser.bar_data_from_dataframe(cached)
+            table = pq.read_table(parquet_path)
+            if "volume" in table.column_names and pa.types.is_floating(
+                table.schema.field("volume").type
+            ):
+                # written from BarColumns, volume and wap are converted back to Decimal
+                cached = BarColumns.from_arrow(table).to_bars()
+            else:
+                cached = self._parser.bar_data_from_dataframe(table.to_pandas())
         elif pickle_path.exists():
             cached = self._read_pickle(pickle_path)
         return cached
@@ -78,14 +148,17 @@ class RequestsCache(BaseCache):
     def set(
         self,
         key: str,
-        value: list[Any] | Exception,
+        value: list[Any] | BarColumns | Exception,
     ) -> None:
-        if not isinstance(value, (list, Exception)):
+        if not isinstance(value, (list, BarColumns, Exception)):
             raise RuntimeError(f"Unsupported type {type(value).__name__}")
 
         self.path.mkdir(parents=True, exist_ok=True)
 
-        if isinstance(value, list):
+        if isinstance(value, BarColumns):
+            pq.write_table(value.to_arrow(), self._parquet_path(key))
+            return
+        elif isinstance(value, list):
             df = self._parser.bar_data_to_dataframe(value)
             df.to_parquet(self._parquet_path(key), index=False)
             return
@@ -124,9 +197,9 @@ class RequestsCache(BaseCache):
                 )
 
             part: str = parsing_func(x)
-            assert isinstance(
-                part, str
-            ), f"Check parsing func for type {type(x).__name__} return type str"
+            assert isinstance(part, str), (
+                f"Check parsing func for type {type(x).__name__} return type str"
+            )
             parts.append(part)
 
         key = "=".join(parts)
@@ -134,6 +207,471 @@ class RequestsCache(BaseCache):
         return cls._sanitize_filename(key)
 
 
+class IndexedRequestsCache(RequestsCache):
+    """
+    RequestsCache backend for caches with many entries.
+
+    A SQLite index holds the key, status, row count and time range of every entry,
+    lookups, counts and error purges are index queries only.
+    Bars are buffered and packed into Parquet part files partitioned by contract,
+    one row group per key, so a get reads a single row group of one file.
+    Errors are small and stored in the index.
+    Replaced entries leave their row groups behind in the part files until compact().
+    Buffered bars are written every flush_rows rows or flush_seconds after the oldest buffered entry,
+    InteractiveBrokersHistoricClient.request_bars flushes the cache passed once a download finishes.
+    """
+
+    _BARS = 0
+    _ERROR = 1
+
+    _SCHEMA = pa.schema(
+        [
+            ("timestamp", pa.timestamp("ns", tz="UTC")),
+            ("date", pa.string()),
+            ("open", pa.float64()),
+            ("high", pa.float64()),
+            ("low", pa.float64()),
+            ("close", pa.float64()),
+            ("volume", pa.float64()),
+            ("wap", pa.float64()),
+            ("barCount", pa.int64()),
+        ]
+    )
+
+    def __init__(
+        self,
+        path: Path,
+        flush_rows: int = 100_000,
+        flush_seconds: float = 60,
+        clock: Callable = time.monotonic,
+    ):
+        super().__init__(path=path)
+        self._flush_rows = flush_rows
+        self._flush_seconds = flush_seconds
+        self._clock = clock
+        self._pending: dict[str, pa.Table] = {}
+        self._pending_rows = 0
+        self._pending_since: float | None = None
+        self._part_file = functools.lru_cache(maxsize=64)(self._open_part)
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path / "index.sqlite")
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS parts (id INTEGER PRIMARY KEY, path TEXT NOT NULL)"
+            )
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    status INTEGER NOT NULL,
+                    rows INTEGER NOT NULL,
+                    start_ns INTEGER,
+                    end_ns INTEGER,
+                    part_id INTEGER,
+                    row_group INTEGER,
+                    error_type TEXT,
+                    error BLOB
+                )
+                """
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS entries_error_type ON entries (error_type)"
+            )
+
+    def __len__(self) -> int:
+        (count,) = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()
+        return count + sum(not self._is_indexed(key) for key in self._pending)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._pending or self._is_indexed(key)
+
+    def get_table(self, key: str) -> pa.Table | Exception | None:
+        table = self._pending.get(key)
+        if table is not None:
+            return table
+
+        row = self._db.execute(
+            "SELECT status, rows, part_id, row_group, error FROM entries WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        status, rows, part_id, row_group, error = row
+        if status == self._ERROR:
+            return self._error_from_bytes(error)
+        elif rows == 0:
+            return self._SCHEMA.empty_table()
+
+        return self._part_file(part_id).read_row_group(row_group)
+
+    def get(
+        self,
+        key: str,
+    ) -> list[Any] | Exception | None:
+        cached = self.get_columns(key)
+        if isinstance(cached, BarColumns):
+            return cached.to_bars()
+        return cached
+
+    def set(
+        self,
+        key: str,
+        value: list[Any] | BarColumns | Exception,
+    ) -> None:
+        if not isinstance(value, (list, BarColumns, Exception)):
+            raise RuntimeError(f"Unsupported type {type(value).__name__}")
+
+        if isinstance(value, Exception):
+            self._discard_pending(key)
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries (key, status, rows, error_type, error) VALUES (?, ?, 0, ?, ?)",
+                    (
+                        key,
+                        self._ERROR,
+                        _qualified_name(type(value)),
+                        self._error_to_bytes(value),
+                    ),
+                )
+            return
+
+        if len(value) == 0:
+            self._discard_pending(key)
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries (key, status, rows) VALUES (?, ?, 0)",
+                    (key, self._BARS),
+                )
+            return
+
+        if isinstance(value, list):
+            value = BarColumns.from_bars(value)
+        table = value.to_arrow().cast(self._SCHEMA)
+        self._pending_rows += len(table) - len(self._pending.get(key, ()))
+        self._pending[key] = table
+        if self._pending_since is None:
+            self._pending_since = self._clock()
+
+        if (
+            self._pending_rows >= self._flush_rows
+            or self._clock() - self._pending_since >= self._flush_seconds
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes the buffered bars to one part file per partition and indexes them.
+        """
+        if len(self._pending) == 0:
+            return
+
+        partitions: dict[str, list[str]] = {}
+        for key in self._pending:
+            partitions.setdefault(self._partition(key), []).append(key)
+
+        with self._db:
+            for partition, keys in partitions.items():
+                part_id, path = self._create_part(partition)
+                with pq.ParquetWriter(path, schema=self._SCHEMA) as writer:
+                    for row_group, key in enumerate(keys):
+                        table = self._pending[key]
+                        writer.write_table(table, row_group_size=len(table))
+                        timestamps = table.column("timestamp")
+                        self._db.execute(
+                            """
+                            INSERT OR REPLACE INTO entries
+                            (key, status, rows, start_ns, end_ns, part_id, row_group)
+                            VALUES (?, ?, ?, ?, ?, ?, ?)
+                            """,
+                            (
+                                key,
+                                self._BARS,
+                                len(table),
+                                pc.min(timestamps).value,
+                                pc.max(timestamps).value,
+                                part_id,
+                                row_group,
+                            ),
+                        )
+
+        self._log.debug(
+            f"Flushed {len(self._pending)} entries, {self._pending_rows} rows"
+        )
+        self._pending.clear()
+        self._pending_rows = 0
+        self._pending_since = None
+
+    def compact(self) -> None:
+        """
+        Rewrites the part files holding row groups of replaced or removed entries
+        with only the row groups the index still references, and deletes unreferenced part files.
+        """
+        self.flush()
+
+        referenced: dict[int, list[tuple[str, int]]] = {}
+        for key, part_id, row_group in self._db.execute(
+            "SELECT key, part_id, row_group FROM entries WHERE part_id IS NOT NULL ORDER BY row_group"
+        ):
+            referenced.setdefault(part_id, []).append((key, row_group))
+
+        parts = self._db.execute("SELECT id, path FROM parts").fetchall()
+        self._part_file.cache_clear()
+
+        for part_id, relative in parts:
+            old_path = self.path / relative
+            entries = referenced.get(part_id, [])
+            file = pq.ParquetFile(old_path)
+            if len(entries) == file.num_row_groups:
+                continue
+
+            with self._db:
+                if len(entries) > 0:
+                    new_part_id, path = self._create_part(Path(relative).parent.name)
+                    with pq.ParquetWriter(path, schema=self._SCHEMA) as writer:
+                        for row_group, (key, old_row_group) in enumerate(entries):
+                            table = file.read_row_group(old_row_group)
+                            writer.write_table(table, row_group_size=len(table))
+                            self._db.execute(
+                                "UPDATE entries SET part_id = ?, row_group = ? WHERE key = ?",
+                                (new_part_id, row_group, key),
+                            )
+                self._db.execute("DELETE FROM parts WHERE id = ?", (part_id,))
+            old_path.unlink()
+
+            self._log.debug(f"Compacted {relative}, kept {len(entries)} row groups")
+
+    def close(self) -> None:
+        self.flush()
+        self._db.close()
+
+    def time_range(self, key: str) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+        """
+        Returns the first and last bar timestamp of a cached entry from the index.
+        """
+        if key in self._pending:
+            self.flush()
+        row = self._db.execute(
+            "SELECT start_ns, end_ns FROM entries WHERE key = ? AND rows > 0", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return tuple(pd.Timestamp(x, tz="UTC") for x in row)
+
+    def purge_errors(self, cls: type | tuple[type] = Exception) -> None:
+        names = [
+            name
+            for (name,) in self._db.execute(
+                "SELECT DISTINCT error_type FROM entries WHERE error_type IS NOT NULL"
+            )
+            if isinstance(error_type := pydoc.locate(name), type)
+            and issubclass(error_type, cls)
+        ]
+        with self._db:
+            self._db.executemany(
+                "DELETE FROM entries WHERE error_type = ?", [(n,) for n in names]
+            )
+
+    def import_cache(self, cache: RequestsCache) -> None:
+        """
+        Copies the entries of a file per key RequestsCache into this cache.
+        """
+        for path in itertools.chain(
+            cache.path.glob("*.parquet"), cache.path.glob("*.pkl")
+        ):
+            self.set(path.stem, cache.get(path.stem))
+        self.flush()
+
+    def _is_indexed(self, key: str) -> bool:
+        row = self._db.execute("SELECT 1 FROM entries WHERE key = ?", (key,))
+        return row.fetchone() is not None
+
+    def _discard_pending(self, key: str) -> None:
+        table = self._pending.pop(key, None)
+        if table is not None:
+            self._pending_rows -= len(table)
+        if len(self._pending) == 0:
+            self._pending_since = None
+
+    def _create_part(self, partition: str) -> tuple[int, Path]:
+        part_id = self._db.execute("INSERT INTO parts (path) VALUES ('')").lastrowid
+        relative = Path("parts") / partition / f"part-{part_id:08d}.parquet"
+        self._db.execute(
+            "UPDATE parts SET path = ? WHERE id = ?", (str(relative), part_id)
+        )
+        path = self.path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return part_id, path
+
+    def _open_part(self, part_id: int) -> pq.ParquetFile:
+        (path,) = self._db.execute(
+            "SELECT path FROM parts WHERE id = ?", (part_id,)
+        ).fetchone()
+        return pq.ParquetFile(self.path / path)
+
+    @staticmethod
+    def _partition(key: str) -> str:
+        return key.split("=", 1)[0]
+
+
+def _qualified_name(cls: type) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+class BarRangeCache(BaseCache):
+    """
+    Bars cached by time range per (contract, bar_size, what_to_show) series.
+
+    Each series is a directory of Parquet chunks named by the [start, end) interval they cover,
+    an interval is covered once downloaded even if it holds no bars.
+    Only chunks that overlap are merged when a new interval is added, an interval that
+    touches a chunk is written as a chunk of its own, so the covered intervals of a series
+    stay sorted and disjoint and adjacent intervals are read as contiguous.
+    Any [start, end) can be read from the chunks, gaps() returns the ranges still to download.
+    """
+
+    def __init__(self, path: Path):
+        super().__init__(path=path)
+        self._parser = ClientParser()
+        self._intervals: dict[str, list[tuple[pd.Timestamp, pd.Timestamp]]] = {}
+        self._log = LoggerAdapter.from_name(name=type(self).__name__)
+
+    def __len__(self) -> int:
+        return sum(1 for p in self.path.glob("*") if p.is_dir())
+
+    def intervals(self, key: str) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Returns the covered intervals of the series sorted by start time.
+        """
+        intervals = self._intervals.get(key)
+        if intervals is None:
+            intervals = self._intervals[key] = sorted(
+                self._interval_from_path(p)
+                for p in self._series_path(key).glob("*.parquet")
+            )
+        return intervals
+
+    def gaps(
+        self,
+        key: str,
+        start_time: pd.Timestamp,
+        end_time: pd.Timestamp,
+    ) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Returns the parts of [start_time, end_time) not covered yet, oldest first.
+        """
+        gaps = []
+        for start, end in self.intervals(key):
+            if end <= start_time:
+                continue
+            if start >= end_time:
+                break
+            if start > start_time:
+                gaps.append((start_time, start))
+            start_time = max(start_time, end)
+
+        if start_time < end_time:
+            gaps.append((start_time, end_time))
+
+        return gaps
+
+    def get(
+        self,
+        key: str,
+        start_time: pd.Timestamp,
+        end_time: pd.Timestamp,
+    ) -> list[BarData]:
+        """
+        Returns the cached bars in [start_time, end_time).
+        """
+        frames = [
+            pd.read_parquet(self._chunk_path(key, start, end))
+            for start, end in self.intervals(key)
+            if start < end_time and end > start_time
+        ]
+        frames = [df for df in frames if len(df) > 0]
+        if len(frames) == 0:
+            return []
+
+        df = pd.concat(frames, ignore_index=True)
+        df = df[(df.timestamp >= start_time) & (df.timestamp < end_time)]
+        return self._parser.bar_data_from_dataframe(df)
+
+    def add(
+        self,
+        key: str,
+        start_time: pd.Timestamp,
+        end_time: pd.Timestamp,
+        bars: list[BarData],
+    ) -> None:
+        """
+        Stores the bars downloaded for [start_time, end_time) and merges the chunks it
+        overlaps, existing bars are kept where timestamps are duplicated.
+        """
+        assert start_time < end_time
+
+        intervals = self.intervals(key)
+        merged = [
+            (start, end)
+            for start, end in intervals
+            if start < end_time and end > start_time
+        ]
+
+        frames = [pd.read_parquet(self._chunk_path(key, *i)) for i in merged]
+        df = self._parser.bar_data_to_dataframe(bars)
+        if len(df) > 0:
+            frames.append(df[(df.timestamp >= start_time) & (df.timestamp < end_time)])
+
+        frames = [df for df in frames if len(df) > 0]
+        if len(frames) == 0:
+            df = pd.DataFrame(columns=["timestamp"])
+        else:
+            df = (
+                pd.concat(frames, ignore_index=True)
+                .drop_duplicates(subset="timestamp", keep="first")
+                .sort_values("timestamp", ignore_index=True)
+            )
+
+        start_time = min([start_time] + [start for start, _ in merged])
+        end_time = max([end_time] + [end for _, end in merged])
+
+        # the merged chunk replaces the old chunks only once it is written, a crash leaves
+        # either the old chunks or a gap that is downloaded again, never overlapping chunks
+        path = self._chunk_path(key, start_time, end_time)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(".tmp")
+        df.to_parquet(temp_path, index=False)
+
+        for interval in merged:
+            intervals.remove(interval)
+            self._chunk_path(key, *interval).unlink()
+
+        temp_path.replace(path)
+        bisect.insort(intervals, (start_time, end_time))
+
+        self._log.debug(
+            f"Cached {key} {start_time} -> {end_time}, merged {len(merged)} chunks"
+        )
+
+    @classmethod
+    def build_key(cls, **kwargs) -> str:
+        return RequestsCache.build_key(**kwargs)
+
+    def _series_path(self, key: str) -> Path:
+        return self.path / key
+
+    def _chunk_path(
+        self, key: str, start_time: pd.Timestamp, end_time: pd.Timestamp
+    ) -> Path:
+        return self._series_path(key) / f"{start_time.value}_{end_time.value}.parquet"
+
+    @staticmethod
+    def _interval_from_path(path: Path) -> tuple[pd.Timestamp, pd.Timestamp]:
+        start, end = path.stem.split("_")
+        return pd.Timestamp(int(start), tz="UTC"), pd.Timestamp(int(end), tz="UTC")
+
+
 class DetailsCache(BaseCache):
     """
     if the front contracts expiry is before the current date, then...
@@ -171,10 +709,257 @@ class DetailsCache(BaseCache):
         return key
 
 
+class NegativeCache(BaseCache):
+    """
+    Failed requests cached by key in a SQLite store separate from the results.
+
+    The NegativeCachePolicy sets the TTL of each error, permanent entries such as
+    "no data" are raised without sending the request again, transient entries such
+    as timeouts and pacing violations expire and the request is retried.
+    """
+
+    def __init__(self, path: Path, policy: NegativeCachePolicy | None = None):
+        super().__init__(path=path)
+        self._policy = policy or NegativeCachePolicy()
+        self._log = LoggerAdapter.from_name(name=type(self).__name__)
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path / "negative.sqlite")
+        with self._db:
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS negatives (
+                    key TEXT PRIMARY KEY,
+                    code INTEGER,
+                    error BLOB NOT NULL,
+                    expires_ns INTEGER
+                )
+                """
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS negatives_expires ON negatives (expires_ns)"
+            )
+
+    def __len__(self) -> int:
+        (count,) = self._db.execute(
+            "SELECT COUNT(*) FROM negatives WHERE expires_ns IS NULL OR expires_ns > ?",
+            (self._now_ns(),),
+        ).fetchone()
+        return count
+
+    def get(self, key: str) -> Exception | None:
+        """
+        Returns the cached error if it is permanent or has not expired
+        """
+        row = self._db.execute(
+            "SELECT error FROM negatives WHERE key = ? AND (expires_ns IS NULL OR expires_ns > ?)",
+            (key, self._now_ns()),
+        ).fetchone()
+        if row is None:
+            return None
+        return self._error_from_bytes(row[0])
+
+    def set(self, key: str, value: Exception) -> None:
+        ttl = self._policy.ttl(value)
+        if ttl is not None and ttl <= pd.Timedelta(0):
+            self._log.debug(f"Not caching {key}: {value!r}")
+            return
+
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO negatives (key, code, error, expires_ns) VALUES (?, ?, ?, ?)",
+                (
+                    key,
+                    getattr(value, "code", None),
+                    self._error_to_bytes(value),
+                    None if ttl is None else self._now_ns() + ttl.value,
+                ),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._db:
+            self._db.execute("DELETE FROM negatives WHERE key = ?", (key,))
+
+    def purge_expired(self) -> None:
+        with self._db:
+            self._db.execute(
+                "DELETE FROM negatives WHERE expires_ns <= ?", (self._now_ns(),)
+            )
+
+    def purge(self, code: int | None = None) -> None:
+        """
+        Deletes the entries with the error code, or every entry
+        """
+        with self._db:
+            if code is None:
+                self._db.execute("DELETE FROM negatives")
+            else:
+                self._db.execute("DELETE FROM negatives WHERE code = ?", (code,))
+
+    def close(self) -> None:
+        self._db.close()
+
+    @staticmethod
+    def _now_ns() -> int:
+        return pd.Timestamp.utcnow().value
+
+
+class MetadataCache(BaseCache):
+    """
+    Cache for metadata lookups such as contract details, head timestamps and schedules.
+
+    Entries are kept in a bounded in-memory LRU in front of a pickle per entry on disk.
+    Each kind of lookup has its own TTL, a stale entry is returned immediately while it is
+    refreshed in the background (stale-while-revalidate).
+    An entry is never returned after its expiry time, it is fetched again instead.
+    """
+
+    DEFAULT_TTLS: dict[str, pd.Timedelta] = {
+        "contract_details": pd.Timedelta(days=1),
+        "head_timestamp": pd.Timedelta(days=7),
+        "historical_schedule": pd.Timedelta(hours=12),
+    }
+
+    def __init__(
+        self,
+        path: Path,
+        ttls: dict[str, pd.Timedelta] | None = None,
+        max_entries: int = 4096,
+    ):
+        super().__init__(path=path)
+        self._ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], MetadataEntry] = OrderedDict()
+        self._refreshing: dict[tuple[str, str], asyncio.Task] = {}
+        self._log = LoggerAdapter.from_name(name=type(self).__name__)
+
+    def __len__(self) -> int:
+        return len(list(self.path.rglob("*.pkl")))
+
+    async def get_or_fetch(
+        self,
+        kind: str,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]],
+        expires: Callable[[Any], pd.Timestamp | None] | None = None,
+    ) -> Any:
+        """
+        fetch: requests the value when it is missing, expired or stale
+        expires: returns the hard expiry time of a fetched value
+        """
+        key = (kind, self._sanitize_filename(self._key_to_str(key)))
+        now = pd.Timestamp.utcnow()
+
+        entry = self._get_entry(key)
+        if entry is not None and entry.expires is not None and now >= entry.expires:
+            self._log.debug(f"Expired {key}")
+            self._delete_entry(key)
+            entry = None
+
+        if entry is None:
+            return await self._fetch(key, fetch, expires)
+
+        if now >= entry.fresh_until and key not in self._refreshing:
+            self._log.debug(f"Refreshing stale {key}")
+            self._refreshing[key] = asyncio.ensure_future(
+                self._refresh(key, fetch, expires)
+            )
+
+        return entry.value
+
+    def invalidate(self, kind: str, key: Hashable) -> None:
+        self._delete_entry((kind, self._sanitize_filename(self._key_to_str(key))))
+
+    async def _fetch(
+        self,
+        key: tuple[str, str],
+        fetch: Callable[[], Awaitable[Any]],
+        expires: Callable[[Any], pd.Timestamp | None] | None,
+    ) -> Any:
+        value = await fetch()
+        self._set_entry(
+            key,
+            MetadataEntry(
+                value=value,
+                fresh_until=pd.Timestamp.utcnow() + self._ttls[key[0]],
+                expires=None if expires is None else expires(value),
+            ),
+        )
+        return value
+
+    async def _refresh(
+        self,
+        key: tuple[str, str],
+        fetch: Callable[[], Awaitable[Any]],
+        expires: Callable[[Any], pd.Timestamp | None] | None,
+    ) -> None:
+        try:
+            await self._fetch(key, fetch, expires)
+        except Exception as e:
+            # the stale value is served until a refresh succeeds
+            self._log.error(f"Failed to refresh {key}: {e!r}")
+        finally:
+            self._refreshing.pop(key, None)
+
+    def _get_entry(self, key: tuple[str, str]) -> MetadataEntry | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+
+        path = self._entry_path(key)
+        if not path.exists():
+            return None
+
+        with open(path, "rb") as f:
+            entry = pickle.load(f)
+        self._remember(key, entry)
+        return entry
+
+    def _set_entry(self, key: tuple[str, str], entry: MetadataEntry) -> None:
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump(entry, f)
+        self._remember(key, entry)
+
+    def _delete_entry(self, key: tuple[str, str]) -> None:
+        self._entries.pop(key, None)
+        self._entry_path(key).unlink(missing_ok=True)
+
+    def _remember(self, key: tuple[str, str], entry: MetadataEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _entry_path(self, key: tuple[str, str]) -> Path:
+        kind, name = key
+        return self.path / kind / f"{name}.pkl"
+
+    @staticmethod
+    def _key_to_str(key: Hashable) -> str:
+        if isinstance(key, tuple):
+            return "-".join(str(part) for part in key if part not in ("", None))
+        return str(key)
+
+
 class CachedFunc:
-    def __init__(self, func: Callable, cache: BaseCache):
+    def __init__(
+        self,
+        func: Callable,
+        cache: BaseCache,
+        columnar: bool = False,
+        cache_errors: bool = True,
+    ):
+        """
+        columnar: func returns BarColumns and cached results are read with cache.get_columns()
+        cache_errors: False when errors are cached by a NegativeCachedFunc around func instead
+        """
         self._func = func
         self._cache = cache
+        self._columnar = columnar
+        self._cache_errors = cache_errors
 
         self._log = LoggerAdapter.from_name(name=type(self).__name__)
 
@@ -183,7 +968,10 @@ class CachedFunc:
 
         key = self._cache.build_key(*args, **kwargs)
 
-        cached = self._cache.get(key)
+        if self._columnar:
+            cached = self._cache.get_columns(key)
+        else:
+            cached = self._cache.get(key)
         if cached is not None:
             self._log.debug(f"Returning cached {key}={self._value_to_str(cached)}")
             if isinstance(cached, Exception):
@@ -199,21 +987,60 @@ class CachedFunc:
             self._log.debug(f"Saved {self._value_to_str(result)} items...")
             return result
         except Exception as e:
-            self._cache.set(key, e)
-            self._log.debug(f"Saved {e} items...")
+            if self._cache_errors:
+                self._cache.set(key, e)
+                self._log.debug(f"Saved {e} items...")
             raise
 
     def is_cached(self, *args, **kwargs) -> bool:
         assert args == (), "Keywords arguments only"
         key = self._cache.build_key(**kwargs)
-        cached = self._cache.get(key)
-        return cached is not None
+        return key in self._cache
 
     @staticmethod
     def _value_to_str(value: Exception | list) -> str:
         if isinstance(value, Exception):
             return repr(value)
-        elif isinstance(value, list):
+        elif isinstance(value, (list, BarColumns)):
             return f"{len(value)} items"
         else:
             raise NotImplementedError
+
+
+class NegativeCachedFunc:
+    """
+    Raises the cached error of a request without sending it,
+    errors raised by func are saved to the NegativeCache under its policy
+    """
+
+    def __init__(
+        self,
+        func: Callable,
+        cache: NegativeCache,
+        build_key: Callable[..., str],
+    ):
+        self._func = func
+        self._cache = cache
+        self._build_key = build_key
+
+        self._log = LoggerAdapter.from_name(name=type(self).__name__)
+
+    async def __call__(self, *args, **kwargs) -> Any:
+        assert args == (), "Keywords arguments only"
+
+        key = self._build_key(**kwargs)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._log.debug(f"Returning cached error {key}={cached!r}")
+            raise cached
+
+        try:
+            return await self._func(**kwargs)
+        except Exception as e:
+            self._cache.set(key, e)
+            raise
+
+    def is_cached(self, *args, **kwargs) -> bool:
+        assert args == (), "Keywords arguments only"
+        return self._cache.get(self._build_key(**kwargs)) is not None
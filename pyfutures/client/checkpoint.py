@@ -0,0 +1,248 @@
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+from pyfutures.client.enums import BarSize
+from pyfutures.client.enums import TaskStatus
+from pyfutures.client.enums import WhatToShow
+from pyfutures.client.objects import BulkTask
+
+
+class DownloadCheckpoint:
+    """
+    Records the finished parts of a long download in a SQLite file,
+    a download run again skips the parts recorded and resumes from the rest.
+    A part is recorded after its data is written, a crash loses the parts in flight only.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        with self._db:
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS finished (
+                    key TEXT PRIMARY KEY,
+                    rows INTEGER NOT NULL,
+                    finished_ns INTEGER NOT NULL
+                )
+                """
+            )
+
+    def __len__(self) -> int:
+        (count,) = self._db.execute("SELECT COUNT(*) FROM finished").fetchone()
+        return count
+
+    def __contains__(self, key: str) -> bool:
+        row = self._db.execute(
+            "SELECT 1 FROM finished WHERE key = ?", (key,)
+        ).fetchone()
+        return row is not None
+
+    def finished(self) -> dict[str, int]:
+        """
+        Returns the number of rows of each finished part by key
+        """
+        return dict(self._db.execute("SELECT key, rows FROM finished"))
+
+    def set_finished(self, key: str, rows: int) -> None:
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO finished (key, rows, finished_ns) VALUES (?, ?, ?)",
+                (key, rows, pd.Timestamp.utcnow().value),
+            )
+
+    def reset(self, key: str | None = None) -> None:
+        """
+        Forgets the finished part, or every part, so it is downloaded again
+        """
+        with self._db:
+            if key is None:
+                self._db.execute("DELETE FROM finished")
+            else:
+                self._db.execute("DELETE FROM finished WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class TaskCheckpoint:
+    """
+    Status of every task of a bulk download in a SQLite file.
+    Tasks are taken by priority, highest first, then in the order they were added,
+    the priority of the pending tasks can be changed while the download runs.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        with self._db:
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tasks (
+                    key TEXT PRIMARY KEY,
+                    uname TEXT NOT NULL,
+                    bar_size TEXT NOT NULL,
+                    what_to_show TEXT NOT NULL,
+                    start_ns INTEGER NOT NULL,
+                    end_ns INTEGER NOT NULL,
+                    status INTEGER NOT NULL,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    rows INTEGER,
+                    error TEXT
+                )
+                """
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS tasks_next ON tasks (status, priority)"
+            )
+
+    def __len__(self) -> int:
+        (count,) = self._db.execute("SELECT COUNT(*) FROM tasks").fetchone()
+        return count
+
+    def add(self, task: BulkTask) -> bool:
+        """
+        Adds the task as PENDING, returns False if the key is already known, its status is kept
+        """
+        with self._db:
+            cursor = self._db.execute(
+                """
+                INSERT OR IGNORE INTO tasks
+                (key, uname, bar_size, what_to_show, start_ns, end_ns, status, priority)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    task.key,
+                    task.uname,
+                    task.bar_size.name,
+                    task.what_to_show.name,
+                    task.start_time.value,
+                    task.end_time.value,
+                    TaskStatus.PENDING.value,
+                    task.priority,
+                ),
+            )
+        return cursor.rowcount > 0
+
+    def take_next(self, unames: list[str] | None = None) -> BulkTask | None:
+        """
+        Marks the next pending task RUNNING and returns it
+        unames: only the tasks of these universe rows are taken
+        """
+        query = """
+            SELECT key, uname, bar_size, what_to_show, start_ns, end_ns, priority, attempts
+            FROM tasks WHERE status = ?
+        """
+        params = [TaskStatus.PENDING.value]
+        if unames is not None:
+            query += f" AND uname IN ({', '.join('?' * len(unames))})"
+            params.extend(unames)
+        query += " ORDER BY priority DESC, rowid LIMIT 1"
+
+        row = self._db.execute(query, params).fetchone()
+        if row is None:
+            return None
+
+        key, uname, bar_size, what_to_show, start_ns, end_ns, priority, attempts = row
+        with self._db:
+            self._db.execute(
+                "UPDATE tasks SET status = ?, attempts = attempts + 1 WHERE key = ?",
+                (TaskStatus.RUNNING.value, key),
+            )
+
+        return BulkTask(
+            key=key,
+            uname=uname,
+            bar_size=BarSize[bar_size],
+            what_to_show=WhatToShow[what_to_show],
+            start_time=pd.Timestamp(start_ns, tz="UTC"),
+            end_time=pd.Timestamp(end_ns, tz="UTC"),
+            priority=priority,
+            attempts=attempts + 1,
+        )
+
+    def set_status(
+        self,
+        key: str,
+        status: TaskStatus,
+        rows: int | None = None,
+        error: str | None = None,
+    ) -> None:
+        with self._db:
+            self._db.execute(
+                "UPDATE tasks SET status = ?, rows = ?, error = ? WHERE key = ?",
+                (status.value, rows, error, key),
+            )
+
+    def requeue(self, status: TaskStatus) -> int:
+        """
+        Sets every task with the status PENDING again, returns the number of tasks
+        """
+        with self._db:
+            cursor = self._db.execute(
+                "UPDATE tasks SET status = ? WHERE status = ?",
+                (TaskStatus.PENDING.value, status.value),
+            )
+        return cursor.rowcount
+
+    def reprioritise(
+        self,
+        priority: int,
+        uname: str | None = None,
+        bar_size: BarSize | None = None,
+        what_to_show: WhatToShow | None = None,
+    ) -> int:
+        """
+        Sets the priority of the pending tasks matching every filter passed, returns the number of tasks
+        """
+        query = "UPDATE tasks SET priority = ? WHERE status = ?"
+        params = [priority, TaskStatus.PENDING.value]
+        for column, value in (
+            ("uname", uname),
+            ("bar_size", bar_size),
+            ("what_to_show", what_to_show),
+        ):
+            if value is not None:
+                query += f" AND {column} = ?"
+                params.append(value if isinstance(value, str) else value.name)
+
+        with self._db:
+            cursor = self._db.execute(query, params)
+        return cursor.rowcount
+
+    def counts(self) -> dict[TaskStatus, int]:
+        counts = dict.fromkeys(TaskStatus, 0)
+        for status, count in self._db.execute(
+            "SELECT status, COUNT(*) FROM tasks GROUP BY status"
+        ):
+            counts[TaskStatus(status)] = count
+        return counts
+
+    def failed(self) -> dict[str, str]:
+        """
+        Returns the error of each failed task by key
+        """
+        return dict(
+            self._db.execute(
+                "SELECT key, error FROM tasks WHERE status = ?",
+                (TaskStatus.FAILED.value,),
+            )
+        )
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def write_part(path: Path, df: pd.DataFrame) -> None:
+    """
+    Writes df to a temporary file first so a crash never leaves a partial part
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(".tmp")
+    df.to_parquet(temp_path, index=False)
+    temp_path.replace(path)
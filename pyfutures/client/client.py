@@ -1,7 +1,13 @@
 import asyncio
+import contextlib
+import copy
 import functools
+import math
 import time
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
 from collections.abc import Callable
+from collections.abc import Hashable
 from decimal import Decimal
 from pathlib import Path
 from typing import Any
@@ -27,13 +33,22 @@ from ibapi.execution import ExecutionFilter
 from ibapi.order import Order as IBOrder
 from ibapi.order_state import OrderState as IBOrderState
 
+from pyfutures.client.batching import QuoteTickBatcher
 from pyfutures.client.cache import CachedFunc
 from pyfutures.client.cache import DetailsCache
+from pyfutures.client.cache import MetadataCache
+from pyfutures.client.cache import NegativeCache
+from pyfutures.client.cache import NegativeCachedFunc
 from pyfutures.client.cache import RequestsCache
+from pyfutures.client.columns import BarColumns
 from pyfutures.client.connection import Connection
+from pyfutures.client.decoder import FastDecoder
 from pyfutures.client.enums import BarSize
 from pyfutures.client.enums import Duration
+from pyfutures.client.enums import Frequency
 from pyfutures.client.enums import WhatToShow
+from pyfutures.client.metrics import MetricsRegistry
+from pyfutures.client.multiplexer import SubscriptionMultiplexer
 from pyfutures.client.objects import ClientException
 from pyfutures.client.objects import ClientRequest
 from pyfutures.client.objects import ClientSubscription
@@ -43,7 +58,10 @@ from pyfutures.client.objects import IBOpenOrderEvent
 from pyfutures.client.objects import IBOrderStatusEvent
 from pyfutures.client.objects import IBPortfolioEvent
 from pyfutures.client.objects import IBPositionEvent
+from pyfutures.client.objects import StreamOverflow
+from pyfutures.client.pacing import PacingScheduler
 from pyfutures.client.parsing import ClientParser
+from pyfutures.client.stream import StreamBuffer
 from pyfutures.logger import LoggerAdapter
 
 
@@ -68,6 +86,10 @@ class InteractiveBrokersClient:
         client_id: int = 1,
         # default timeout for requests if not given
         request_timeout_seconds: float | int | None = 5,
+        # contract details, head timestamps and schedules are cached here if given
+        metadata_cache: MetadataCache | None = None,
+        # failed bars and contract details requests are cached here if given
+        negative_cache: NegativeCache | None = None,
     ):
         # Events
         self.order_status_events = eventkit.Event("IBOrderStatusEvent")
@@ -77,8 +99,11 @@ class InteractiveBrokersClient:
 
         self._log = LoggerAdapter.from_name(name=type(self).__name__)
 
+        self.metrics = MetricsRegistry()
+
         self._requests = {}
         self._subscriptions = {}
+        self._multiplexer = SubscriptionMultiplexer()
         self.conn = Connection(
             loop=loop,
             host=host,
@@ -86,13 +111,26 @@ class InteractiveBrokersClient:
             client_id=client_id,
             subscriptions=self._subscriptions,
             fields_received_callback=self._fields_received_callback,
+            metrics=self.metrics,
         )
         self._executions = {}  # hot cache
+        self._metadata_cache = metadata_cache
+        self._negative_cache = negative_cache
+        self._single_flights: dict[Hashable, asyncio.Future] = {}
+        self._whatif_lock = asyncio.Lock()  # whatif requests share a fixed request id
+        self._backfill_pacing = PacingScheduler()  # bars missed while disconnected
+        self._next_order_id = 0
         self._request_id_seq = -10  # reset on every connect
 
         self._parser = ClientParser()
 
-        self._decoder = Decoder(serverVersion=176, wrapper=self)
+        self._decoder = FastDecoder(fallback=Decoder(serverVersion=176, wrapper=self))
+        self._decoder.register(17, self._handle_historical_data)
+        self._decoder.register(50, self._handle_realtime_bar)
+        self._decoder.register(90, self._handle_historical_data_update)
+        self._decoder.register(97, self._handle_historical_ticks_bid_ask)
+        self._decoder.register(98, self._handle_historical_ticks_last)
+        self._decoder.register(99, self._handle_tick_by_tick_bid_ask)
 
         self._eclient = EClient(wrapper=self)
         self._eclient.clientId = client_id
@@ -124,6 +162,7 @@ class InteractiveBrokersClient:
         id: int,
         data: list | dict | None = None,
         timeout_seconds: int | None = None,
+        name: str = "unknown",
     ) -> ClientRequest:
         """
         all requests use the default timeout passed at instantiation
@@ -134,18 +173,68 @@ class InteractiveBrokersClient:
             id=id,
             data=data,
             timeout_seconds=timeout_seconds or self._request_timeout_seconds,
+            name=name,
+            start_time=time.perf_counter(),
         )
 
         self._requests[id] = request
+        self.metrics.request_started(name)
 
         return request
 
+    async def _single_flight(self, key: Hashable, func: Callable[[], Awaitable]) -> Any:
+        """
+        Concurrent callers with the same key await one in-flight request and share the result.
+        Requests with a fixed id in _request_id_map can only be in-flight once,
+        the other requests use it to remove duplicate round trips.
+        """
+        task = self._single_flights.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._single_flights[key] = task
+            task.add_done_callback(functools.partial(self._single_flight_done, key))
+
+        # shield so a cancelled caller does not cancel the request of the other callers
+        result = await asyncio.shield(task)
+
+        # callers do not share mutable results
+        return copy.copy(result)
+
+    def _single_flight_done(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._single_flights.get(key) is task:
+            del self._single_flights[key]
+        if not task.cancelled():
+            task.exception()  # retrieved when every caller was cancelled
+
+    @staticmethod
+    def _contract_key(contract: IBContract) -> tuple:
+        return (
+            contract.conId,
+            contract.symbol,
+            contract.secType,
+            contract.lastTradeDateOrContractMonth,
+            contract.multiplier,
+            contract.exchange,
+            contract.currency,
+            contract.localSymbol,
+            contract.tradingClass,
+            contract.includeExpired,
+        )
+
     async def _wait_for_request(self, request: ClientRequest) -> Any:
+        timed_out = False
         try:
             await asyncio.wait_for(request, timeout=request.timeout_seconds)
         except asyncio.TimeoutError:
+            timed_out = True
             del self._requests[request.id]
             raise
+        finally:
+            self.metrics.request_finished(
+                name=request.name,
+                seconds=time.perf_counter() - request.start_time,
+                timed_out=timed_out,
+            )
         result = request.result()
 
         del self._requests[request.id]
@@ -167,6 +256,7 @@ class InteractiveBrokersClient:
         advancedOrderRejectJson="",
     ) -> None:  # : Override the EWrapper
         # TODO: if reqId is negative, its part of a request
+        self.metrics.error_received(errorCode)
 
         event = IBErrorEvent(
             reqId=reqId,
@@ -242,26 +332,59 @@ class InteractiveBrokersClient:
         self,
         contract: IBContract,
         cache: DetailsCache | Path | None = None,
+    ):
+        return await self._single_flight(
+            key=("contract_details", self._contract_key(contract)),
+            func=functools.partial(
+                self._request_contract_details_cached, contract=contract, cache=cache
+            ),
+        )
+
+    async def _request_contract_details_cached(
+        self,
+        contract: IBContract,
+        cache: DetailsCache | Path | None = None,
     ):
         func: Callable = self._request_contract_details
 
+        if self._negative_cache is not None:
+            func: Callable = NegativeCachedFunc(
+                func=func,
+                cache=self._negative_cache,
+                build_key=self._contract_details_negative_key,
+            )
+
+        if cache is None and self._metadata_cache is not None:
+            return await self._metadata_cache.get_or_fetch(
+                kind="contract_details",
+                key=self._contract_key(contract),
+                fetch=functools.partial(func, contract=contract),
+                expires=self._front_contract_expiry,
+            )
+
         if cache is not None:
             if isinstance(cache, Path):
                 cache = DetailsCache(cache)
             func: Callable = CachedFunc(
                 func=func,
                 cache=cache,
+                cache_errors=self._negative_cache is None,
             )
 
         details: list[IBContractDetails] = await func(contract=contract)
         return details
 
+    @staticmethod
+    def _contract_details_negative_key(contract: IBContract) -> str:
+        return f"details={DetailsCache.build_key(contract=contract)}"
+
     async def _request_contract_details(
         self, contract: IBContract
     ) -> list[IBContractDetails]:
         self._log.debug(f"Requesting contract details for {contract=}")
 
         request = self._create_request(
+            name="contract_details",
             id=self._next_request_id(),
             data=[],
             timeout_seconds=self._request_timeout_seconds,
@@ -271,6 +394,27 @@ class InteractiveBrokersClient:
 
         return await self._wait_for_request(request)
 
+    @staticmethod
+    def _front_contract_expiry(
+        details_list: list[IBContractDetails],
+    ) -> pd.Timestamp | None:
+        """
+        The contract details of a chain are invalid once the front contract has expired
+        """
+        if len(details_list) == 0:
+            return None
+
+        expiry = details_list[0].contract.lastTradeDateOrContractMonth
+        if len(expiry) == 6:
+            return (
+                pd.to_datetime(expiry, format="%Y%m", utc=True) + pd.offsets.MonthEnd()
+            )
+        elif len(expiry) >= 8:
+            return pd.to_datetime(expiry[:8], format="%Y%m%d", utc=True) + pd.Timedelta(
+                days=1
+            )
+        return None
+
     async def request_last_contract_month(self, contract: IBContract) -> str:
         self._log.debug(
             f"Requesting last contract month for: {contract.symbol}, {contract.tradingClass}",
@@ -352,7 +496,15 @@ class InteractiveBrokersClient:
         cache: RequestsCache | Path | None = None,
         delay: float = 0,
         as_dataframe: bool = False,
+        pacing: PacingScheduler | None = None,
+        timeout_seconds: float | None = None,
+        raise_timeout: bool = False,
     ):
+        """
+        pacing: requests that are not cached wait for the PacingScheduler before they are sent
+        timeout_seconds: timeout of the request, defaults to 10 minutes
+        raise_timeout: raise asyncio.TimeoutError instead of returning no bars
+        """
         # TODO: do not cache time range that might have missing data
         # if end_time >= pd.Timestamp.utcnow():
         #     cache = None
@@ -367,27 +519,59 @@ class InteractiveBrokersClient:
             end_time=end_time,
         )
 
+        # the columnar result is returned directly when no BarData is needed
+        # cached results are then read as columns too
+        func: Callable = (
+            self._request_bar_columns if as_dataframe else self._request_bars
+        )
+        if timeout_seconds is not None:
+            # bound outside the kwargs so the timeout is not part of the cache key
+            func = functools.partial(func, timeout_seconds=timeout_seconds)
+
+        # initialize negative cache, errors are cached under its policy instead of in the cache
+        is_cached = False
+        if self._negative_cache is not None:
+            func: Callable = NegativeCachedFunc(
+                func=func,
+                cache=self._negative_cache,
+                build_key=RequestsCache.build_key,
+            )
+            is_cached = func.is_cached(**kwargs)
+
         # initialize cache
-        func: Callable = self._request_bars
-        if cache is None:
-            is_cached = False
-        else:
+        if cache is not None:
             if isinstance(cache, Path):
                 cache = RequestsCache(cache)
             func: Callable = CachedFunc(
                 func=func,
                 cache=cache,
+                columnar=as_dataframe,
+                cache_errors=self._negative_cache is None,
+            )
+            is_cached = is_cached or func.is_cached(**kwargs)
+
+        # initialize pacing
+        if pacing is None or is_cached:
+            slot = contextlib.nullcontext()
+        else:
+            slot = pacing.slot(
+                key=RequestsCache.build_key(**kwargs),
+                burst_key=RequestsCache.build_key(
+                    contract=contract, what_to_show=what_to_show
+                ),
             )
-            is_cached = func.is_cached(**kwargs)
 
         # request bars
         start = time.perf_counter()
         bars = []
         try:
-            bars: list[BarData] = await func(**kwargs)
+            async with slot:
+                bars: list[BarData] | BarColumns = await func(**kwargs)
         except ClientException:
             pass
         except asyncio.TimeoutError as e:
+            if raise_timeout:
+                raise
             self._log.error(str(e.__class__.__name__))
         stop = time.perf_counter()
 
@@ -401,6 +585,9 @@ class InteractiveBrokersClient:
             self._log.info(f"Waiting for {delay}s...")
             await asyncio.sleep(delay)
 
+        if isinstance(bars, BarColumns):
+            return bars.to_dataframe()
+
         if as_dataframe:
             return pd.DataFrame([self._parser.bar_data_to_dict(obj) for obj in bars])
 
@@ -413,7 +600,27 @@ class InteractiveBrokersClient:
         what_to_show: WhatToShow,
         duration: Duration,
         end_time: pd.Timestamp,
+        timeout_seconds: float = 60 * 10,
     ) -> list[BarData]:
+        columns = await self._request_bar_columns(
+            contract=contract,
+            bar_size=bar_size,
+            what_to_show=what_to_show,
+            duration=duration,
+            end_time=end_time,
+            timeout_seconds=timeout_seconds,
+        )
+        return columns.to_bars()
+
+    async def _request_bar_columns(
+        self,
+        contract: IBContract,
+        bar_size: BarSize,
+        what_to_show: WhatToShow,
+        duration: Duration,
+        end_time: pd.Timestamp,
+        timeout_seconds: float = 60 * 10,
+    ) -> BarColumns:
         """
         formatDate=1, returns timestamp in the exchange timezone
         formatDate=2, returns timestamp as integer seconds from epoch (UTC)
@@ -429,9 +636,10 @@ class InteractiveBrokersClient:
         )
 
         request: ClientRequest = self._create_request(
+            name="bars",
             id=self._next_request_id(),
-            data=[],
-            timeout_seconds=60 * 10,
+            data=BarColumns(),
+            timeout_seconds=timeout_seconds,
         )
 
         try:
@@ -448,21 +656,22 @@ class InteractiveBrokersClient:
                 keepUpToDate=False,
                 chartOptions=[],
             )
-            bars = await self._wait_for_request(request)
+            bars: BarColumns = await self._wait_for_request(request)
         except ClientException:
             self._eclient.cancelHistoricalData(reqId=request.id)
             raise
 
         if len(bars) > 0:
+            timestamps = bars["timestamp"]
             self._log.info(
-                f"---> Downloaded {len(bars)} bars. {bars[0].timestamp} {bars[-1].timestamp}"
+                f"---> Downloaded {len(bars)} bars. {timestamps[0]} {timestamps[-1]}"
             )
         else:
             self._log.info("---> Downloaded 0 bars.")
 
         previous_len = len(bars)
 
-        bars = [b for b in bars if b.timestamp >= start_time and b.timestamp < end_time]
+        bars = bars.filter(start_time, end_time)
 
         if previous_len != len(bars):
             filtered_count = previous_len - len(bars)
@@ -470,12 +679,24 @@ class InteractiveBrokersClient:
 
         return bars
 
+    def _handle_historical_data(
+        self, reqId: int, columns: tuple[tuple[bytes]], start: str, end: str
+    ) -> None:
+        """
+        FastDecoder handler for historicalData + historicalDataEnd
+        """
+        request = self._requests.get(reqId)
+        if request is None:
+            return  # no request found for request_id
+
+        request.data.extend(*columns)
+        self.historicalDataEnd(reqId, start, end)
+
     def historicalData(self, reqId: int, bar: BarData):  # : Override the EWrapper
         request = self._requests.get(reqId)
         if request is None:
             return  # no request found for request_id
 
-        bar.timestamp = self._parser.parse_datetime(bar.date)
         request.data.append(bar)
 
     def historicalDataEnd(
@@ -484,7 +705,7 @@ class InteractiveBrokersClient:
         request = self._requests.get(reqId)
         if request is None:
             return  # no request found for request_id
-        request.set_result(request.data)
+        request.set_result(request.data.finish())
 
     ################################################################################################
     # Request order id
@@ -492,8 +713,19 @@ class InteractiveBrokersClient:
     async def request_next_order_id(
         self,
     ) -> int:
+        order_id = await self._single_flight(
+            key="next_order_id",
+            func=self._request_next_order_id,
+        )
+
+        # concurrent callers share the round trip, each is given a distinct order id
+        order_id = max(order_id, self._next_order_id)
+        self._next_order_id = order_id + 1
+        return order_id
+
+    async def _request_next_order_id(self) -> int:
         request_id = self._request_id_map["next_order_id"]
-        request = self._create_request(request_id)
+        request = self._create_request(request_id, name="next_order_id")
 
         self._eclient.reqIds(1)
 
@@ -528,6 +760,16 @@ class InteractiveBrokersClient:
         Gateway errors with code 388: Order size 1 is smaller than the minimum required size of 5.
 
         """
+        return await self._single_flight(
+            key=("whatif", self._contract_key(detail.contract)),
+            func=functools.partial(self._request_whatif, detail),
+        )
+
+    async def _request_whatif(self, detail: IBContractDetails) -> dict:
+        async with self._whatif_lock:
+            return await self._request_whatif_locked(detail)
+
+    async def _request_whatif_locked(self, detail: IBContractDetails) -> dict:
         contract = detail.contract
 
         order = IBOrder()
@@ -545,7 +787,7 @@ class InteractiveBrokersClient:
         order.contract = contract
 
         request_id = self._request_id_map["whatif"]
-        request = self._create_request(id=request_id, data=[])
+        request = self._create_request(id=request_id, data=[], name="whatif")
 
         self.place_order(order)
 
@@ -578,8 +820,14 @@ class InteractiveBrokersClient:
         Each open order will be fed back through the openOrder() and orderStatus()
         functions on the EWrapper.
         """
+        return await self._single_flight(
+            key="orders",
+            func=self._request_open_orders,
+        )
+
+    async def _request_open_orders(self) -> list[IBOpenOrderEvent]:
         request_id = self._request_id_map["orders"]
-        request = self._create_request(id=request_id, data=[])
+        request = self._create_request(id=request_id, data=[], name="open_orders")
 
         self._eclient.reqOpenOrders()
 
@@ -709,8 +957,15 @@ class InteractiveBrokersClient:
     # Positions query
 
     async def request_positions(self) -> list[IBPositionEvent]:
+        return await self._single_flight(
+            key="positions",
+            func=self._request_positions,
+        )
+
+    async def _request_positions(self) -> list[IBPositionEvent]:
         request_id = self._request_id_map["positions"]
         request = self._create_request(
+            name="positions",
             id=request_id,
             timeout_seconds=self._request_timeout_seconds,
             data=[],
@@ -768,6 +1023,7 @@ class InteractiveBrokersClient:
     async def request_executions(self, client_id: int):
         request_id: int = self._next_request_id()
         request = self._create_request(
+            name="executions",
             id=request_id,
             data=[],
         )
@@ -874,6 +1130,7 @@ class InteractiveBrokersClient:
 
         """
         request = self._create_request(
+            name="account_summary",
             id=self._next_request_id(),
             timeout_seconds=self._request_timeout_seconds,
             data={},
@@ -933,11 +1190,28 @@ class InteractiveBrokersClient:
         self,
         contract: IBContract,
         what_to_show: WhatToShow,
+    ) -> pd.Timestamp | None:
+        if self._metadata_cache is None:
+            return await self._request_head_timestamp(contract, what_to_show)
+
+        return await self._metadata_cache.get_or_fetch(
+            kind="head_timestamp",
+            key=(*self._contract_key(contract), what_to_show.name),
+            fetch=functools.partial(
+                self._request_head_timestamp, contract, what_to_show
+            ),
+        )
+
+    async def _request_head_timestamp(
+        self,
+        contract: IBContract,
+        what_to_show: WhatToShow,
     ) -> pd.Timestamp | None:
         self._log.debug(
             f"Requesting head timestamp for {contract.symbol} {contract.exchange} {contract.conId}",
         )
         request = self._create_request(
+            name="head_timestamp",
             id=self._next_request_id(),
             timeout_seconds=self._request_timeout_seconds,
         )
@@ -1011,7 +1285,7 @@ class InteractiveBrokersClient:
     async def request_quote_ticks(
         self,
         contract: IBContract,
-        start_time: pd.Timestamp,
+        start_time: pd.Timestamp | None,
         end_time: pd.Timestamp,
         count: int = 1000,
     ) -> list[HistoricalTickBidAsk]:
@@ -1025,31 +1299,67 @@ class InteractiveBrokersClient:
         You can also provide yyyymmddd-hh:mm:ss time is in UTC.
         Note that there is a dash between the date and time in UTC notation.
 
+        start_time=None requests the count ticks before end_time only.
         """
         # assert start_time.tz is not None, "Timestamp is not timezone aware"
         # assert end_time.tz is not None, "Timestamp is not timezone aware"
         # assert start_time < end_time
 
         request = self._create_request(
+            name="quote_ticks",
             id=self._next_request_id(),
             timeout_seconds=self._request_timeout_seconds,
             data=[],
         )
 
+        self._req_historical_ticks(
+            request=request,
+            contract=contract,
+            start_time=start_time,
+            end_time=end_time,
+            count=count,
+            what_to_show="BID_ASK",
+        )
+
+        return await self._wait_for_request(request)
+
+    def _req_historical_ticks(
+        self,
+        request: ClientRequest,
+        contract: IBContract,
+        start_time: pd.Timestamp | None,
+        end_time: pd.Timestamp,
+        count: int,
+        what_to_show: str,
+    ) -> None:
         self._eclient.reqHistoricalTicks(
             reqId=request.id,
             contract=contract,
-            startDateTime=start_time.tz_convert("UTC").strftime("%Y%m%d-%H:%M:%S"),
-            # startDateTime="",
+            startDateTime=""
+            if start_time is None
+            else start_time.tz_convert("UTC").strftime("%Y%m%d-%H:%M:%S"),
             endDateTime=end_time.tz_convert("UTC").strftime("%Y%m%d-%H:%M:%S"),
             numberOfTicks=count,  # Max is 1000 per request.
-            whatToShow="BID_ASK",
+            whatToShow=what_to_show,
             useRth=1,
             ignoreSize=False,
             miscOptions=[],
         )
 
-        return await self._wait_for_request(request)
+    def _handle_historical_ticks_bid_ask(
+        self, reqId: int, ticks: list[tuple], done: bool
+    ) -> None:
+        """
+        FastDecoder handler for historicalTicksBidAsk
+        """
+        if reqId not in self._requests:
+            return  # no response found for request_id
+
+        self.historicalTicksBidAsk(
+            reqId,
+            [self._parser.historical_tick_bid_ask_from_tuple(row) for row in ticks],
+            done,
+        )
 
     def historicalTicksBidAsk(
         self, reqId: int, ticks: ListOfHistoricalTickBidAsk, done: bool
@@ -1073,34 +1383,51 @@ class InteractiveBrokersClient:
     async def request_trade_ticks(
         self,
         contract: IBContract,
-        start_time: pd.Timestamp,
+        start_time: pd.Timestamp | None,
         end_time: pd.Timestamp,
         count: int = 1000,
     ) -> list[HistoricalTickLast]:
-        assert start_time.tz is not None, "Timestamp is not timezone aware"
+        """
+        start_time=None requests the count ticks before end_time only.
+        """
         assert end_time.tz is not None, "Timestamp is not timezone aware"
-        assert start_time < end_time
+        if start_time is not None:
+            assert start_time.tz is not None, "Timestamp is not timezone aware"
+            assert start_time < end_time
 
         request = self._create_request(
+            name="trade_ticks",
             id=self._next_request_id(),
             timeout_seconds=self._request_timeout_seconds,
             data=[],
         )
 
-        self._eclient.reqHistoricalTicks(
-            reqId=request.id,
+        self._req_historical_ticks(
+            request=request,
             contract=contract,
-            startDateTime=start_time.tz_convert("UTC").strftime("%Y%m%d-%H:%M:%S"),
-            endDateTime=end_time.tz_convert("UTC").strftime("%Y%m%d-%H:%M:%S"),
-            numberOfTicks=count,
-            whatToShow="TRADES",
-            useRth=True,
-            ignoreSize=False,
-            miscOptions=[],
+            start_time=start_time,
+            end_time=end_time,
+            count=count,
+            what_to_show="TRADES",
         )
 
         return await self._wait_for_request(request)
 
+    def _handle_historical_ticks_last(
+        self, reqId: int, ticks: list[tuple], done: bool
+    ) -> None:
+        """
+        FastDecoder handler for historicalTicksLast
+        """
+        if reqId not in self._requests:
+            return  # no response found for request_id
+
+        self.historicalTicksLast(
+            reqId,
+            [self._parser.historical_tick_last_from_tuple(row) for row in ticks],
+            done,
+        )
+
     def historicalTicksLast(
         self, reqId: int, ticks: ListOfHistoricalTickLast, done: bool
     ):
@@ -1121,6 +1448,136 @@ class InteractiveBrokersClient:
         if done:
             request.set_result(request.data)
 
+    ################################################################################################
+    # Stream historical data
+    # async generators yielding each batch as it is decoded instead of the full response
+    # max_batches bounds the batches buffered ahead of the consumer, the socket is shared
+    # by every request so a consumer that falls further behind fails with StreamOverflow
+
+    async def stream_bars(
+        self,
+        contract: IBContract,
+        bar_size: BarSize,
+        what_to_show: WhatToShow,
+        duration: Duration,
+        end_time: pd.Timestamp,
+    ) -> AsyncIterator[BarColumns]:
+        """
+        IB returns the bars of a historical data request in a single message,
+        so the response is yielded as one batch
+        """
+        yield await self._request_bar_columns(
+            contract=contract,
+            bar_size=bar_size,
+            what_to_show=what_to_show,
+            duration=duration,
+            end_time=end_time,
+        )
+
+    async def stream_quote_ticks(
+        self,
+        contract: IBContract,
+        start_time: pd.Timestamp | None,
+        end_time: pd.Timestamp,
+        count: int = 1000,
+        max_batches: int = 16,
+    ) -> AsyncIterator[list[HistoricalTickBidAsk]]:
+        request = self._create_request(
+            name="quote_ticks",
+            id=self._next_request_id(),
+            timeout_seconds=self._request_timeout_seconds,
+            data=StreamBuffer(max_batches=max_batches),
+        )
+
+        self._req_historical_ticks(
+            request=request,
+            contract=contract,
+            start_time=start_time,
+            end_time=end_time,
+            count=count,
+            what_to_show="BID_ASK",
+        )
+
+        async with contextlib.aclosing(self._stream_request(request)) as stream:
+            async for ticks in stream:
+                yield ticks
+
+    async def stream_trade_ticks(
+        self,
+        contract: IBContract,
+        start_time: pd.Timestamp | None,
+        end_time: pd.Timestamp,
+        count: int = 1000,
+        max_batches: int = 16,
+    ) -> AsyncIterator[list[HistoricalTickLast]]:
+        assert end_time.tz is not None, "Timestamp is not timezone aware"
+        if start_time is not None:
+            assert start_time.tz is not None, "Timestamp is not timezone aware"
+            assert start_time < end_time
+
+        request = self._create_request(
+            name="trade_ticks",
+            id=self._next_request_id(),
+            timeout_seconds=self._request_timeout_seconds,
+            data=StreamBuffer(max_batches=max_batches),
+        )
+
+        self._req_historical_ticks(
+            request=request,
+            contract=contract,
+            start_time=start_time,
+            end_time=end_time,
+            count=count,
+            what_to_show="TRADES",
+        )
+
+        async with contextlib.aclosing(self._stream_request(request)) as stream:
+            async for ticks in stream:
+                yield ticks
+
+    async def _stream_request(self, request: ClientRequest) -> AsyncIterator[list]:
+        """
+        Yields the batches of a request created with a StreamBuffer as data.
+        The timeout applies to the wait for each batch rather than the whole response.
+        The request is removed when the consumer stops early, later batches are dropped.
+        """
+        buffer: StreamBuffer = request.data
+        request.add_done_callback(lambda _: buffer.close())
+
+        timed_out = False
+        try:
+            while True:
+                try:
+                    batch = await asyncio.wait_for(
+                        buffer.get(), timeout=request.timeout_seconds
+                    )
+                except asyncio.TimeoutError:
+                    timed_out = True
+                    raise
+
+                if batch is None:
+                    break  # closed by the end of the response or an overflow
+
+                yield batch
+
+            if buffer.overflowed:
+                message = f"Stream {request.id} fell more than {buffer.max_batches} batches behind"
+                self._log.error(message)
+                raise StreamOverflow(message)
+
+            result = request.result()
+            if isinstance(result, ClientException):
+                self._log.error(result.message)
+                raise result
+        finally:
+            self._requests.pop(request.id, None)
+            buffer.close()
+            self.metrics.request_finished(
+                name=request.name,
+                seconds=time.perf_counter() - request.start_time,
+                timed_out=timed_out,
+            )
+
     ################################################################################################
     # Subscribe ticks
 
@@ -1128,6 +1585,72 @@ class InteractiveBrokersClient:
         self,
         contract: IBContract,
         callback: Callable,
+        batch_size: int | None = None,
+        batch_interval_ms: float | None = None,
+        conflate: bool = False,
+    ) -> ClientSubscription:
+        """
+        Consumers of the same contract share one tick-by-tick subscription.
+
+        By default the callback receives a HistoricalTickBidAsk for every tick.
+        batch_size / batch_interval_ms: the callback receives a QuoteTickBatch
+            when batch_size ticks are collected or batch_interval_ms after the first tick
+        conflate: the callback receives a QuoteTickBatch with the latest quote only
+            every batch_interval_ms
+        """
+        if batch_size is None and batch_interval_ms is None and not conflate:
+            consumer = functools.partial(self._quote_tick_callback, callback)
+            batcher = None
+        else:
+            consumer = batcher = QuoteTickBatcher(
+                callback=callback,
+                max_ticks=batch_size or 256,
+                interval_seconds=(batch_interval_ms or 100) / 1000,
+                conflate=conflate,
+                loop=self._loop,
+            )
+
+        subscription = self._multiplexer.subscribe(
+            key=self._quote_ticks_subscription_key(contract),
+            callback=consumer,
+            open_subscription=functools.partial(
+                self._subscribe_quote_ticks, contract=contract
+            ),
+        )
+
+        if batcher is not None:
+            # the pending ticks are delivered on cancel
+            subscription.cancel = functools.partial(
+                self._cancel_batched, cancel=subscription.cancel, batcher=batcher
+            )
+
+        return subscription
+
+    @staticmethod
+    def _cancel_batched(cancel: Callable, batcher: QuoteTickBatcher) -> None:
+        cancel()
+        batcher.close()
+
+    def _quote_tick_callback(self, callback: Callable, tick: tuple) -> None:
+        time, bidPrice, askPrice, bidSize, askSize, mask = tick
+        obj = HistoricalTickBidAsk()
+        obj.time = time
+        obj.priceBid = bidPrice
+        obj.priceAsk = askPrice
+        obj.sizeBid = bidSize
+        obj.sizeAsk = askSize
+        obj.timestamp = self._parser.parse_datetime(time)
+        obj.tickAttribBidAsk = self._parser.tick_attrib_bid_ask_from_mask(mask)
+        callback(obj)
+
+    @classmethod
+    def _quote_ticks_subscription_key(cls, contract: IBContract) -> tuple:
+        return ("tick_by_tick", cls._contract_key(contract), "BidAsk")
+
+    def _subscribe_quote_ticks(
+        self,
+        contract: IBContract,
+        callback: Callable,
     ) -> ClientSubscription:
         request_id = self._next_request_id()
 
@@ -1161,6 +1684,19 @@ class InteractiveBrokersClient:
 
         return subscription
 
+    def _handle_tick_by_tick_bid_ask(self, reqId: int, tick: tuple) -> None:
+        """
+        FastDecoder handler for tickByTick with tickType=BidAsk
+        the consumers receive the tuple, HistoricalTickBidAsk objects are only built for
+        consumers that are not batched
+        """
+        subscription = self._subscriptions.get(reqId)
+        if subscription is None:
+            return  # no subscription found for request_id
+
+        self.metrics.callback_called("quote_ticks")
+        subscription.callback(tick)
+
     def tickByTickBidAsk(  # : Override the EWrapper
         self,
         reqId: int,
@@ -1177,23 +1713,10 @@ class InteractiveBrokersClient:
         self._log.debug(
             f"Received quote tick {reqId} {time}, {bidPrice}, {askPrice}, {bidSize}, {askSize}",
         )
-        subscription = self._subscriptions.get(reqId)
-        if subscription is None:
-            self._log.debug(
-                f"No subscription found for request_id {reqId}",
-            )
-            return  # no response found for request_id
-
-        tick = HistoricalTickBidAsk()
-        tick.time = time
-        tick.priceBid = bidPrice
-        tick.priceAsk = askPrice
-        tick.sizeBid = bidSize
-        tick.sizeAsk = askSize
-        tick.timestamp = self._parser.parse_datetime(time)
-        tick.tickAttribBidAsk = tickAttribBidAsk
-
-        subscription.callback(tick)
+        mask = int(tickAttribBidAsk.bidPastLow) | int(tickAttribBidAsk.askPastHigh) << 1
+        self._handle_tick_by_tick_bid_ask(
+            reqId, (time, bidPrice, askPrice, bidSize, askSize, mask)
+        )
 
     ################################################################################################
     # Realtime bars
@@ -1204,6 +1727,36 @@ class InteractiveBrokersClient:
         what_to_show: WhatToShow,
         bar_size: BarSize,
         callback: Callable,
+    ) -> ClientSubscription:
+        """
+        Consumers of the same contract, bar size and what_to_show share one subscription
+        """
+        return self._multiplexer.subscribe(
+            key=self._bars_subscription_key(contract, what_to_show, bar_size),
+            callback=callback,
+            open_subscription=functools.partial(
+                self._subscribe_bars,
+                contract=contract,
+                what_to_show=what_to_show,
+                bar_size=bar_size,
+            ),
+        )
+
+    @classmethod
+    def _bars_subscription_key(
+        cls,
+        contract: IBContract,
+        what_to_show: WhatToShow,
+        bar_size: BarSize,
+    ) -> tuple:
+        return ("bars", cls._contract_key(contract), bar_size, what_to_show)
+
+    def _subscribe_bars(
+        self,
+        contract: IBContract,
+        what_to_show: WhatToShow,
+        bar_size: BarSize,
+        callback: Callable,
     ) -> ClientSubscription:
         if bar_size == BarSize._5_SECOND:
             return self._subscribe_realtime_bars(
@@ -1256,6 +1809,13 @@ class InteractiveBrokersClient:
             subscribe=subscribe,
             cancel=cancel,
             callback=callback,
+            resubscribe=functools.partial(
+                self._resubscribe_bars,
+                request_id=request_id,
+                contract=contract,
+                what_to_show=what_to_show,
+                bar_size=bar_size,
+            ),
         )
 
         self._subscriptions[request_id] = subscription
@@ -1304,6 +1864,13 @@ class InteractiveBrokersClient:
             subscribe=subscribe,
             cancel=cancel,
             callback=callback,
+            resubscribe=functools.partial(
+                self._resubscribe_bars,
+                request_id=request_id,
+                contract=contract,
+                what_to_show=what_to_show,
+                bar_size=bar_size,
+            ),
         )
 
         self._subscriptions[request_id] = subscription
@@ -1325,6 +1892,15 @@ class InteractiveBrokersClient:
         cancel_func()
         del self._subscriptions[request_id]
 
+    def _handle_historical_data_update(self, reqId: int, bar: tuple) -> None:
+        """
+        FastDecoder handler for historicalDataUpdate
+        """
+        if reqId not in self._subscriptions:
+            return  # no subscription found for request_id
+
+        self.historicalDataUpdate(reqId, self._parser.bar_data_from_tuple(bar))
+
     def historicalDataUpdate(self, reqId: int, bar: BarData):
         """
         Returns updates in real time when keepUpToDate is set to True.
@@ -1337,8 +1913,102 @@ class InteractiveBrokersClient:
             return
 
         bar.timestamp = self._parser.parse_datetime(bar.date)
+        self._deliver_bar(subscription, bar, name="historical_bars")
+
+    def _deliver_bar(
+        self, subscription: ClientSubscription, bar: BarData, name: str
+    ) -> None:
+        if subscription.backlog is not None:
+            subscription.backlog.append(bar)  # delivered after the backfill
+            return
+
+        self._emit_bar(subscription, bar, name)
+
+    def _emit_bar(
+        self, subscription: ClientSubscription, bar: BarData, name: str
+    ) -> None:
+        subscription.last_timestamp = bar.timestamp
+        self.metrics.callback_called(name)
         subscription.callback(bar)
 
+    async def _resubscribe_bars(
+        self,
+        request_id: int,
+        contract: IBContract,
+        what_to_show: WhatToShow,
+        bar_size: BarSize,
+    ) -> None:
+        """
+        Resubscribes after a reconnect and delivers the bars missed while disconnected.
+        Live updates are held back until the backfilled bars have been delivered in order.
+        """
+        subscription = self._subscriptions.get(request_id)
+        if subscription is None:
+            return  # cancelled
+
+        last_timestamp = subscription.last_timestamp
+        if last_timestamp is None:
+            subscription.subscribe()  # nothing delivered yet, nothing to backfill
+            return
+
+        backlog = subscription.backlog = []
+        subscription.subscribe()
+
+        try:
+            end_time = pd.Timestamp.utcnow()
+            missed = end_time - last_timestamp + bar_size.to_timedelta()
+            if missed <= pd.Timedelta(days=1):
+                duration = Duration(
+                    step=max(30, math.ceil(missed.total_seconds())),
+                    freq=Frequency.SECOND,
+                )
+            else:
+                duration = Duration(step=missed.days + 1, freq=Frequency.DAY)
+
+            self._log.info(
+                f"Backfilling {contract.symbol} {bar_size!s} {what_to_show.name} from {last_timestamp}"
+            )
+            bars = await self.request_bars(
+                contract=contract,
+                bar_size=bar_size,
+                what_to_show=what_to_show,
+                duration=duration,
+                end_time=end_time,
+                pacing=self._backfill_pacing,
+            )
+
+            if request_id not in self._subscriptions:
+                return  # cancelled during the backfill
+
+            # the live updates received since resubscribing are newer than the backfill
+            first_live = backlog[0].timestamp if len(backlog) > 0 else None
+            # the bar at last_timestamp was in progress, its backfilled version is final
+            for bar in bars:
+                if bar.timestamp < last_timestamp:
+                    continue
+                if first_live is not None and bar.timestamp >= first_live:
+                    break
+                self._emit_bar(subscription, bar, name="backfill_bars")
+        finally:
+            subscription.backlog = None
+            if request_id in self._subscriptions:
+                name = (
+                    "realtime_bars"
+                    if bar_size == BarSize._5_SECOND
+                    else "historical_bars"
+                )
+                for bar in backlog:
+                    self._emit_bar(subscription, bar, name=name)
+
+    def _handle_realtime_bar(self, reqId: int, bar: tuple) -> None:
+        """
+        FastDecoder handler for realtimeBar
+        """
+        if reqId not in self._subscriptions:
+            return  # no subscription found for request_id
+
+        self.realtimeBar(reqId, *bar)
+
     def realtimeBar(
         self,
         reqId: int,
@@ -1372,14 +2042,21 @@ class InteractiveBrokersClient:
         bar.wap = wap
         bar.barCount = count
 
-        subscription.callback(bar)
+        self._deliver_bar(subscription, bar, name="realtime_bars")
 
     ################################################################################################
     # Accounts
 
     async def request_accounts(self) -> list[str]:
+        return await self._single_flight(
+            key="accounts",
+            func=self._request_accounts,
+        )
+
+    async def _request_accounts(self) -> list[str]:
         request_id = self._request_id_map["accounts"]
         request = self._create_request(
+            name="accounts",
             id=request_id,
             timeout_seconds=self._request_timeout_seconds,
         )
@@ -1441,10 +2118,17 @@ class InteractiveBrokersClient:
         return subscription
 
     async def request_portfolio(self) -> list[IBPortfolioEvent]:
+        return await self._single_flight(
+            key="portfolio",
+            func=self._request_portfolio,
+        )
+
+    async def _request_portfolio(self) -> list[IBPortfolioEvent]:
         accounts = await self.request_accounts()
 
         request = self._create_request(
-            id="portfolio",
+            name="portfolio",
+            id=self._request_id_map["portfolio"],
             timeout_seconds=self._request_timeout_seconds,
             data=[],
         )
@@ -1532,8 +2216,23 @@ class InteractiveBrokersClient:
 
     async def request_historical_schedule(
         self, contract: IBContract, durationStr: str | None = None
+    ) -> ListOfHistoricalSessions:
+        if self._metadata_cache is None:
+            return await self._request_historical_schedule(contract, durationStr)
+
+        return await self._metadata_cache.get_or_fetch(
+            kind="historical_schedule",
+            key=(*self._contract_key(contract), durationStr),
+            fetch=functools.partial(
+                self._request_historical_schedule, contract, durationStr
+            ),
+        )
+
+    async def _request_historical_schedule(
+        self, contract: IBContract, durationStr: str | None = None
     ) -> ListOfHistoricalSessions:
         request: ClientRequest = self._create_request(
+            name="historical_schedule",
             id=self._next_request_id(),
             timeout_seconds=self._request_timeout_seconds,
         )
@@ -0,0 +1,243 @@
+from collections.abc import Sequence
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from ibapi.common import BarData
+from ibapi.common import UNSET_DECIMAL
+
+from pyfutures.client.decoder import _UNSET_DECIMAL_FIELDS
+from pyfutures.client.parsing import ClientParser
+
+
+# values decoded to NaN in the decimal columns
+_UNSET_VALUES = np.array(
+    [v.decode() for v in _UNSET_DECIMAL_FIELDS] + list(_UNSET_DECIMAL_FIELDS),
+    dtype=object,
+)
+
+
+def _to_float(values: Sequence) -> np.ndarray:
+    return np.asarray(values).astype(np.float64)
+
+
+def _to_float_unset(values: Sequence) -> np.ndarray:
+    raw = np.asarray(values)
+    if raw.dtype.kind not in ("S", "U"):
+        return raw.astype(np.float64)
+    unset = np.isin(raw.astype(object), _UNSET_VALUES)
+    raw = np.where(unset, "nan", raw.astype(str))
+    return raw.astype(np.float64)
+
+
+def _decimal_to_str(value: Decimal) -> str:
+    return "" if value == UNSET_DECIMAL else str(value)
+
+
+def _column_to_float(column: pa.ChunkedArray) -> np.ndarray:
+    if pa.types.is_floating(column.type):
+        return column.to_numpy()
+    values = column.cast(pa.float64()).to_numpy()
+    if pa.types.is_decimal(column.type):
+        values = np.where(values == float(UNSET_DECIMAL), np.nan, values)
+    return values
+
+
+class BarColumns:
+    """
+    Columnar accumulator for historical bar responses.
+
+    Raw fields are appended as typed arrays per message, the timestamps are parsed in a
+    single vectorised pass when the request finishes. volume and wap are float64, unset values are NaN.
+    """
+
+    COLUMNS = (
+        "timestamp",
+        "date",
+        "open",
+        "high",
+        "low",
+        "close",
+        "volume",
+        "wap",
+        "barCount",
+    )
+
+    def __init__(self):
+        self._chunks: dict[str, list[np.ndarray]] = {
+            name: [] for name in self.COLUMNS[1:]
+        }
+        self._arrays: dict[str, np.ndarray] | None = None
+
+    def __len__(self) -> int:
+        if self._arrays is not None:
+            return len(self._arrays["date"])
+        return sum(len(chunk) for chunk in self._chunks["date"])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        assert self._arrays is not None, "BarColumns.finish() not called"
+        return self._arrays[name]
+
+    def extend(
+        self,
+        date: Sequence,
+        open: Sequence,
+        high: Sequence,
+        low: Sequence,
+        close: Sequence,
+        volume: Sequence,
+        wap: Sequence,
+        barCount: Sequence,
+    ) -> None:
+        """
+        Appends the raw field values (bytes or str) of multiple bars
+        """
+        assert self._arrays is None, "BarColumns already finished"
+        chunks = self._chunks
+        chunks["date"].append(np.asarray(date).astype(str))
+        chunks["open"].append(_to_float(open))
+        chunks["high"].append(_to_float(high))
+        chunks["low"].append(_to_float(low))
+        chunks["close"].append(_to_float(close))
+        chunks["volume"].append(_to_float_unset(volume))
+        chunks["wap"].append(_to_float_unset(wap))
+        chunks["barCount"].append(np.asarray(barCount).astype(np.int64))
+
+    @classmethod
+    def from_bars(cls, bars: Sequence[BarData]) -> "BarColumns":
+        columns = cls()
+        columns.extend(
+            date=[str(bar.date) for bar in bars],
+            open=[bar.open for bar in bars],
+            high=[bar.high for bar in bars],
+            low=[bar.low for bar in bars],
+            close=[bar.close for bar in bars],
+            volume=[_decimal_to_str(bar.volume) for bar in bars],
+            wap=[_decimal_to_str(bar.wap) for bar in bars],
+            barCount=[bar.barCount for bar in bars],
+        )
+        return columns.finish()
+
+    @classmethod
+    def from_arrow(cls, table: pa.Table) -> "BarColumns":
+        """
+        Wraps the columns of a stored table without building a BarData per row,
+        numeric columns without nulls are zero-copy views of the table buffers.
+        Decimal columns written from BarData are cast to float64.
+        """
+        columns = cls()
+        if table.num_rows == 0:
+            return columns.finish()
+
+        arrays = {
+            "timestamp": table.column("timestamp")
+            .cast(pa.timestamp("ns", tz="UTC"))
+            .cast(pa.timestamp("ns"))
+            .to_numpy(),
+            "date": table.column("date").cast(pa.string()).to_numpy().astype(str),
+            "barCount": table.column("barCount").cast(pa.int64()).to_numpy(),
+        }
+        for name in ("open", "high", "low", "close", "volume", "wap"):
+            arrays[name] = _column_to_float(table.column(name))
+
+        columns._arrays = {name: arrays[name] for name in cls.COLUMNS}
+        return columns
+
+    def append(self, bar: BarData) -> None:
+        self.extend(
+            date=[bar.date],
+            open=[bar.open],
+            high=[bar.high],
+            low=[bar.low],
+            close=[bar.close],
+            volume=[_decimal_to_str(bar.volume)],
+            wap=[_decimal_to_str(bar.wap)],
+            barCount=[bar.barCount],
+        )
+
+    def finish(self) -> "BarColumns":
+        """
+        Concatenates the appended chunks and parses the timestamps
+        """
+        if self._arrays is not None:
+            return self
+
+        arrays = {}
+        for name, chunks in self._chunks.items():
+            if len(chunks) == 0:
+                arrays[name] = np.array([], dtype=str if name == "date" else np.float64)
+            elif len(chunks) == 1:
+                arrays[name] = chunks[0]
+            else:
+                arrays[name] = np.concatenate(chunks)
+        arrays["barCount"] = arrays["barCount"].astype(np.int64)
+        arrays["timestamp"] = ClientParser.parse_datetimes(arrays["date"])
+
+        self._arrays = {name: arrays[name] for name in self.COLUMNS}
+        self._chunks = {name: [] for name in self.COLUMNS[1:]}
+        return self
+
+    def filter(self, start_time: pd.Timestamp, end_time: pd.Timestamp) -> "BarColumns":
+        """
+        Returns the bars where start_time <= timestamp < end_time
+        """
+        self.finish()
+        timestamps = self._arrays["timestamp"]
+        mask = (timestamps >= self._to_datetime64(start_time)) & (
+            timestamps < self._to_datetime64(end_time)
+        )
+        if mask.all():
+            return self
+        filtered = BarColumns()
+        filtered._arrays = {name: array[mask] for name, array in self._arrays.items()}
+        return filtered
+
+    def to_arrow(self) -> pa.Table:
+        self.finish()
+        arrays = dict(self._arrays)
+        arrays["timestamp"] = pa.array(
+            arrays["timestamp"], type=pa.timestamp("ns", tz="UTC")
+        )
+        return pa.table(arrays)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        self.finish()
+        df = pd.DataFrame(self._arrays, columns=self.COLUMNS)
+        df["timestamp"] = df["timestamp"].dt.tz_localize("UTC")
+        return df
+
+    def to_bars(self) -> list[BarData]:
+        """
+        Builds a BarData per row, volume and wap are converted back to Decimal
+        """
+        self.finish()
+        arrays = self._arrays
+        timestamps = pd.DatetimeIndex(arrays["timestamp"]).tz_localize("UTC")
+        bars = []
+        for i in range(len(timestamps)):
+            bar = BarData()
+            bar.timestamp = timestamps[i]
+            bar.date = str(arrays["date"][i])
+            bar.open = float(arrays["open"][i])
+            bar.high = float(arrays["high"][i])
+            bar.low = float(arrays["low"][i])
+            bar.close = float(arrays["close"][i])
+            bar.volume = self._to_decimal(arrays["volume"][i])
+            bar.wap = self._to_decimal(arrays["wap"][i])
+            bar.barCount = int(arrays["barCount"][i])
+            bars.append(bar)
+        return bars
+
+    @staticmethod
+    def _to_decimal(value: float) -> Decimal:
+        if np.isnan(value):
+            return UNSET_DECIMAL
+        return Decimal(repr(float(value)))
+
+    @staticmethod
+    def _to_datetime64(value: pd.Timestamp) -> np.datetime64:
+        value = pd.Timestamp(value)
+        if value.tzinfo is not None:
+            value = value.tz_convert("UTC").tz_localize(None)
+        return value.to_datetime64().astype("datetime64[ns]")
@@ -3,6 +3,9 @@
 import asyncio
 from collections.abc import Callable
 
+from pyfutures.client.metrics import MetricsRegistry
+from pyfutures.client.objects import ClientSubscription
+from pyfutures.client.pacing import TokenBucket
 from pyfutures.client.protocol import Protocol
 from pyfutures.logger import LoggerAdapter
 
@@ -21,15 +24,19 @@ class Connection:
         host: str = "127.0.0.1",
         port: int = 4002,
         client_id: int = 1,
+        metrics: MetricsRegistry | None = None,
+        resubscribe_per_second: float = 5,
     ):
         self._loop = loop
         self._subscriptions = subscriptions
+        self._resubscribe_per_second = resubscribe_per_second
         self.host = host
         self.port = port
         self.is_connected = asyncio.Event()
         self._is_connected_lock = asyncio.Lock()
 
         self.reconnect_task: asyncio.Task | None = None
+        self.resubscribe_task: asyncio.Task | None = None
 
         self._log = LoggerAdapter.from_name(name=type(self).__name__)
         self.protocol = Protocol(
@@ -37,6 +44,7 @@ class Connection:
             client_id=client_id,
             connection_lost_callback=self._connection_lost_callback,
             fields_received_callback=fields_received_callback,
+            metrics=metrics,
         )
 
         # self._is_connected_waiter = None
@@ -44,6 +52,8 @@ class Connection:
     def _connection_lost_callback(self):
         print("connection lost callback")
         self.is_connected.clear()
+        if self.resubscribe_task is not None:
+            self.resubscribe_task.cancel()  # replayed again on the next connect
         self.reconnect_task = self._loop.create_task(
             self._reconnect_task(), name="reconnect"
         )
@@ -71,13 +81,41 @@ class Connection:
             # reconnect subscriptions
             if len(self._subscriptions) > 0:
                 self._log.debug(f"Reconnecting subscriptions {self._subscriptions=}")
-                for sub in self._subscriptions.values():
-                    sub.subscribe()
+                self.resubscribe_task = self._loop.create_task(
+                    self._resubscribe(list(self._subscriptions.values())),
+                    name="resubscribe",
+                )
 
             if self.reconnect_task is not None:
                 self.reconnect_task.cancel()
                 self._log.info("Reconnect task cancelled...")
 
+    async def _resubscribe(self, subscriptions: list[ClientSubscription]) -> None:
+        """
+        Replays the subscriptions at resubscribe_per_second so a reconnect with many
+        subscriptions does not exceed the IB message limits.
+        Subscriptions with a resubscribe coroutine (bars) also backfill the bars missed
+        while disconnected, those run concurrently after they are released.
+        """
+        bucket = TokenBucket(capacity=self._resubscribe_per_second, period_seconds=1)
+        tasks = []
+        for subscription in subscriptions:
+            while (wait_seconds := bucket.wait_seconds()) > 0:
+                await asyncio.sleep(wait_seconds)
+            bucket.consume()
+
+            if subscription.id not in self._subscriptions:
+                continue  # cancelled while waiting
+
+            if subscription.resubscribe is None:
+                subscription.subscribe()
+            else:
+                tasks.append(asyncio.ensure_future(subscription.resubscribe()))
+
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(result, Exception):
+                self._log.exception("resubscribe exception: ", result)
+
     @staticmethod
     async def create_connection(loop, protocol, host, port):
         """
@@ -0,0 +1,206 @@
+from collections.abc import Callable
+from decimal import Decimal
+
+from ibapi.common import UNSET_DECIMAL
+from ibapi.decoder import Decoder
+
+
+# values ibapi decodes to UNSET_DECIMAL
+_UNSET_DECIMAL_FIELDS = frozenset(
+    (
+        b"",
+        b"2147483647",
+        b"9223372036854775807",
+        b"1.7976931348623157E308",
+        b"-9223372036854775808",
+    )
+)
+
+# tickByTick tick types
+TICK_TYPE_BID_ASK = 3
+
+
+def _decimal(value: bytes) -> Decimal:
+    if value in _UNSET_DECIMAL_FIELDS:
+        return UNSET_DECIMAL
+    return Decimal(value.decode())
+
+
+def parse_historical_data(fields: tuple[bytes]) -> tuple:
+    """
+    17: historicalData
+    msgId, reqId, startDateStr, endDateStr, itemCount, (date, open, high, low, close, volume, wap, barCount) * itemCount
+
+    Returns (reqId, columns, start, end)
+    columns = (date, open, high, low, close, volume, wap, barCount), each a tuple of the raw fields
+    the fields are not parsed here, see BarColumns.extend
+    """
+    end = 5 + int(fields[4]) * 8
+    columns = tuple(fields[i:end:8] for i in range(5, 13))
+    return int(fields[1]), columns, fields[2].decode(), fields[3].decode()
+
+
+def parse_realtime_bar(fields: tuple[bytes]) -> tuple:
+    """
+    50: realtimeBar
+    msgId, version, reqId, time, open, high, low, close, volume, wap, count
+
+    Returns (reqId, bar)
+    bar = (time, open, high, low, close, volume, wap, count)
+    """
+    _, _, req_id, time, open_, high, low, close, volume, wap, count = fields[:11]
+    bar = (
+        int(time or 0),
+        float(open_ or 0),
+        float(high or 0),
+        float(low or 0),
+        float(close or 0),
+        _decimal(volume),
+        _decimal(wap),
+        int(count or 0),
+    )
+    return int(req_id), bar
+
+
+def parse_historical_data_update(fields: tuple[bytes]) -> tuple:
+    """
+    90: historicalDataUpdate
+    msgId, reqId, barCount, date, open, close, high, low, wap, volume
+
+    Returns (reqId, bar)
+    bar = (date, open, high, low, close, volume, wap, barCount)
+    note the bar tuple uses the same order as historicalData, not the order on the wire
+    """
+    _, req_id, bar_count, date, open_, close, high, low, wap, volume = fields[:10]
+    bar = (
+        date.decode(),
+        float(open_ or 0),
+        float(high or 0),
+        float(low or 0),
+        float(close or 0),
+        _decimal(volume),
+        _decimal(wap),
+        int(bar_count or 0),
+    )
+    return int(req_id), bar
+
+
+def parse_historical_ticks_bid_ask(fields: tuple[bytes]) -> tuple:
+    """
+    97: historicalTicksBidAsk
+    msgId, reqId, tickCount, (time, mask, priceBid, priceAsk, sizeBid, sizeAsk) * tickCount, done
+
+    Returns (reqId, ticks, done)
+    tick = (time, priceBid, priceAsk, sizeBid, sizeAsk, mask)
+    """
+    count = int(fields[2])
+    end = 3 + count * 6
+    ticks = []
+    append = ticks.append
+    for i in range(3, end, 6):
+        time, mask, bid, ask, bid_size, ask_size = fields[i : i + 6]
+        append(
+            (
+                int(time),
+                float(bid or 0),
+                float(ask or 0),
+                _decimal(bid_size),
+                _decimal(ask_size),
+                int(mask or 0),
+            )
+        )
+    return int(fields[1]), ticks, bool(int(fields[end]))
+
+
+def parse_historical_ticks_last(fields: tuple[bytes]) -> tuple:
+    """
+    98: historicalTicksLast
+    msgId, reqId, tickCount, (time, mask, price, size, exchange, specialConditions) * tickCount, done
+
+    Returns (reqId, ticks, done)
+    tick = (time, price, size, exchange, specialConditions, mask)
+    """
+    count = int(fields[2])
+    end = 3 + count * 6
+    ticks = []
+    append = ticks.append
+    for i in range(3, end, 6):
+        time, mask, price, size, exchange, conditions = fields[i : i + 6]
+        append(
+            (
+                int(time),
+                float(price or 0),
+                _decimal(size),
+                exchange.decode(),
+                conditions.decode(),
+                int(mask or 0),
+            )
+        )
+    return int(fields[1]), ticks, bool(int(fields[end]))
+
+
+def parse_tick_by_tick(fields: tuple[bytes]) -> tuple | None:
+    """
+    99: tickByTick
+    only tickType=3 (BidAsk) is parsed, other tick types return None and fall back to the ibapi Decoder
+    msgId, reqId, tickType, time, bidPrice, askPrice, bidSize, askSize, mask
+
+    Returns (reqId, tick)
+    tick = (time, bidPrice, askPrice, bidSize, askSize, mask)
+    """
+    if int(fields[2]) != TICK_TYPE_BID_ASK:
+        return None
+    _, req_id, _, time, bid, ask, bid_size, ask_size, mask = fields[:9]
+    tick = (
+        int(time),
+        float(bid or 0),
+        float(ask or 0),
+        _decimal(bid_size),
+        _decimal(ask_size),
+        int(mask or 0),
+    )
+    return int(req_id), tick
+
+
+class FastDecoder:
+    """
+    Fast path decoder for the high volume incoming messages.
+
+    The ibapi Decoder decodes every field through a generic reflection based decode()
+    and builds an ibapi object per bar / tick before the wrapper method is called.
+    For the message ids with a registered handler the fields are parsed straight into
+    primitive tuples and passed to the handler, every other message falls back to the ibapi Decoder.
+    """
+
+    PARSERS: dict[int, Callable] = {
+        17: parse_historical_data,
+        50: parse_realtime_bar,
+        90: parse_historical_data_update,
+        97: parse_historical_ticks_bid_ask,
+        98: parse_historical_ticks_last,
+        99: parse_tick_by_tick,
+    }
+
+    def __init__(self, fallback: Decoder):
+        self._fallback = fallback
+        self._handlers: dict[bytes, tuple[Callable, Callable]] = {}
+
+    def register(self, msg_id: int, handler: Callable) -> None:
+        """
+        handler is called with the tuple returned by the parser of the message id unpacked as arguments
+        """
+        parser = self.PARSERS.get(msg_id)
+        if parser is None:
+            raise ValueError(f"No fast path parser for message id {msg_id}")
+        # keyed on the raw field to avoid an int() per message
+        self._handlers[str(msg_id).encode()] = (parser, handler)
+
+    def interpret(self, fields: tuple[bytes]) -> None:
+        entry = self._handlers.get(fields[0])
+        if entry is not None:
+            parser, handler = entry
+            parsed = parser(fields)
+            if parsed is not None:
+                handler(*parsed)
+                return
+        self._fallback.interpret(fields)
@@ -35,6 +35,29 @@ class WhatToShow(Enum):
         }
 
 
+class DuplicatePolicy(Enum):
+    """
+    Which bar is kept when windows overlap at a seam
+    KEEP_EXISTING keeps the bar of the newer window downloaded first
+    KEEP_INCOMING replaces it with the bar of the older window downloaded after
+    """
+
+    KEEP_EXISTING = 1
+    KEEP_INCOMING = 2
+
+
+class TaskStatus(Enum):
+    """
+    Status of a bulk download task in the checkpoint database
+    a RUNNING task found when the download starts was interrupted and is PENDING again
+    """
+
+    PENDING = 1
+    RUNNING = 2
+    FINISHED = 3
+    FAILED = 4
+
+
 class Frequency(Enum):
     SECOND = 1
     MINUTE = 2
@@ -70,6 +93,8 @@ class Duration:
             return pd.Timedelta(seconds=self.step)
         elif self.freq == Frequency.MINUTE:
             return pd.Timedelta(minutes=self.step)
+        elif self.freq == Frequency.HOUR:
+            return pd.Timedelta(hours=self.step)
         elif self.freq == Frequency.DAY:
             return pd.Timedelta(days=self.step)
         elif self.freq == Frequency.WEEK:
@@ -109,6 +134,16 @@ class BarSize(Enum):
 
         return f"{self.step} {key}{'' if self.step == 1 else 's'}"
 
+    def to_timedelta(self) -> pd.Timedelta:
+        if self.frequency == Frequency.SECOND:
+            return pd.Timedelta(seconds=self.step)
+        elif self.frequency == Frequency.MINUTE:
+            return pd.Timedelta(minutes=self.step)
+        elif self.frequency == Frequency.HOUR:
+            return pd.Timedelta(hours=self.step)
+        else:
+            return pd.Timedelta(days=self.step)
+
     def to_duration(self) -> Duration:
         if self.frequency == Frequency.MINUTE:
             return Duration(step=self.step * 60, freq=Frequency.SECOND)
@@ -160,7 +195,19 @@ class BarSize(Enum):
         elif self == BarSize._5_SECOND:
             return Duration(step=3600, freq=Frequency.SECOND)  # 1 hour = 3600 seconds
         else:
-            raise ValueError("TODO: Unsupported duration")
+            return self.allowed_durations()[-1]
+
+    def allowed_durations(self) -> list[Duration]:
+        """
+        Returns the durations IB allows for the bar size from the table in to_appropriate_duration, shortest first.
+        1 M is requested as 30 D and 1 Y as 365 D so every duration has a fixed length.
+        """
+        bar_size = self.to_timedelta()
+        return [
+            duration
+            for duration, smallest, largest in _DURATION_LIMITS
+            if smallest <= bar_size <= largest
+        ]
 
     # def to_duration(self) -> Duration:
     #     # special handling for HOUR and MINUTE because no DurationStr exists for them
@@ -170,3 +217,31 @@ class BarSize(Enum):
     #         return Duration(self.step * 60, Frequency.SECOND)
     #     else:
     #         return Duration(self.step, self.frequency)
+
+
+# (duration, smallest bar size, largest bar size) from the IB historical data limits
+_DURATION_LIMITS: list[tuple[Duration, pd.Timedelta, pd.Timedelta]] = [
+    (Duration(60, Frequency.SECOND), pd.Timedelta(seconds=1), pd.Timedelta(minutes=1)),
+    (Duration(120, Frequency.SECOND), pd.Timedelta(seconds=1), pd.Timedelta(minutes=2)),
+    (
+        Duration(1800, Frequency.SECOND),
+        pd.Timedelta(seconds=1),
+        pd.Timedelta(minutes=30),
+    ),
+    (Duration(3600, Frequency.SECOND), pd.Timedelta(seconds=5), pd.Timedelta(hours=1)),
+    (
+        Duration(14400, Frequency.SECOND),
+        pd.Timedelta(seconds=10),
+        pd.Timedelta(hours=3),
+    ),
+    (
+        Duration(28800, Frequency.SECOND),
+        pd.Timedelta(seconds=30),
+        pd.Timedelta(hours=8),
+    ),
+    (Duration(1, Frequency.DAY), pd.Timedelta(minutes=1), pd.Timedelta(days=1)),
+    (Duration(2, Frequency.DAY), pd.Timedelta(minutes=2), pd.Timedelta(days=1)),
+    (Duration(1, Frequency.WEEK), pd.Timedelta(minutes=3), pd.Timedelta(weeks=1)),
+    (Duration(30, Frequency.DAY), pd.Timedelta(minutes=30), pd.Timedelta(days=31)),
+    (Duration(365, Frequency.DAY), pd.Timedelta(days=1), pd.Timedelta(days=31)),
+]
@@ -1,26 +1,55 @@
+import asyncio
+import bisect
+import itertools
+import tempfile
+import time
 from collections import deque
+from collections.abc import AsyncIterator
 from pathlib import Path
 
 import pandas as pd
 from ibapi.common import BarData
 from ibapi.common import HistoricalTickBidAsk
+from ibapi.common import HistoricalTickLast
 from ibapi.contract import Contract as IBContract
 
+from pyfutures.client.cache import BarRangeCache
 from pyfutures.client.cache import BaseCache
+from pyfutures.client.cache import RequestsCache
+from pyfutures.client.checkpoint import DownloadCheckpoint
+from pyfutures.client.checkpoint import write_part
+from pyfutures.client.columns import BarColumns
 from pyfutures.client.client import InteractiveBrokersClient
 from pyfutures.client.enums import BarSize
+from pyfutures.client.enums import DuplicatePolicy
 from pyfutures.client.enums import Duration
 from pyfutures.client.enums import WhatToShow
+from pyfutures.client.objects import SeamStats
+from pyfutures.client.pacing import PacingScheduler
 from pyfutures.client.parsing import ClientParser
+from pyfutures.client.planner import DurationPlanner
+from pyfutures.client.pool import InteractiveBrokersClientPool
+from pyfutures.data.writer import ParquetWriter
 from pyfutures.logger import LoggerAdapter
+from pyfutures.schedule.calendar import MarketCalendar
+from pyfutures.schedule.schedule import MarketSchedule
 
 
 class InteractiveBrokersHistoricClient:
     def __init__(
         self,
-        client: InteractiveBrokersClient,
+        client: InteractiveBrokersClient | InteractiveBrokersClientPool,
+        pacing: PacingScheduler | None = None,
+        bar_cache: BarRangeCache | Path | None = None,
     ):
+        """
+        bar_cache: request_bars serves any range from the cache and downloads the uncovered gaps only
+        """
         self._client = client
+        self._pacing = pacing or PacingScheduler()
+        if isinstance(bar_cache, Path):
+            bar_cache = BarRangeCache(bar_cache)
+        self._bar_cache = bar_cache
         self._log = LoggerAdapter.from_name(name=type(self).__name__)
         self._parser = ClientParser()
 
@@ -36,80 +65,557 @@ class InteractiveBrokersHistoricClient:
         limit: int | None = None,
         cache: BaseCache | Path | None = None,
         delay: float = 0,
+        concurrency: int = 1,
+        duplicates: DuplicatePolicy = DuplicatePolicy.KEEP_EXISTING,
+        stats: SeamStats | None = None,
+        schedule: MarketSchedule | MarketCalendar | None = None,
+        split_bid_ask: bool = False,
+        writers: dict[WhatToShow, ParquetWriter] | None = None,
+        planner: DurationPlanner | None = None,
     ):
+        """
+        duration: fixed duration of every window, defaults to bar_size.to_appropriate_duration()
+        planner: chooses the duration of each window instead of duration, adapting it to
+            timeouts and response times, each request times out after planner.timeout_seconds.
+            The duration is part of the RequestsCache key, so planned windows are cached
+            under different keys than fixed duration windows
+        concurrency: number of duration windows requested at the same time, subject to pacing
+        the windows are stitched back in timestamp order
+        duplicates: bar kept where a window overlaps the bars already downloaded
+        stats: updated with the seams, duplicates dropped, gaps found and windows skipped,
+            windows that time out with the shortest duration are logged and added to stats.failed
+        schedule: windows without a trading session in the schedule are skipped instead of requested
+        split_bid_ask: a single BID_ASK download is split into BID, ASK and MIDPOINT bars,
+            returned as a dict and cached under the keys of their own requests
+        writers: the bars of each WhatToShow are written with writer.write_dataframe()
+        """
         # assert is_unqualified_contract(contract)
+        assert not split_bid_ask or what_to_show == WhatToShow.BID_ASK
 
-        # assert start_time is not None and end_time is not None  # TODO
-        # TODO: floor start_time and end_time to second
-        # TODO: check start_time is >= head_timestamp
-        if end_time is None:
-            end_time = pd.Timestamp.utcnow()
+        start_time, end_time = await self._resolve_range(
+            contract=contract,
+            what_to_show=what_to_show,
+            start_time=start_time,
+            end_time=end_time,
+        )
 
-        if start_time is None:
-            self._log.info(f"requesting head_timestamp for {contract.tradingClass}")
-            start_time = await self._client.request_head_timestamp(
+        assert duration is None or planner is None
+        if planner is None:
+            # fixed duration windows with the client request timeout
+            planner = DurationPlanner(
+                bar_size=bar_size,
+                durations=[duration or bar_size.to_appropriate_duration()],
+                timeout_seconds=None,
+            )
+
+        if stats is None:
+            stats = SeamStats()
+
+        kwargs = dict(
+            contract=contract,
+            bar_size=bar_size,
+            what_to_show=what_to_show,
+            planner=planner,
+            cache=cache,
+            delay=delay,
+            concurrency=concurrency,
+            duplicates=duplicates,
+            stats=stats,
+            schedule=schedule,
+            split_bid_ask=split_bid_ask,
+        )
+
+        try:
+            if self._bar_cache is None:
+                planner.plan(start_time, end_time)
+                total_bars, _ = await self._download_windows(
+                    start_time=start_time,
+                    end_time=end_time.ceil(planner.duration.to_timedelta()),
+                    limit=limit,
+                    **kwargs,
+                )
+            else:
+                total_bars = await self._request_cached_bars(
+                    start_time=start_time, end_time=end_time, **kwargs
+                )
+        finally:
+            if isinstance(cache, RequestsCache):
+                cache.flush()  # an IndexedRequestsCache buffers the windows downloaded
+
+        if limit is not None and len(total_bars) > limit:
+            total_bars = list(total_bars)[-limit:]  # last x number of bars in the list
+
+        self._log.debug(
+            f"Seams: {stats.seams}, duplicates dropped: {stats.duplicates}, gaps: {stats.gaps}, skipped: {stats.skipped}, failed: {len(stats.failed)}"
+        )
+
+        if split_bid_ask:
+            results = self._split_bid_ask_bars(total_bars)
+        else:
+            results = {what_to_show: total_bars}
+
+        for key, writer in (writers or {}).items():
+            # BarParquetWriter schema, volume is float64 rather than Decimal
+            writer.write_dataframe(BarColumns.from_bars(results[key]).to_dataframe())
+
+        if as_dataframe:
+            results = {
+                key: self._parser.bar_data_to_dataframe(bars)
+                for key, bars in results.items()
+            }
+
+        return results if split_bid_ask else results[what_to_show]
+
+    async def _request_cached_bars(
+        self,
+        contract: IBContract,
+        bar_size: BarSize,
+        what_to_show: WhatToShow,
+        planner: DurationPlanner,
+        start_time: pd.Timestamp,
+        end_time: pd.Timestamp,
+        split_bid_ask: bool = False,
+        **kwargs,
+    ) -> list[BarData]:
+        """
+        Downloads the gaps of [start_time, end_time) missing from the bar cache and
+        returns the range from the cache.
+        """
+        key = self._bar_cache.build_key(
+            contract=contract,
+            bar_size=bar_size,
+            what_to_show=what_to_show,
+        )
+
+        # the newest bar is not covered until it has closed
+        closed = pd.Timestamp.utcnow().floor(bar_size.to_timedelta())
+        uncached: list[BarData] = []
+
+        for gap_start, gap_end in self._bar_cache.gaps(key, start_time, end_time):
+            self._log.debug(f"{key} | downloading gap {gap_start} -> {gap_end}")
+            planner.plan(gap_start, gap_end)
+            window_end = gap_end.ceil(planner.duration.to_timedelta())
+
+            bars, covered = await self._download_windows(
                 contract=contract,
+                bar_size=bar_size,
                 what_to_show=what_to_show,
+                planner=planner,
+                start_time=gap_start,
+                end_time=window_end,
+                split_bid_ask=split_bid_ask,
+                **kwargs,
             )
-            self._log.info(f"head_timestamp: {start_time}")
+            bars = list(bars)
 
-        assert start_time < end_time
+            # windows that failed are left uncovered and downloaded again by the next request
+            covered = [(s, min(e, closed)) for s, e in covered if s < min(e, closed)]
 
-        if duration is None:
-            duration = bar_size.to_appropriate_duration()
+            series = {key: bars}
+            if split_bid_ask:
+                for split_what_to_show, split_bars in self._split_bid_ask_bars(
+                    bars
+                ).items():
+                    split_key = self._bar_cache.build_key(
+                        contract=contract,
+                        bar_size=bar_size,
+                        what_to_show=split_what_to_show,
+                    )
+                    series[split_key] = split_bars
 
-        interval = duration.to_timedelta()
+            for series_key, series_bars in series.items():
+                for span_start, span_end in covered:
+                    self._bar_cache.add(series_key, span_start, span_end, series_bars)
 
-        end_time = end_time.ceil(interval)
+            uncached.extend(
+                b
+                for b in bars
+                if gap_start <= b.timestamp < end_time
+                and not any(s <= b.timestamp < e for s, e in covered)
+            )
 
-        total_bars = deque()
+        return self._bar_cache.get(key, start_time, end_time) + uncached
 
-        i = 0
-        while end_time > start_time:
-            self._log.info(
-                f"{contract} | {end_time - interval} -> {end_time} | use_cache={cache}"
-            )
+    async def _download_windows(
+        self,
+        contract: IBContract,
+        bar_size: BarSize,
+        what_to_show: WhatToShow,
+        planner: DurationPlanner,
+        start_time: pd.Timestamp,
+        end_time: pd.Timestamp,
+        cache: BaseCache | Path | None,
+        delay: float,
+        concurrency: int,
+        duplicates: DuplicatePolicy,
+        stats: SeamStats,
+        schedule: MarketSchedule | MarketCalendar | None = None,
+        split_bid_ask: bool = False,
+        limit: int | None = None,
+    ) -> tuple[deque[BarData], list[tuple[pd.Timestamp, pd.Timestamp]]]:
+        """
+        Requests the windows newest first from end_time back to start_time and stitches them in timestamp order.
+        Each window is sized by the planner when it is sent, a window that times out is requested
+        again with shorter windows, ahead of the older windows already in flight.
+        Windows without a session in the schedule are skipped.
+        Returns the bars and the spans covered by the windows downloaded or skipped, oldest first.
+        """
 
-            bars: list[BarData] = await self._client.request_bars(
+        async def request(window_end: pd.Timestamp, duration: Duration) -> tuple:
+            start = time.perf_counter()
+            bars = await self._request_window(
                 contract=contract,
                 bar_size=bar_size,
                 what_to_show=what_to_show,
                 duration=duration,
-                end_time=end_time,
+                window_end=window_end,
                 cache=cache,
-                as_dataframe=False,
                 delay=delay,
+                timeout_seconds=planner.timeout_seconds,
+            )
+            if split_bid_ask and cache is not None:
+                self._cache_split_window(
+                    cache=cache,
+                    contract=contract,
+                    bar_size=bar_size,
+                    duration=duration,
+                    window_end=window_end,
+                    bars=bars,
+                )
+            return bars, time.perf_counter() - start
+
+        def send(window_end: pd.Timestamp) -> tuple:
+            duration = planner.duration
+            task = asyncio.ensure_future(request(window_end, duration))
+            return task, window_end, duration
+
+        def is_closed(window_end: pd.Timestamp) -> bool:
+            if schedule is None:
+                return False
+            window_start = window_end - planner.duration.to_timedelta()
+            if schedule.is_open_between(window_start, window_end):
+                return False
+            self._log.info(
+                f"{contract} | {window_start} -> {window_end} skipped, no trading sessions in {schedule}"
             )
+            stats.skipped += 1
+            return True
+
+        interval = bar_size.to_timedelta()
+
+        total_bars = deque()
+        pending: deque[tuple] = deque()
+        covered: list[tuple[pd.Timestamp, pd.Timestamp]] = []
+        cursor = end_time
 
-            assert pd.Series(b.timestamp for b in bars).is_monotonic_increasing
+        try:
+            while cursor > start_time or pending:
+                # keep the next windows in flight while the newest is awaited
+                while cursor > start_time and len(pending) < concurrency:
+                    window_start = cursor - planner.duration.to_timedelta()
+                    if is_closed(cursor):
+                        covered.append((window_start, cursor))
+                    else:
+                        pending.append(send(cursor))
+                    cursor = window_start
 
-            total_bars.extendleft(bars[::-1])
+                if not pending:
+                    break  # the remaining windows were skipped
 
-            assert pd.Series(b.timestamp for b in total_bars).is_monotonic_increasing
+                task, window_end, duration = pending.popleft()
+                window_start = window_end - duration.to_timedelta()
 
-            if len(bars) > 0:
-                self._log.debug(
-                    f"---> Downloaded {len(bars)} bars. {bars[0].timestamp} {bars[-1].timestamp}. Total = {len(total_bars)}"
+                try:
+                    bars, seconds = await task
+                    planner.on_response(seconds)
+                except asyncio.TimeoutError:
+                    if planner.on_timeout():
+                        retries = []
+                        retry_end = window_end
+                        while retry_end > window_start:
+                            retry_start = retry_end - planner.duration.to_timedelta()
+                            if is_closed(retry_end):
+                                covered.append((retry_start, retry_end))
+                            else:
+                                retries.append(send(retry_end))
+                            retry_end = retry_start
+                        pending.extendleft(reversed(retries))
+                        continue
+
+                    self._log.error(
+                        f"{contract} | {window_start} -> {window_end} timed out with the shortest duration {duration}"
+                    )
+                    stats.failed.append((window_start, window_end))
+                    bars = []
+                else:
+                    covered.append((window_start, window_end))
+
+                assert pd.Series(b.timestamp for b in bars).is_monotonic_increasing
+
+                self._merge_window(
+                    total_bars=total_bars,
+                    bars=bars,
+                    interval=interval,
+                    duplicates=duplicates,
+                    stats=stats,
                 )
+
+                if len(bars) > 0:
+                    self._log.debug(
+                        f"---> Downloaded {len(bars)} bars. {bars[0].timestamp} {bars[-1].timestamp}. Total = {len(total_bars)}"
+                    )
+                else:
+                    self._log.debug(
+                        f"---> Downloaded 0 bars. Total = {len(total_bars)}"
+                    )
+
+                if limit is not None and len(total_bars) >= limit:
+                    break
+        finally:
+            for task, _, _ in pending:
+                task.cancel()
+
+        return total_bars, self._merge_spans(covered)
+
+    @staticmethod
+    def _merge_spans(
+        spans: list[tuple[pd.Timestamp, pd.Timestamp]],
+    ) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Merges the spans that overlap or touch, oldest first
+        """
+        merged = []
+        for start, end in sorted(spans):
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    def _cache_split_window(
+        self,
+        cache: BaseCache | Path,
+        contract: IBContract,
+        bar_size: BarSize,
+        duration: Duration,
+        window_end: pd.Timestamp,
+        bars: list[BarData],
+    ) -> None:
+        """
+        Sets the BID, ASK and MIDPOINT bars of a BID_ASK window under the keys of their own requests
+        """
+        if isinstance(cache, Path):
+            cache = RequestsCache(cache)
+
+        for what_to_show, split_bars in self._split_bid_ask_bars(bars).items():
+            key = RequestsCache.build_key(
+                contract=contract,
+                bar_size=bar_size,
+                what_to_show=what_to_show,
+                duration=duration,
+                end_time=window_end,
+            )
+            if key not in cache:
+                cache.set(key, split_bars)
+
+    def _split_bid_ask_bars(
+        self, bars: list[BarData]
+    ) -> dict[WhatToShow, list[BarData]]:
+        splits = [self._parser.split_bid_ask_bar(bar) for bar in bars]
+        return {
+            what_to_show: [split[i] for split in splits]
+            for i, what_to_show in enumerate(
+                (WhatToShow.BID, WhatToShow.ASK, WhatToShow.MIDPOINT)
+            )
+        }
+
+    @staticmethod
+    def _merge_window(
+        total_bars: deque[BarData],
+        bars: list[BarData],
+        interval: pd.Timedelta,
+        duplicates: DuplicatePolicy,
+        stats: SeamStats,
+    ) -> None:
+        """
+        Prepends the bars of an older window, only the seam with the head of total_bars is
+        compared so the merge is linear in the size of the window
+        """
+        if len(bars) == 0:
+            return
+
+        if len(total_bars) == 0:
+            total_bars.extendleft(reversed(bars))
+            return
+
+        stats.seams += 1
+        head = total_bars[0].timestamp
+
+        if bars[-1].timestamp >= head:
+            if duplicates == DuplicatePolicy.KEEP_EXISTING:
+                overlap = bisect.bisect_left(bars, head, key=lambda b: b.timestamp)
+                stats.duplicates += len(bars) - overlap
+                bars = bars[:overlap]
             else:
-                self._log.debug(f"---> Downloaded 0 bars. Total = {len(total_bars)}")
+                last = bars[-1].timestamp
+                while len(total_bars) > 0 and total_bars[0].timestamp <= last:
+                    total_bars.popleft()
+                    stats.duplicates += 1
+
+        if len(bars) == 0:
+            return
+
+        if (
+            len(total_bars) > 0
+            and total_bars[0].timestamp - bars[-1].timestamp > interval
+        ):
+            stats.gaps += 1
+
+        total_bars.extendleft(reversed(bars))
+
+    async def stream_bars(
+        self,
+        contract: IBContract,
+        bar_size: BarSize,
+        what_to_show: WhatToShow,
+        duration: Duration | None = None,
+        start_time: pd.Timestamp | None = None,
+        end_time: pd.Timestamp | None = None,
+        cache: BaseCache | Path | None = None,
+        delay: float = 0,
+        concurrency: int = 1,
+    ) -> AsyncIterator[list[BarData]]:
+        """
+        Yields the bars of each duration window as it is downloaded, oldest window first.
+        At most concurrency windows are requested ahead of the consumer.
+        """
+        if duration is None:
+            duration = bar_size.to_appropriate_duration()
+
+        windows = await self._plan_windows(
+            contract=contract,
+            what_to_show=what_to_show,
+            duration=duration,
+            start_time=start_time,
+            end_time=end_time,
+        )
+        windows.reverse()
+
+        pending: deque[asyncio.Task] = deque()
 
+        try:
+            while windows or pending:
+                while windows and len(pending) < concurrency:
+                    pending.append(
+                        self._request_window(
+                            contract=contract,
+                            bar_size=bar_size,
+                            what_to_show=what_to_show,
+                            duration=duration,
+                            window_end=windows.popleft(),
+                            cache=cache,
+                            delay=delay,
+                        )
+                    )
+
+                bars: list[BarData] = await pending.popleft()
+
+                if len(bars) > 0:
+                    yield bars
+        finally:
+            for task in pending:
+                task.cancel()
+            if isinstance(cache, RequestsCache):
+                cache.flush()
+
+    async def _plan_windows(
+        self,
+        contract: IBContract,
+        what_to_show: WhatToShow,
+        duration: Duration,
+        start_time: pd.Timestamp | None,
+        end_time: pd.Timestamp | None,
+    ) -> deque[pd.Timestamp]:
+        """
+        Returns the end time of every duration window between start_time and end_time, newest first
+        """
+        start_time, end_time = await self._resolve_range(
+            contract=contract,
+            what_to_show=what_to_show,
+            start_time=start_time,
+            end_time=end_time,
+        )
+
+        interval = duration.to_timedelta()
+
+        end_time = end_time.ceil(interval)
+
+        windows = deque()
+        while end_time > start_time:
+            windows.append(end_time)
             end_time = end_time - interval
 
-            i += 1
+        return windows
 
-            if limit is not None and len(total_bars) >= limit:
-                total_bars = list(total_bars)[
-                    -limit:
-                ]  # last x number of bars in the list
-                break
+    async def _resolve_range(
+        self,
+        contract: IBContract,
+        what_to_show: WhatToShow,
+        start_time: pd.Timestamp | None,
+        end_time: pd.Timestamp | None,
+    ) -> tuple[pd.Timestamp, pd.Timestamp]:
+        """
+        end_time defaults to now and start_time to the head timestamp of the contract
+        """
+        # TODO: floor start_time and end_time to second
+        # TODO: check start_time is >= head_timestamp
+        if end_time is None:
+            end_time = pd.Timestamp.utcnow()
 
-        if as_dataframe:
-            return pd.DataFrame(
-                [self._parser.bar_data_to_dict(obj) for obj in total_bars]
+        if start_time is None:
+            self._log.info(f"requesting head_timestamp for {contract.tradingClass}")
+            start_time = await self._client.request_head_timestamp(
+                contract=contract,
+                what_to_show=what_to_show,
             )
+            self._log.info(f"head_timestamp: {start_time}")
 
-        return total_bars
+        assert start_time < end_time
+
+        return start_time, end_time
+
+    def _request_window(
+        self,
+        contract: IBContract,
+        bar_size: BarSize,
+        what_to_show: WhatToShow,
+        duration: Duration,
+        window_end: pd.Timestamp,
+        cache: BaseCache | Path | None,
+        delay: float,
+        timeout_seconds: float | None = None,
+    ) -> asyncio.Task:
+        """
+        timeout_seconds: the request raises asyncio.TimeoutError after it instead of returning no bars
+        """
+        self._log.info(
+            f"{contract} | {window_end - duration.to_timedelta()} -> {window_end} | use_cache={cache}"
+        )
+        return asyncio.ensure_future(
+            self._client.request_bars(
+                contract=contract,
+                bar_size=bar_size,
+                what_to_show=what_to_show,
+                duration=duration,
+                end_time=window_end,
+                cache=cache,
+                as_dataframe=False,
+                delay=delay,
+                pacing=self._pacing,
+                timeout_seconds=timeout_seconds,
+                raise_timeout=timeout_seconds is not None,
+            )
+        )
 
     async def request_quotes(
         self,
@@ -120,6 +626,7 @@ class InteractiveBrokersHistoricClient:
         limit: int | None = None,
         cache: BaseCache | Path | None = None,
         delay: float = 0,
+        writer: ParquetWriter | None = None,
     ):
         """
         if end_time is passed only:
@@ -136,7 +643,243 @@ class InteractiveBrokersHistoricClient:
             start_time=None, end_time=end_time
             first_tick = x
             break on first tick timestamp
+
+        writer: the quotes are written with writer.write_dataframe() in timestamp order,
+        pages are kept in temporary files rather than in memory until the download finishes,
+        the number of quotes written is returned
+        """
+        return await self._request_ticks(
+            contract=contract,
+            what_to_show=WhatToShow.BID_ASK,
+            start_time=start_time,
+            end_time=end_time,
+            as_dataframe=as_dataframe,
+            writer=writer,
+        )
+
+    async def request_trades(
+        self,
+        contract: IBContract,
+        start_time: pd.Timestamp = None,
+        end_time: pd.Timestamp = None,
+        as_dataframe: bool = False,
+        writer: ParquetWriter | None = None,
+    ):
         """
+        writer: the trades are written with writer.write_dataframe() in timestamp order,
+        pages are kept in temporary files rather than in memory until the download finishes,
+        the number of trades written is returned
+        """
+        return await self._request_ticks(
+            contract=contract,
+            what_to_show=WhatToShow.TRADES,
+            start_time=start_time,
+            end_time=end_time,
+            as_dataframe=as_dataframe,
+            writer=writer,
+        )
+
+    async def stream_quotes(
+        self,
+        contract: IBContract,
+        start_time: pd.Timestamp | None = None,
+        end_time: pd.Timestamp | None = None,
+        count: int = 1000,
+    ) -> AsyncIterator[list[HistoricalTickBidAsk]]:
+        """
+        Yields each page of quotes as it is downloaded, paginating backwards from end_time.
+        Pages are yielded newest first, the quotes within a page are in timestamp order.
+        """
+        async for quotes in self._stream_ticks(
+            contract=contract,
+            what_to_show=WhatToShow.BID_ASK,
+            start_time=start_time,
+            end_time=end_time,
+            count=count,
+        ):
+            yield quotes
+
+    async def stream_trades(
+        self,
+        contract: IBContract,
+        start_time: pd.Timestamp | None = None,
+        end_time: pd.Timestamp | None = None,
+        count: int = 1000,
+    ) -> AsyncIterator[list[HistoricalTickLast]]:
+        """
+        Yields each page of trades as it is downloaded, paginating backwards from end_time.
+        Pages are yielded newest first, the trades within a page are in timestamp order.
+        """
+        async for trades in self._stream_ticks(
+            contract=contract,
+            what_to_show=WhatToShow.TRADES,
+            start_time=start_time,
+            end_time=end_time,
+            count=count,
+        ):
+            yield trades
+
+    async def download_ticks(
+        self,
+        contract: IBContract,
+        what_to_show: WhatToShow,
+        start_time: pd.Timestamp,
+        end_time: pd.Timestamp,
+        path: Path,
+        concurrency: int = 4,
+        schedule: MarketSchedule | MarketCalendar | None = None,
+    ) -> list[Path]:
+        """
+        Downloads the quotes (BID_ASK) or trades (TRADES) of [start_time, end_time) in session or day shards,
+        concurrency shards are paginated at the same time subject to pacing.
+        Each finished shard is written to its own Parquet part in path and recorded in the checkpoint
+        path/checkpoint.sqlite, the shards already recorded are skipped when the download is run again.
+        schedule: shards run from one session open to the next instead of midnight to midnight
+        Returns the parts of the range in timestamp order.
+        """
+        path = Path(path)
+        checkpoint = DownloadCheckpoint(path / "checkpoint.sqlite")
+
+        shards = self._plan_shards(start_time, end_time, schedule)
+        finished = checkpoint.finished()
+        remaining = [s for s in shards if self._shard_key(*s) not in finished]
+        self._log.info(
+            f"{contract} | {len(shards) - len(remaining)}/{len(shards)} shards already downloaded"
+        )
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def download(shard_start: pd.Timestamp, shard_end: pd.Timestamp) -> None:
+            async with semaphore:
+                pages = [
+                    ticks
+                    async for ticks in self._stream_ticks(
+                        contract=contract,
+                        what_to_show=what_to_show,
+                        start_time=shard_start,
+                        end_time=shard_end,
+                    )
+                ]
+
+            key = self._shard_key(shard_start, shard_end)
+            ticks = list(itertools.chain.from_iterable(reversed(pages)))
+            if len(ticks) > 0:
+                write_part(
+                    path=path / f"{key}.parquet",
+                    df=self._ticks_to_writer_dataframe(ticks, what_to_show),
+                )
+            checkpoint.set_finished(key, len(ticks))
+            self._log.info(
+                f"{contract} | {shard_start} -> {shard_end} | {len(ticks)} ticks"
+            )
+
+        try:
+            results = await asyncio.gather(
+                *(download(*shard) for shard in remaining), return_exceptions=True
+            )
+        finally:
+            checkpoint.close()
+
+        for (shard_start, shard_end), result in zip(remaining, results):
+            if isinstance(result, BaseException):
+                self._log.error(
+                    f"{contract} | {shard_start} -> {shard_end} failed, resumed on the next run: {result!r}"
+                )
+
+        parts = (path / f"{self._shard_key(*shard)}.parquet" for shard in shards)
+        return [part for part in parts if part.exists()]
+
+    @staticmethod
+    def _plan_shards(
+        start_time: pd.Timestamp,
+        end_time: pd.Timestamp,
+        schedule: MarketSchedule | MarketCalendar | None = None,
+    ) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Splits [start_time, end_time) into shards from each session open in the schedule
+        to the next, or on the day boundaries without a schedule.
+        The first shard starts at the open or day boundary at or before start_time so the
+        shard keys do not depend on the exact start_time of a download.
+        """
+        if schedule is None:
+            bounds = list(
+                pd.date_range(start=start_time.floor("D"), end=end_time, freq="D")
+            )
+        else:
+            bounds = [
+                open for open, _ in schedule.sessions_between(start_time, end_time)
+            ]
+
+        bounds = [b for b in bounds if b < end_time] + [end_time]
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    @staticmethod
+    def _shard_key(start_time: pd.Timestamp, end_time: pd.Timestamp) -> str:
+        return f"{start_time.value}_{end_time.value}"
+
+    async def _request_ticks(
+        self,
+        contract: IBContract,
+        what_to_show: WhatToShow,
+        start_time: pd.Timestamp | None,
+        end_time: pd.Timestamp | None,
+        as_dataframe: bool,
+        writer: ParquetWriter | None,
+    ):
+        pages = self._stream_ticks(
+            contract=contract,
+            what_to_show=what_to_show,
+            start_time=start_time,
+            end_time=end_time,
+        )
+
+        if writer is not None:
+            return await self._write_ticks(pages, what_to_show, writer)
+
+        # pages are downloaded newest first and joined once in timestamp order
+        results = list(
+            itertools.chain.from_iterable(reversed([ticks async for ticks in pages]))
+        )
+
+        if as_dataframe:
+            return self._ticks_to_dataframe(results, what_to_show)
+
+        return results
+
+    async def _write_ticks(
+        self,
+        pages: AsyncIterator[list],
+        what_to_show: WhatToShow,
+        writer: ParquetWriter,
+    ) -> int:
+        """
+        Pages are downloaded newest first, each is kept in a temporary part named by its first timestamp
+        and the parts are written to the writer oldest first once the download finishes.
+        """
+        total = 0
+        with tempfile.TemporaryDirectory() as temp_dir:
+            parts = []
+            async for ticks in pages:
+                part = Path(temp_dir) / f"{ticks[0].timestamp.value}.parquet"
+                self._ticks_to_writer_dataframe(ticks, what_to_show).to_parquet(
+                    part, index=False
+                )
+                parts.append(part)
+                total += len(ticks)
+
+            for i, part in enumerate(reversed(parts)):
+                writer.write_dataframe(pd.read_parquet(part), append=i > 0)
+
+        return total
+
+    async def _stream_ticks(
+        self,
+        contract: IBContract,
+        what_to_show: WhatToShow,
+        start_time: pd.Timestamp | None,
+        end_time: pd.Timestamp | None,
+        count: int = 1000,
+    ) -> AsyncIterator[list]:
         if end_time is None:
             end_time = pd.Timestamp.utcnow()
 
@@ -144,38 +887,69 @@ class InteractiveBrokersHistoricClient:
             self._log.info(f"requesting head_timestamp for {contract.tradingClass}")
             start_time = await self._client.request_head_timestamp(
                 contract=contract,
-                what_to_show=WhatToShow.BID_ASK,
+                what_to_show=what_to_show,
             )
             self._log.info(f"head_timestamp: {start_time}")
 
-        results = []
+        if what_to_show == WhatToShow.BID_ASK:
+            request_ticks = self._client.request_quote_ticks
+        else:
+            request_ticks = self._client.request_trade_ticks
 
         while end_time > start_time:
             self._log.debug(f"Requesting: {contract.tradingClass} {end_time}")
 
-            quotes: list[HistoricalTickBidAsk] = await self._client.request_quote_ticks(
-                contract=contract,
-                end_time=end_time,
-                count=1000,
-            )
+            async with self._pacing.slot(
+                key=RequestsCache.build_key(
+                    contract=contract, what_to_show=what_to_show, end_time=end_time
+                ),
+                burst_key=RequestsCache.build_key(
+                    contract=contract, what_to_show=what_to_show
+                ),
+            ):
+                ticks: list = await request_ticks(
+                    contract=contract,
+                    start_time=None,
+                    end_time=end_time,
+                    count=count,
+                )
 
-            for quote in quotes:
-                assert quote.timestamp < end_time
+            if len(ticks) == 0:
+                break  # no ticks before end_time
 
-            end_time = quotes[0].timestamp
+            # IB returns a page in timestamp order, only the seam with the newer page is checked
+            assert ticks[0].timestamp <= ticks[-1].timestamp < end_time
 
-            quotes = [q for q in quotes if q.timestamp >= start_time]
-            assert pd.Series(q.timestamp for q in quotes).is_monotonic_increasing
+            end_time = ticks[0].timestamp
 
-            results = quotes + results
-            assert pd.Series(q.timestamp for q in results).is_monotonic_increasing
+            if end_time < start_time:
+                # the oldest page only
+                ticks = ticks[
+                    bisect.bisect_left(ticks, start_time, key=lambda t: t.timestamp) :
+                ]
 
-        if as_dataframe:
-            return pd.DataFrame(
-                [self._parser.historical_tick_bid_ask_to_dict(obj) for obj in results]
-            )
+            if len(ticks) > 0:
+                yield ticks
 
-        return results
+    def _ticks_to_dataframe(
+        self, ticks: list, what_to_show: WhatToShow
+    ) -> pd.DataFrame:
+        if what_to_show == WhatToShow.BID_ASK:
+            to_dict = self._parser.historical_tick_bid_ask_to_dict
+        else:
+            to_dict = self._parser.historical_tick_last_to_dict
+        return pd.DataFrame([to_dict(obj) for obj in ticks])
+
+    def _ticks_to_writer_dataframe(
+        self, ticks: list, what_to_show: WhatToShow
+    ) -> pd.DataFrame:
+        df = self._ticks_to_dataframe(ticks, what_to_show)
+        if what_to_show == WhatToShow.BID_ASK:
+            # QuoteTickParquetWriter schema
+            df = df.rename(columns={"bid": "bid_price", "ask": "ask_price"})
+            df["bid_size"] = df["bid_size"].astype(float)
+            df["ask_size"] = df["ask_size"].astype(float)
+        return df
 
 
 # caches.set_config(
@@ -0,0 +1,247 @@
+import asyncio
+import bisect
+import time
+from collections import defaultdict
+from collections import deque
+from collections.abc import Callable
+from collections.abc import Hashable
+
+from pyfutures.logger import LoggerAdapter
+
+
+# seconds, from a cached contract details lookup to a full 1 year minute bars request
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+    600.0,
+)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """
+        Returns the upper bound of the bucket containing the q quantile
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            if total >= rank:
+                return bound
+        return float("inf")
+
+
+class Rate:
+    """
+    Events per second over the last window_seconds
+    """
+
+    def __init__(self, window_seconds: float = 60, clock: Callable = time.monotonic):
+        self._window_seconds = window_seconds
+        self._clock = clock
+        self._events: deque[float] = deque()
+        self.count = 0
+
+    def mark(self) -> None:
+        now = self._clock()
+        self._events.append(now)
+        self.count += 1
+        self._expire(now)
+
+    def per_second(self) -> float:
+        self._expire(self._clock())
+        return len(self._events) / self._window_seconds
+
+    def _expire(self, now: float) -> None:
+        events = self._events
+        while events and now - events[0] > self._window_seconds:
+            events.popleft()
+
+
+class MetricsRegistry:
+    """
+    In-process metrics for the client and protocol.
+
+    - request latency histograms per request type
+    - in-flight requests per request type
+    - timeouts per request type and errors per IB error code
+    - inbound messages and bytes per message id
+    - subscription callback rates
+
+    render() returns the Prometheus text exposition format, serve() exposes it on a local port.
+    """
+
+    def __init__(self, clock: Callable = time.monotonic):
+        self._clock = clock
+        self.latency: dict[str, Histogram] = defaultdict(Histogram)
+        self.in_flight: dict[str, int] = defaultdict(int)
+        self.timeouts: dict[str, int] = defaultdict(int)
+        self.errors: dict[int, int] = defaultdict(int)
+        self.messages: dict[str, int] = defaultdict(int)
+        self.message_bytes: dict[str, int] = defaultdict(int)
+        self.callbacks: dict[str, Rate] = {}
+
+        self._server: asyncio.AbstractServer | None = None
+        self._log = LoggerAdapter.from_name(name=type(self).__name__)
+
+    ################################################################################################
+    # Recording
+
+    def request_started(self, name: str) -> None:
+        self.in_flight[name] += 1
+
+    def request_finished(
+        self, name: str, seconds: float, timed_out: bool = False
+    ) -> None:
+        self.in_flight[name] -= 1
+        if timed_out:
+            self.timeouts[name] += 1
+        else:
+            self.latency[name].observe(seconds)
+
+    def error_received(self, code: int) -> None:
+        self.errors[code] += 1
+
+    def message_received(self, msg_id: Hashable, size: int) -> None:
+        msg_id = msg_id.decode() if isinstance(msg_id, bytes) else str(msg_id)
+        self.messages[msg_id] += 1
+        self.message_bytes[msg_id] += size
+
+    def callback_called(self, name: str) -> None:
+        rate = self.callbacks.get(name)
+        if rate is None:
+            rate = self.callbacks[name] = Rate(clock=self._clock)
+        rate.mark()
+
+    ################################################################################################
+    # Exposition
+
+    def render(self) -> str:
+        lines = []
+
+        lines.append("# TYPE pyfutures_request_latency_seconds histogram")
+        for name, histogram in sorted(self.latency.items()):
+            total = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                total += count
+                lines.append(
+                    f'pyfutures_request_latency_seconds_bucket{{request="{name}",le="{bound}"}} {total}'
+                )
+            lines.append(
+                f'pyfutures_request_latency_seconds_bucket{{request="{name}",le="+Inf"}} {histogram.count}'
+            )
+            lines.append(
+                f'pyfutures_request_latency_seconds_sum{{request="{name}"}} {histogram.sum}'
+            )
+            lines.append(
+                f'pyfutures_request_latency_seconds_count{{request="{name}"}} {histogram.count}'
+            )
+
+        self._render_values(
+            lines, "pyfutures_requests_in_flight", "gauge", "request", self.in_flight
+        )
+        self._render_values(
+            lines,
+            "pyfutures_request_timeouts_total",
+            "counter",
+            "request",
+            self.timeouts,
+        )
+        self._render_values(
+            lines, "pyfutures_errors_total", "counter", "code", self.errors
+        )
+        self._render_values(
+            lines, "pyfutures_messages_total", "counter", "msg_id", self.messages
+        )
+        self._render_values(
+            lines,
+            "pyfutures_message_bytes_total",
+            "counter",
+            "msg_id",
+            self.message_bytes,
+        )
+        self._render_values(
+            lines,
+            "pyfutures_callbacks_total",
+            "counter",
+            "subscription",
+            {name: rate.count for name, rate in self.callbacks.items()},
+        )
+        self._render_values(
+            lines,
+            "pyfutures_callbacks_per_second",
+            "gauge",
+            "subscription",
+            {name: rate.per_second() for name, rate in self.callbacks.items()},
+        )
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_values(
+        lines: list[str], metric: str, kind: str, label: str, values: dict
+    ) -> None:
+        lines.append(f"# TYPE {metric} {kind}")
+        for key, value in sorted(values.items(), key=lambda x: str(x[0])):
+            lines.append(f'{metric}{{{label}="{key}"}} {value}')
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 9464) -> int:
+        """
+        Serves render() over HTTP for every request on host:port
+        Returns the bound port, pass port=0 to bind any free port
+        """
+        self._server = await asyncio.start_server(self._handle_http, host, port)
+        port = self._server.sockets[0].getsockname()[1]
+        self._log.info(f"Serving metrics on http://{host}:{port}/metrics")
+        return port
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+    async def _handle_http(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            # the request itself is ignored, every path returns the exposition
+            await reader.readuntil(b"\r\n\r\n")
+            body = self.render().encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/plain; version=0.0.4\r\n"
+                + f"Content-Length: {len(body)}\r\n".encode()
+                + b"Connection: close\r\n\r\n"
+                + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
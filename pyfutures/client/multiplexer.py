@@ -0,0 +1,80 @@
+import functools
+import itertools
+from collections.abc import Callable
+from collections.abc import Hashable
+
+from pyfutures.client.objects import ClientSubscription
+from pyfutures.logger import LoggerAdapter
+
+
+class SubscriptionMultiplexer:
+    """
+    Shares one IB subscription between every consumer subscribing with the same key.
+
+    The first consumer opens the IB subscription, each decoded update is fanned out
+    to the callbacks of all consumers. Every consumer is returned its own ClientSubscription,
+    cancelling it removes that consumer only and the IB subscription is cancelled
+    when the last consumer leaves.
+    """
+
+    def __init__(self):
+        self._subscriptions: dict[Hashable, ClientSubscription] = {}
+        self._callbacks: dict[Hashable, dict[int, Callable]] = {}
+        self._consumer_ids = itertools.count()
+        self._log = LoggerAdapter.from_name(name=type(self).__name__)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._subscriptions
+
+    def consumer_count(self, key: Hashable) -> int:
+        return len(self._callbacks.get(key, ()))
+
+    def subscribe(
+        self,
+        key: Hashable,
+        callback: Callable,
+        open_subscription: Callable[[Callable], ClientSubscription],
+    ) -> ClientSubscription:
+        """
+        open_subscription: opens the IB subscription with the callback passed, called for the first consumer only
+        """
+        subscription = self._subscriptions.get(key)
+        if subscription is None:
+            callbacks = self._callbacks[key] = {}
+            subscription = open_subscription(
+                callback=functools.partial(self._fan_out, callbacks)
+            )
+            self._subscriptions[key] = subscription
+        else:
+            self._log.debug(
+                f"Sharing subscription {subscription.id} with {self.consumer_count(key)} consumers"
+            )
+
+        consumer_id = next(self._consumer_ids)
+        self._callbacks[key][consumer_id] = callback
+
+        return ClientSubscription(
+            id=subscription.id,
+            subscribe=subscription.subscribe,
+            cancel=functools.partial(self._unsubscribe, key, consumer_id),
+            callback=callback,
+        )
+
+    def _unsubscribe(self, key: Hashable, consumer_id: int) -> None:
+        callbacks = self._callbacks.get(key)
+        if callbacks is None or consumer_id not in callbacks:
+            return  # already cancelled
+
+        del callbacks[consumer_id]
+
+        if len(callbacks) == 0:
+            del self._callbacks[key]
+            self._subscriptions.pop(key).cancel()
+
+    def _fan_out(self, callbacks: dict[int, Callable], obj) -> None:
+        # consumers receive the same object, a consumer can cancel from its callback
+        for callback in tuple(callbacks.values()):
+            try:
+                callback(obj)
+            except Exception as e:
+                self._log.exception("subscription callback exception: ", e)
@@ -3,6 +3,7 @@ from __future__ import annotations
 import asyncio
 from collections.abc import Callable
 from dataclasses import dataclass
+from dataclasses import field
 from decimal import Decimal
 
 import pandas as pd
@@ -12,6 +13,9 @@ from ibapi.execution import Execution as IBExecution
 from ibapi.order import Order as IBOrder
 from ibapi.order_state import OrderState as IBOrderState
 
+from pyfutures.client.enums import BarSize
+from pyfutures.client.enums import WhatToShow
+
 
 @dataclass
 class IBOpenOrderEvent:
@@ -77,6 +81,8 @@ class ClientRequest(asyncio.Future):
     id: int | str
     data: list | dict | None = None
     timeout_seconds: int = 5
+    name: str = "unknown"  # request type for metrics
+    start_time: float = 0.0  # time.perf_counter() when the request was created
 
     def __post_init__(self):
         super().__init__()
@@ -88,6 +94,145 @@ class ClientSubscription:
     subscribe: Callable
     cancel: Callable
     callback: Callable
+    resubscribe: Callable | None = None  # coroutine function used after a reconnect
+    last_timestamp: pd.Timestamp | None = None  # of the last bar delivered
+    backlog: list | None = (
+        None  # live updates held back while missed bars are backfilled
+    )
+
+
+@dataclass
+class SeamStats:
+    """
+    Counts for the seams between the windows of a historic bars download
+    seams: windows joined onto bars that were already downloaded
+    duplicates: bars dropped where windows overlapped
+    gaps: seams with more than one bar interval missing, including closed sessions
+    skipped: windows not requested because the schedule has no sessions in them
+    failed: [start, end) of the windows that timed out with the shortest duration, their bars are missing
+    """
+
+    seams: int = 0
+    duplicates: int = 0
+    gaps: int = 0
+    skipped: int = 0
+    failed: list[tuple[pd.Timestamp, pd.Timestamp]] = field(default_factory=list)
+
+
+@dataclass
+class BulkTask:
+    """
+    The bars of one universe row, bar size and what to show over [start_time, end_time)
+    """
+
+    key: str
+    uname: str
+    bar_size: BarSize
+    what_to_show: WhatToShow
+    start_time: pd.Timestamp
+    end_time: pd.Timestamp
+    priority: int = 0
+    attempts: int = 0
+
+
+@dataclass
+class BulkProgress:
+    """
+    Counts of a bulk download, rows and elapsed_seconds are for the current run only
+    """
+
+    total: int = 0
+    finished: int = 0
+    failed: int = 0
+    finished_run: int = 0
+    rows: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def remaining(self) -> int:
+        return self.total - self.finished - self.failed
+
+    @property
+    def tasks_per_second(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.finished_run / self.elapsed_seconds
+
+    @property
+    def rows_per_second(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.rows / self.elapsed_seconds
+
+    @property
+    def eta(self) -> pd.Timedelta | None:
+        if self.tasks_per_second == 0:
+            return None
+        return pd.Timedelta(seconds=self.remaining / self.tasks_per_second)
+
+    def __str__(self) -> str:
+        eta = "unknown" if self.eta is None else str(self.eta.floor("s"))
+        return (
+            f"{self.finished}/{self.total} finished, {self.failed} failed | "
+            f"{self.tasks_per_second * 60:.1f} tasks/min, {self.rows_per_second:.0f} rows/s | ETA {eta}"
+        )
+
+
+@dataclass
+class MetadataEntry:
+    """
+    A cached metadata value
+    fresh_until: served without a refresh until this time, after it the value is stale and refreshed in the background
+    expires: never served after this time, e.g. the expiry of the front contract
+    """
+
+    value: object
+    fresh_until: pd.Timestamp
+    expires: pd.Timestamp | None = None
+
+
+@dataclass
+class NegativeCachePolicy:
+    """
+    How long a failed request is cached before it is sent again, None is permanent
+    and pd.Timedelta(0) is not cached
+    messages: matched in the error message before the code, 162 is reported for every HMDS error
+        so only its "query returned no data" message is permanent
+    codes: IB error codes, 200 no security definition is permanent
+    """
+
+    messages: dict[str, pd.Timedelta | None] = field(
+        default_factory=lambda: {
+            "query returned no data": None,
+            "pacing violation": pd.Timedelta(minutes=10),
+            "query cancelled": pd.Timedelta(0),
+        }
+    )
+    codes: dict[int, pd.Timedelta | None] = field(
+        default_factory=lambda: {
+            162: pd.Timedelta(hours=1),  # Historical Market Data Service error
+            200: None,  # No security definition has been found for the request
+            322: pd.Timedelta(minutes=10),  # Error processing request
+            354: pd.Timedelta(days=1),  # Requested market data is not subscribed
+            366: pd.Timedelta(0),  # No historical data query found for ticker id
+        }
+    )
+    timeout_ttl: pd.Timedelta | None = pd.Timedelta(minutes=5)
+    default_ttl: pd.Timedelta | None = pd.Timedelta(hours=1)
+
+    def ttl(self, exception: Exception) -> pd.Timedelta | None:
+        if isinstance(exception, asyncio.TimeoutError):
+            return self.timeout_ttl
+
+        if not isinstance(exception, ClientException):
+            return self.default_ttl
+
+        message = exception.message.lower()
+        for text, ttl in self.messages.items():
+            if text in message:
+                return ttl
+
+        return self.codes.get(exception.code, self.default_ttl)
 
 
 class ClientException(Exception):
@@ -127,6 +272,11 @@ class ClientDisconnected(Exception):
         super().__init__(message)
 
 
+class StreamOverflow(Exception):
+    def __init__(self, message: str = None):
+        super().__init__(message)
+
+
 # class TimeoutError(asyncio.TimeoutError):
 #     """asyncio.TimeoutError that stores the timeout_seconds for use in Historic Client"""
 #
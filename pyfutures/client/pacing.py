@@ -0,0 +1,182 @@
+import asyncio
+import contextlib
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from collections.abc import Callable
+from collections.abc import Hashable
+
+from pyfutures.logger import LoggerAdapter
+
+
+class TokenBucket:
+    """
+    capacity tokens, refilled continuously at capacity / period_seconds
+    """
+
+    def __init__(
+        self, capacity: int, period_seconds: float, clock: Callable = time.monotonic
+    ):
+        self._capacity = capacity
+        self._rate = capacity / period_seconds
+        self._tokens = float(capacity)
+        self._clock = clock
+        self._last = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._last) * self._rate
+        )
+        self._last = now
+
+    def wait_seconds(self) -> float:
+        """
+        Returns the seconds until a token is available, 0 if available now
+        """
+        self._refill()
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self._rate
+
+    def consume(self) -> None:
+        self._refill()
+        self._tokens -= 1
+
+
+class PacingScheduler:
+    """
+    Releases historical data requests as soon as the IB pacing rules allow them.
+
+    https://interactivebrokers.github.io/tws-api/historical_limitations.html
+    - no more than max_requests within any window_seconds period (sliding window)
+    - no identical requests within identical_seconds
+    - fewer than 6 requests for the same contract, exchange and tick type within 2 seconds,
+      no more than burst_requests within any burst_seconds period per burst key (sliding window)
+    - no more than max_concurrent requests open at the same time
+    """
+
+    def __init__(
+        self,
+        max_requests: int = 60,
+        window_seconds: float = 60 * 10,
+        identical_seconds: float = 15,
+        burst_requests: int = 5,
+        burst_seconds: float = 2,
+        max_concurrent: int = 50,
+        clock: Callable = time.monotonic,
+    ):
+        self._max_requests = max_requests
+        self._window_seconds = window_seconds
+        self._identical_seconds = identical_seconds
+        self._burst_requests = burst_requests
+        self._burst_seconds = burst_seconds
+        self._max_concurrent = max_concurrent
+        self._clock = clock
+
+        self._sent: deque[float] = deque()  # send times within the sliding window
+        self._identical: dict[Hashable, float] = {}  # key -> last send time
+        self._bursts: dict[Hashable, deque[float]] = {}  # burst key -> send times
+        self._semaphore: asyncio.Semaphore | None = None
+        self._in_flight = 0
+
+        self._log = LoggerAdapter.from_name(name=type(self).__name__)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def wait_seconds(
+        self, key: Hashable | None = None, burst_key: Hashable | None = None
+    ) -> float:
+        """
+        Returns the seconds until a request with the given keys is allowed, 0 if allowed now
+        """
+        now = self._clock()
+
+        # sliding window
+        sent = self._sent
+        while sent and now - sent[0] >= self._window_seconds:
+            sent.popleft()
+        wait = 0.0
+        if len(sent) >= self._max_requests:
+            wait = sent[0] + self._window_seconds - now
+
+        # identical requests
+        if key is not None:
+            last = self._identical.get(key)
+            if last is not None:
+                wait = max(wait, last + self._identical_seconds - now)
+
+        # burst per contract, exchange and tick type
+        if burst_key is not None:
+            burst = self._bursts.get(burst_key)
+            if burst is not None:
+                while burst and now - burst[0] >= self._burst_seconds:
+                    burst.popleft()
+                if len(burst) >= self._burst_requests:
+                    wait = max(wait, burst[0] + self._burst_seconds - now)
+
+        return max(wait, 0.0)
+
+    async def acquire(
+        self, key: Hashable | None = None, burst_key: Hashable | None = None
+    ) -> None:
+        """
+        key identifies identical requests, burst_key identifies the contract, exchange and tick type
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrent)
+
+        await self._semaphore.acquire()
+        try:
+            while True:
+                wait = self.wait_seconds(key=key, burst_key=burst_key)
+                if wait <= 0:
+                    break
+                self._log.debug(f"Pacing {key} for {wait:.2f}s")
+                await asyncio.sleep(wait)
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+        self._record(key=key, burst_key=burst_key)
+        self._in_flight += 1
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._semaphore.release()
+
+    @contextlib.asynccontextmanager
+    async def slot(
+        self, key: Hashable | None = None, burst_key: Hashable | None = None
+    ) -> AsyncIterator[None]:
+        await self.acquire(key=key, burst_key=burst_key)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _record(self, key: Hashable | None, burst_key: Hashable | None) -> None:
+        now = self._clock()
+        self._sent.append(now)
+
+        if key is not None:
+            # forget identical keys that can no longer block a request
+            if len(self._identical) > self._max_requests:
+                self._identical = {
+                    k: t
+                    for k, t in self._identical.items()
+                    if now - t < self._identical_seconds
+                }
+            self._identical[key] = now
+
+        if burst_key is not None:
+            # forget burst keys that can no longer block a request
+            if len(self._bursts) > self._max_requests:
+                self._bursts = {
+                    k: times
+                    for k, times in self._bursts.items()
+                    if now - times[-1] < self._burst_seconds
+                }
+            self._bursts.setdefault(burst_key, deque()).append(now)
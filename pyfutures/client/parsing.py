@@ -1,6 +1,14 @@
+import copy
+import datetime
+import functools
+
+import numpy as np
 import pandas as pd
 from ibapi.common import BarData
 from ibapi.common import HistoricalTickBidAsk
+from ibapi.common import HistoricalTickLast
+from ibapi.common import TickAttribBidAsk
+from ibapi.common import TickAttribLast
 
 
 class ClientParser:
@@ -36,6 +44,38 @@ class ClientParser:
         bar.barCount = obj["barCount"]
         return bar
 
+    @classmethod
+    def bar_data_from_tuple(cls, obj: tuple) -> BarData:
+        """
+        obj = (date, open, high, low, close, volume, wap, barCount) from the FastDecoder
+        """
+        bar = BarData()
+        (
+            bar.date,
+            bar.open,
+            bar.high,
+            bar.low,
+            bar.close,
+            bar.volume,
+            bar.wap,
+            bar.barCount,
+        ) = obj
+        return bar
+
+    @classmethod
+    def split_bid_ask_bar(cls, obj: BarData) -> tuple[BarData, BarData, BarData]:
+        """
+        Returns the (bid, ask, midpoint) bars of a BID_ASK bar
+        BID_ASK: open = time average bid, high = max ask, low = min bid, close = time average ask
+        the bid and ask bars open and close at their time average, the bid bar keeps the min bid as
+        its low and the ask bar the max ask as its high, the midpoint bar is flat at the average midpoint
+        """
+        bid, ask, mid = (copy.copy(obj) for _ in range(3))
+        bid.open = bid.high = bid.close = obj.open
+        ask.open = ask.low = ask.close = obj.close
+        mid.open = mid.high = mid.low = mid.close = (obj.open + obj.close) / 2
+        return bid, ask, mid
+
     @classmethod
     def bar_data_from_dataframe(cls, df: pd.DataFrame) -> list[dict]:
         return [cls.bar_data_from_dict(d) for d in df.to_dict(orient="records")]
@@ -51,11 +91,108 @@ class ClientParser:
             "ask_size": obj.sizeAsk,
         }
 
+    @classmethod
+    def historical_tick_last_to_dict(cls, obj: HistoricalTickLast) -> dict:
+        return {
+            "timestamp": cls.parse_datetime(obj.time),
+            "time": obj.time,
+            "price": obj.price,
+            "size": obj.size,
+            "exchange": obj.exchange,
+            "specialConditions": obj.specialConditions,
+        }
+
+    @classmethod
+    def historical_tick_bid_ask_from_tuple(cls, obj: tuple) -> HistoricalTickBidAsk:
+        """
+        obj = (time, priceBid, priceAsk, sizeBid, sizeAsk, mask) from the FastDecoder
+        """
+        tick = HistoricalTickBidAsk()
+        tick.time, tick.priceBid, tick.priceAsk, tick.sizeBid, tick.sizeAsk, mask = obj
+        attrib = TickAttribBidAsk()
+        attrib.askPastHigh = mask & 1 != 0
+        attrib.bidPastLow = mask & 2 != 0
+        tick.tickAttribBidAsk = attrib
+        return tick
+
+    @classmethod
+    def historical_tick_last_from_tuple(cls, obj: tuple) -> HistoricalTickLast:
+        """
+        obj = (time, price, size, exchange, specialConditions, mask) from the FastDecoder
+        """
+        tick = HistoricalTickLast()
+        (
+            tick.time,
+            tick.price,
+            tick.size,
+            tick.exchange,
+            tick.specialConditions,
+            mask,
+        ) = obj
+        attrib = TickAttribLast()
+        attrib.pastLimit = mask & 1 != 0
+        attrib.unreported = mask & 2 != 0
+        tick.tickAttribLast = attrib
+        return tick
+
     @staticmethod
-    def parse_datetime(value: str) -> pd.Timestamp:
+    def tick_attrib_bid_ask_from_mask(mask: int) -> TickAttribBidAsk:
+        # tickByTick uses the opposite bit order to historicalTicksBidAsk
+        attrib = TickAttribBidAsk()
+        attrib.bidPastLow = mask & 1 != 0
+        attrib.askPastHigh = mask & 2 != 0
+        return attrib
+
+    @staticmethod
+    def parse_datetimes(values: np.ndarray) -> np.ndarray:
+        """
+        Vectorised parse_datetime for an array of int epochs or date strings of the same format.
+        The strings are parsed with numpy datetime64 arithmetic on their ascii digits.
+        Returns datetime64[ns] values in UTC.
+        """
+        values = np.asarray(values)
+        if len(values) == 0:
+            return np.array([], dtype="datetime64[ns]")
+
+        if values.dtype.kind in ("i", "u"):
+            # historical ticks int: DDDDDDDDDD
+            return (values.astype(np.int64) * _NANOS_PER_SECOND).astype(
+                "datetime64[ns]"
+            )
+
+        values = values.astype(bytes)
+        width = values.dtype.itemsize
+        if not (np.char.str_len(values) == width).all():
+            raise RuntimeError("Unable to parse timestamps of different formats")
+
+        if width == 10:
+            # < BarSize._1_HOUR historical bars -> str: "DDDDDDDDDD"
+            return (values.astype(np.int64) * _NANOS_PER_SECOND).astype(
+                "datetime64[ns]"
+            )
+
+        digits = np.frombuffer(values.tobytes(), dtype=np.uint8).reshape(-1, width) - 48
+        if width == 8:
+            # daily historical bars str: YYYYmmdd
+            return _to_datetime64(digits).astype("datetime64[ns]")
+        elif width == 17:
+            # formatDate=1 -> str: YYYYmmdd-HH:MM:SS
+            seconds = (
+                _digits_to_int(digits, 9, 11) * 3600
+                + _digits_to_int(digits, 12, 14) * 60
+                + _digits_to_int(digits, 15, 17)
+            )
+            return _to_datetime64(digits).astype("datetime64[ns]") + seconds.astype(
+                "timedelta64[s]"
+            )
+
+        raise RuntimeError("Unable to parse timestamp")
+
+    @staticmethod
+    def parse_datetime(value: str | int) -> pd.Timestamp:
         if isinstance(value, int):
             # historical ticks int: DDDDDDDDDD
-            return pd.to_datetime(value, unit="s", utc=True)
+            return pd.Timestamp(value, unit="s", tz=_UTC)
 
         # related to request_bars
         # when formatDate=1, timestamps return as 3 parts
@@ -63,12 +200,39 @@ class ClientParser:
 
         if isinstance(value, str) and len(value) == 8:
             # daily historical bars str: YYYYmmdd
-            return pd.to_datetime(value, format="%Y%m%d", utc=True)
+            return _parse_daily_date(value)
         elif isinstance(value, str) and len(value) == 10:
             # < BarSize._1_HOUR historical bars -> str: "DDDDDDDDDD"
-            return pd.to_datetime(int(value), unit="s", utc=True)
+            return pd.Timestamp(int(value), unit="s", tz=_UTC)
         elif isinstance(value, str) and len(value) == 17:
             # formatDate=1
             return pd.to_datetime(value, format="%Y%m%d-%H:%M:%S", utc=True)
 
         raise RuntimeError("Unable to parse timestamp")
+
+
+_UTC = datetime.timezone.utc
+
+_NANOS_PER_SECOND = 1_000_000_000
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_daily_date(value: str) -> pd.Timestamp:
+    # the same daily dates are parsed repeatedly across contracts and requests
+    return pd.to_datetime(value, format="%Y%m%d", utc=True)
+
+
+def _digits_to_int(digits: np.ndarray, start: int, stop: int) -> np.ndarray:
+    powers = 10 ** np.arange(stop - start - 1, -1, -1, dtype=np.int64)
+    return digits[:, start:stop].astype(np.int64) @ powers
+
+
+def _to_datetime64(digits: np.ndarray) -> np.ndarray:
+    """
+    digits starting with YYYYmmdd -> datetime64[D]
+    """
+    year = _digits_to_int(digits, 0, 4)
+    month = _digits_to_int(digits, 4, 6)
+    day = _digits_to_int(digits, 6, 8)
+    months = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    return months.astype("datetime64[D]") + (day - 1).astype("timedelta64[D]")
@@ -0,0 +1,78 @@
+import math
+
+import pandas as pd
+
+from pyfutures.client.enums import BarSize
+from pyfutures.client.enums import Duration
+from pyfutures.logger import LoggerAdapter
+
+
+class DurationPlanner:
+    """
+    Chooses the duration of each historical bars request of a download.
+
+    plan() picks the duration allowed for the bar size that needs the fewest requests
+    for the range, the shortest of those so no more data than needed is requested per window.
+    A timeout shrinks the windows by one step and caps the duration for the rest of the download,
+    a response faster than fast_seconds grows them by one step back towards the planned duration.
+    """
+
+    def __init__(
+        self,
+        bar_size: BarSize,
+        durations: list[Duration] | None = None,
+        timeout_seconds: float | None = 120,
+        fast_seconds: float = 5,
+    ):
+        """
+        durations: the durations to choose from shortest first, defaults to all durations allowed for the bar size
+        timeout_seconds: timeout of each request
+        """
+        self.bar_size = bar_size
+        self.durations = durations or bar_size.allowed_durations()
+        self.timeout_seconds = timeout_seconds
+        self._fast_seconds = fast_seconds
+
+        self._planned = len(self.durations) - 1
+        self._limit = self._planned
+        self._index = self._planned
+
+        self._log = LoggerAdapter.from_name(name=type(self).__name__)
+
+    @property
+    def duration(self) -> Duration:
+        return self.durations[self._index]
+
+    def plan(self, start_time: pd.Timestamp, end_time: pd.Timestamp) -> Duration:
+        """
+        Sets the duration for a download of [start_time, end_time)
+        """
+        span = end_time - start_time
+        counts = [
+            math.ceil(span / duration.to_timedelta()) for duration in self.durations
+        ]
+        self._planned = counts.index(min(counts))
+        self._index = min(self._planned, self._limit)
+
+        self._log.debug(
+            f"{self.bar_size} {start_time} -> {end_time}: {counts[self._index]} requests of {self.duration}"
+        )
+        return self.duration
+
+    def on_timeout(self) -> bool:
+        """
+        Returns False when the duration is already the shortest
+        """
+        if self._index == 0:
+            return False
+
+        self._index -= 1
+        self._limit = self._index
+        self._log.info(f"Request timed out, shrinking duration to {self.duration}")
+        return True
+
+    def on_response(self, seconds: float) -> None:
+        if seconds < self._fast_seconds and self._index < self._planned:
+            self._index += 1
+            self._limit = max(self._limit, self._index)
+            self._log.debug(f"Fast response, growing duration to {self.duration}")
@@ -0,0 +1,163 @@
+import asyncio
+import itertools
+from collections.abc import Callable
+from collections.abc import Sequence
+
+from ibapi.contract import Contract as IBContract
+from ibapi.contract import ContractDetails as IBContractDetails
+
+from pyfutures.client.cache import MetadataCache
+from pyfutures.client.cache import NegativeCache
+from pyfutures.client.client import InteractiveBrokersClient
+from pyfutures.client.enums import BarSize
+from pyfutures.client.enums import WhatToShow
+from pyfutures.client.objects import ClientSubscription
+from pyfutures.logger import LoggerAdapter
+
+
+class InteractiveBrokersClientPool:
+    """
+    Opens one InteractiveBrokersClient per client id to the same gateway.
+
+    The first client id is reserved for order traffic, historical requests and subscriptions
+    are routed to the data client with the least requests and subscriptions open.
+    Every client owns its own Connection, request ids and subscriptions, so responses
+    are always handled by the client whose socket sent the request.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        host: str = "127.0.0.1",
+        port: int = 4002,
+        client_ids: Sequence[int] = (1, 2, 3),
+        request_timeout_seconds: float | int | None = 5,
+        metadata_cache: MetadataCache | None = None,
+        negative_cache: NegativeCache | None = None,
+    ):
+        if len(client_ids) < 2:
+            raise ValueError("At least one order and one data client id is required")
+        if len(set(client_ids)) != len(client_ids):
+            raise ValueError(f"Duplicate client ids {client_ids}")
+
+        self._log = LoggerAdapter.from_name(name=type(self).__name__)
+
+        clients = [
+            InteractiveBrokersClient(
+                loop=loop,
+                host=host,
+                port=port,
+                client_id=client_id,
+                request_timeout_seconds=request_timeout_seconds,
+                metadata_cache=metadata_cache,  # shared by every client
+                negative_cache=negative_cache,
+            )
+            for client_id in client_ids
+        ]
+        self.order_client: InteractiveBrokersClient = clients[0]
+        self.data_clients: list[InteractiveBrokersClient] = clients[1:]
+        self._round_robin = itertools.cycle(range(len(self.data_clients)))
+
+    @property
+    def clients(self) -> list[InteractiveBrokersClient]:
+        return [self.order_client, *self.data_clients]
+
+    async def connect(self) -> None:
+        await asyncio.gather(*(client.connect() for client in self.clients))
+
+    def next_client(self) -> InteractiveBrokersClient:
+        """
+        Returns the data client with the least requests and subscriptions open,
+        ties are broken round robin so idle clients share the load
+        """
+        start = next(self._round_robin)
+        count = len(self.data_clients)
+        candidates = [self.data_clients[(start + i) % count] for i in range(count)]
+        return min(
+            candidates,
+            key=lambda client: len(client._requests) + len(client._subscriptions),
+        )
+
+    ################################################################################################
+    # Historical requests
+
+    async def request_bars(self, **kwargs):
+        return await self.next_client().request_bars(**kwargs)
+
+    async def request_last_bar(self, **kwargs):
+        return await self.next_client().request_last_bar(**kwargs)
+
+    async def request_head_timestamp(self, **kwargs):
+        return await self.next_client().request_head_timestamp(**kwargs)
+
+    async def request_quote_ticks(self, **kwargs):
+        return await self.next_client().request_quote_ticks(**kwargs)
+
+    async def request_trade_ticks(self, **kwargs):
+        return await self.next_client().request_trade_ticks(**kwargs)
+
+    async def request_historical_schedule(self, **kwargs):
+        return await self.next_client().request_historical_schedule(**kwargs)
+
+    async def request_contract_details(
+        self, contract: IBContract, **kwargs
+    ) -> list[IBContractDetails]:
+        return await self.next_client().request_contract_details(contract, **kwargs)
+
+    ################################################################################################
+    # Streaming requests
+    # a stream is read to the end from the data client it was started on
+
+    def stream_bars(self, **kwargs):
+        return self.next_client().stream_bars(**kwargs)
+
+    def stream_quote_ticks(self, **kwargs):
+        return self.next_client().stream_quote_ticks(**kwargs)
+
+    def stream_trade_ticks(self, **kwargs):
+        return self.next_client().stream_trade_ticks(**kwargs)
+
+    ################################################################################################
+    # Subscriptions
+    # the returned ClientSubscription cancels on the client that subscribed
+    # consumers of a stream already open on a data client join it there so it is shared
+
+    def subscribe_bars(
+        self,
+        contract: IBContract,
+        what_to_show: WhatToShow,
+        bar_size: BarSize,
+        callback: Callable,
+    ) -> ClientSubscription:
+        client = self._subscription_client(
+            InteractiveBrokersClient._bars_subscription_key(
+                contract, what_to_show, bar_size
+            )
+        )
+        return client.subscribe_bars(
+            contract=contract,
+            what_to_show=what_to_show,
+            bar_size=bar_size,
+            callback=callback,
+        )
+
+    def subscribe_quote_ticks(
+        self,
+        contract: IBContract,
+        callback: Callable,
+        **kwargs,
+    ) -> ClientSubscription:
+        client = self._subscription_client(
+            InteractiveBrokersClient._quote_ticks_subscription_key(contract)
+        )
+        return client.subscribe_quote_ticks(
+            contract=contract,
+            callback=callback,
+            **kwargs,
+        )
+
+    def _subscription_client(self, key: tuple) -> InteractiveBrokersClient:
+        for client in self.data_clients:
+            if key in client._multiplexer:
+                return client
+        return self.next_client()
@@ -1,5 +1,7 @@
 import asyncio
 import json
+import logging
+import re
 import struct
 from collections.abc import Callable
 from pathlib import Path
@@ -7,15 +9,103 @@ from pprint import pprint
 
 from ibapi import comm
 
+from pyfutures.client.metrics import MetricsRegistry
 from pyfutures.logger import LoggerAdapter
 
 
-# def parse_buffer(buf: bytes, cb: Callable):
-#     """
-#     Generator to parse all messages in the data / buffer
-#     if the last message is incomplete, returns it
-#     """
-#
+_SIZE_PREFIX = struct.Struct("!I")
+_FIELD = re.compile(rb"([^\0]*)\0")
+
+
+class Framer:
+    """
+    Incremental framer for size prefixed messages.
+
+    Received data is appended to a single growable bytearray and a read offset tracks
+    the start of the first unparsed message. Size prefixes are unpacked in place and
+    complete messages are passed to the callback as memoryview slices of the buffer,
+    the buffer is only compacted once the consumed prefix grows past compact_threshold.
+
+    The memoryview passed to the callback is only valid for the duration of the call.
+    """
+
+    def __init__(self, compact_threshold: int = 64 * 1024):
+        self._buffer = bytearray()
+        self._offset = 0
+        self._compact_threshold = compact_threshold
+
+    def __len__(self) -> int:
+        # number of buffered bytes that have not been parsed yet
+        return len(self._buffer) - self._offset
+
+    def feed(self, data: bytes) -> None:
+        self._buffer += data
+
+    def drain(self, callback: Callable[[memoryview], None]) -> int:
+        """
+        Passes every complete message in the buffer to the callback,
+        an incomplete message at the end of the buffer is kept until the next feed.
+        Returns the number of messages parsed.
+        """
+        count = 0
+        view = memoryview(self._buffer)
+        try:
+            for start, stop in self._frames():
+                with view[start:stop] as msg:
+                    callback(msg)
+                count += 1
+        finally:
+            view.release()
+            self._compact()
+        return count
+
+    def drain_fields(self, callback: Callable[[tuple[bytes, ...], int], None]) -> int:
+        """
+        Passes the null separated fields and the size of every complete message to the callback,
+        the fields are split from the buffer in place without copying the whole message first.
+        Returns the number of messages parsed.
+        """
+        buffer = self._buffer
+        count = 0
+        try:
+            for start, stop in self._frames():
+                callback(tuple(_FIELD.findall(buffer, start, stop)), stop - start)
+                count += 1
+        finally:
+            self._compact()
+        return count
+
+    def _frames(self):
+        # yields the start and stop of every complete message, advancing the read offset
+        buffer = self._buffer
+        end = len(buffer)
+        while end - self._offset >= 4:
+            size = _SIZE_PREFIX.unpack_from(buffer, self._offset)[0]
+            start = self._offset + 4
+            stop = start + size
+            if stop > end:
+                return  # incomplete message, wait for more data
+            self._offset = stop
+            yield start, stop
+
+    def _compact(self) -> None:
+        if self._offset == len(self._buffer):
+            self._buffer.clear()
+            self._offset = 0
+        elif self._offset >= self._compact_threshold:
+            del self._buffer[: self._offset]
+            self._offset = 0
+
+
+def parse_buffer(buf: bytes) -> list[bytes]:
+    """
+    Returns all complete messages in the buffer without their size prefix
+    """
+    msgs = []
+    framer = Framer()
+    framer.feed(buf)
+    framer.drain(lambda msg: msgs.append(msg.tobytes()))
+    return msgs
 
 
 def create_handshake() -> bytes:
@@ -40,48 +130,45 @@ class Protocol(asyncio.Protocol):
         connection_lost_callback: Callable,
         fields_received_callback: Callable,
         client_id: int = 1,
+        metrics: MetricsRegistry | None = None,
     ):
         self._loop = loop
         self.client_id = client_id
         self._connection_lost_callback = connection_lost_callback
         self._fields_received_callback = fields_received_callback
+        self._metrics = metrics
+        self._transport = None
 
         self._log = LoggerAdapter.from_name(name=type(self).__name__)
         self._bstream = None
-        self._buffer = b""
+        self._framer = Framer()
 
     def connection_made(self, transport):
         self._transport = transport
         print("connection made to: ", transport)
 
-    def handle_message(self, msg: bytes):
+    def handle_message(self, msg: bytes | memoryview):
         """
         receives a single complete message only at a time
         receives a null separated bytestring
         message = null separated ascii bytes with size prefix
         """
-        fields = msg.split(b"\0")
-        fields = tuple(fields[0:-1])
+        self.handle_fields(tuple(_FIELD.findall(msg)), len(msg))
+
+    def handle_fields(self, fields: tuple[bytes, ...], size: int):
+        if self._metrics is not None:
+            self._metrics.message_received(fields[0], size)
         if self._bstream is not None:
             ascii_fields = [f.decode("ascii") for f in fields]
             self._bstream[-1][1].append(ascii_fields)
-        self._log.debug(f"<--- {fields}")
+        if self._log.is_enabled_for(logging.DEBUG):
+            self._log.debug(f"<--- {fields}")
         self._fields_received_callback(fields)
 
     def data_received(self, data):
         try:
-            self._log.debug("========== RESPONSE ==========")
-
-            self._buffer += data
-
-            self._log.debug(f"<-- buffer: {self._buffer}")
-
-            while self._buffer:
-                _, msg, self._buffer = comm.read_msg(self._buffer)
-                if msg:
-                    self.handle_message(msg)
-                else:
-                    break
+            self._framer.feed(data)
+            self._framer.drain_fields(self.handle_fields)
         except Exception as e:
             self._log.exception("protocol data_received exception: ", e)
 
@@ -0,0 +1,66 @@
+import asyncio
+from collections import deque
+
+
+class StreamBuffer:
+    """
+    Bounded buffer of response batches between the decoder and an async for consumer.
+
+    Used as ClientRequest.data, the response handlers extend() it per decoded message.
+    The socket is shared by every request on the connection so reading is never paused,
+    once a batch arrives with max_batches already buffered the buffer overflows:
+    the buffered batches are dropped and the buffer is closed.
+    """
+
+    def __init__(self, max_batches: int):
+        assert max_batches > 0
+        self._max_batches = max_batches
+        self._batches: deque[list] = deque()
+        self._waiter: asyncio.Future | None = None
+        self._overflowed = False
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._batches)
+
+    @property
+    def max_batches(self) -> int:
+        return self._max_batches
+
+    @property
+    def overflowed(self) -> bool:
+        return self._overflowed
+
+    def extend(self, items: list) -> None:
+        if len(items) == 0 or self._closed:
+            return
+        if len(self._batches) >= self._max_batches:
+            self._overflowed = True
+            self._batches.clear()
+            self.close()
+            return
+        self._batches.append(list(items))
+        self._wake()
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake()
+
+    async def get(self) -> list | None:
+        """
+        Returns the next batch, or None once the buffer is closed and empty
+        """
+        while len(self._batches) == 0:
+            if self._closed:
+                return None
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+
+        return self._batches.popleft()
+
+    def _wake(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
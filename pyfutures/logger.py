@@ -138,6 +138,12 @@ class LoggerAdapter:
         # Create the LoggerAdapter instance
         return cls(name=name, *args, **attrs_dict)
 
+    def is_enabled_for(self, level: int) -> bool:
+        """
+        Returns False if a message of the level would be dropped, used to skip formatting it
+        """
+        return not self.bypass and level >= self.level
+
     def debug(
         self,
         message: str,
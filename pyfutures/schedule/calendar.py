@@ -83,6 +83,30 @@ class MarketCalendar:
     def is_closed(self, now: pd.Timestamp) -> bool:
         return not self.is_open(now)
 
+    def is_open_between(self, start: pd.Timestamp, end: pd.Timestamp) -> bool:
+        """
+        Returns True if any session overlaps [start, end)
+        """
+        mask = (self._schedule.open < end) & (self._schedule.close > start)
+
+        return mask.any()
+
+    def sessions_between(
+        self, start: pd.Timestamp, end: pd.Timestamp
+    ) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Returns the UTC open and close of the sessions that overlap [start, end), sorted by open
+        """
+        mask = (self._schedule.open < end) & (self._schedule.close > start)
+        sessions = self._schedule[mask]
+
+        return list(
+            zip(
+                sessions.open.dt.tz_convert(pytz.UTC),
+                sessions.close.dt.tz_convert(pytz.UTC),
+            )
+        )
+
     def next_open(self, now: pd.Timestamp) -> pd.Timestamp | None:
         next_sessions = self._schedule[self._schedule.open > now]
 
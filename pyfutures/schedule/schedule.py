@@ -100,6 +100,56 @@ class MarketSchedule:
     def is_closed(self, now: pd.Timestamp) -> bool:
         return not self.is_open(now)
 
+    def is_open_between(self, start: pd.Timestamp, end: pd.Timestamp) -> bool:
+        """
+        Returns True if any session overlaps [start, end)
+        """
+        return len(self._local_sessions_between(start, end)) > 0
+
+    def sessions_between(
+        self, start: pd.Timestamp, end: pd.Timestamp
+    ) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Returns the UTC open and close of the sessions that overlap [start, end), sorted by open
+        """
+
+        def to_utc(local: pd.Timestamp) -> pd.Timestamp:
+            return local.tz_localize(
+                self._timezone, ambiguous=False, nonexistent="shift_forward"
+            ).tz_convert(pytz.UTC)
+
+        return [
+            (to_utc(open), to_utc(close))
+            for open, close in self._local_sessions_between(start, end)
+        ]
+
+    def _local_sessions_between(
+        self, start: pd.Timestamp, end: pd.Timestamp
+    ) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+        # sessions are wall clock times in the schedule timezone
+        start = start.tz_convert(self._timezone).tz_localize(None)
+        end = end.tz_convert(self._timezone).tz_localize(None)
+
+        days = pd.date_range(
+            start=start.floor("D") - pd.Timedelta(days=1),
+            end=end.floor("D"),
+            freq="D",
+        )
+
+        sessions = []
+        for session in self.data.itertuples():
+            session_days = days[days.dayofweek == session.dayofweek]
+            opens = session_days + pd.Timedelta(
+                hours=session.open.hour, minutes=session.open.minute
+            )
+            closes = session_days + pd.Timedelta(
+                hours=session.close.hour, minutes=session.close.minute
+            )
+            mask = (opens < end) & (closes > start)
+            sessions.extend(zip(opens[mask], closes[mask]))
+
+        return sorted(sessions)
+
     def next_open(self, now: pd.Timestamp) -> pd.Timestamp | None:
         now = now.tz_convert(self._timezone)
 
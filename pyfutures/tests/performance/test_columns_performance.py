@@ -0,0 +1,70 @@
+import time
+
+import pandas as pd
+from ibapi.common import BarData
+
+from pyfutures.client.columns import BarColumns
+from pyfutures.client.decoder import parse_historical_data
+from pyfutures.client.parsing import ClientParser
+
+
+def create_historical_data_fields(count: int) -> tuple[bytes]:
+    """
+    historicalData message with count 1-minute bars
+    """
+    fields = [b"17", b"-10", b"20240328-14:47:22", b"20240328-14:48:22", str(count).encode()]
+    start = 1711637220
+    for i in range(count):
+        fields += [
+            str(start + i * 60).encode(),
+            b"0.65320",
+            b"0.65340",
+            b"0.65310",
+            b"0.65310",
+            b"12",
+            b"0.65321",
+            b"4",
+        ]
+    return tuple(fields)
+
+
+def test_historical_data_columns_throughput():
+    count = 100_000
+    fields = create_historical_data_fields(count)
+    start_time = pd.Timestamp("2024-03-28 14:47:00", tz="UTC")
+    end_time = start_time + pd.Timedelta(days=100)
+
+    start = time.perf_counter()
+    _, columns, _, _ = parse_historical_data(fields)
+    bars = BarColumns()
+    bars.extend(*columns)
+    bars = bars.filter(start_time, end_time).to_dataframe()
+    elapsed = time.perf_counter() - start
+
+    assert len(bars) == count
+
+    # previous implementation: BarData per bar, parse_datetime per bar, list comprehension filter
+    parser = ClientParser()
+    start = time.perf_counter()
+    legacy = []
+    for i in range(5, 5 + count * 8, 8):
+        bar = BarData()
+        bar.date = fields[i].decode()
+        bar.open = float(fields[i + 1])
+        bar.high = float(fields[i + 2])
+        bar.low = float(fields[i + 3])
+        bar.close = float(fields[i + 4])
+        bar.volume = float(fields[i + 5])
+        bar.wap = float(fields[i + 6])
+        bar.barCount = int(fields[i + 7])
+        bar.timestamp = parser.parse_datetime(bar.date)
+        legacy.append(bar)
+    legacy = [b for b in legacy if b.timestamp >= start_time and b.timestamp < end_time]
+    legacy = pd.DataFrame([parser.bar_data_to_dict(b) for b in legacy])
+    legacy_elapsed = time.perf_counter() - start
+
+    assert len(legacy) == count
+
+    print(
+        f"bars={count} columns={count / elapsed:.0f}bars/s legacy={count / legacy_elapsed:.0f}bars/s"
+    )
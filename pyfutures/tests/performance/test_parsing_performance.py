@@ -0,0 +1,81 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pyfutures.client.parsing import ClientParser
+
+
+def create_values(width: int, count: int) -> list[str]:
+    start = pd.Timestamp("2020-01-01", tz="UTC")
+    if width == 8:
+        index = pd.date_range(start, periods=count, freq="D")
+        return list(index.strftime("%Y%m%d"))
+    elif width == 10:
+        return [str(int(start.timestamp()) + i * 60) for i in range(count)]
+    elif width == 17:
+        index = pd.date_range(start, periods=count, freq="min")
+        return list(index.strftime("%Y%m%d-%H:%M:%S"))
+    raise ValueError(width)
+
+
+def legacy_parse_datetime(value: str | int) -> pd.Timestamp:
+    """
+    The previous ClientParser.parse_datetime implementation, kept as a baseline
+    """
+    if isinstance(value, int):
+        return pd.to_datetime(value, unit="s", utc=True)
+    if len(value) == 8:
+        return pd.to_datetime(value, format="%Y%m%d", utc=True)
+    elif len(value) == 10:
+        return pd.to_datetime(int(value), unit="s", utc=True)
+    elif len(value) == 17:
+        return pd.to_datetime(value, format="%Y%m%d-%H:%M:%S", utc=True)
+    raise RuntimeError("Unable to parse timestamp")
+
+
+@pytest.mark.parametrize("width", [8, 10, 17])
+def test_parse_datetimes_throughput(width):
+    count = 5_000
+    values = create_values(width, count)
+
+    start = time.perf_counter()
+    parsed = ClientParser.parse_datetimes(np.array(values))
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    legacy = [legacy_parse_datetime(value) for value in values]
+    legacy_elapsed = time.perf_counter() - start
+
+    assert list(pd.DatetimeIndex(parsed).tz_localize("UTC")) == legacy
+
+    print(
+        f"width={width} values={count} "
+        f"batch={count / elapsed:.0f}/s legacy={count / legacy_elapsed:.0f}/s"
+    )
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [1704897000 + i for i in range(10_000)],  # historical ticks
+        ["20231219", "20231220", "20231221"] * 1_000,  # daily bars
+    ],
+)
+def test_parse_datetime_scalar_throughput(values):
+    count = len(values)
+
+    start = time.perf_counter()
+    parsed = [ClientParser.parse_datetime(value) for value in values]
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    legacy = [legacy_parse_datetime(value) for value in values]
+    legacy_elapsed = time.perf_counter() - start
+
+    assert parsed == legacy
+
+    print(
+        f"values={count} scalar={count / elapsed:.0f}/s legacy={count / legacy_elapsed:.0f}/s"
+    )
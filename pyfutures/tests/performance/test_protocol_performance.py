@@ -0,0 +1,109 @@
+import json
+import struct
+import time
+from unittest.mock import Mock
+
+import pytest
+from ibapi import comm
+
+from pyfutures import PACKAGE_ROOT
+from pyfutures.client.protocol import Framer
+from pyfutures.client.protocol import Protocol
+
+
+BYTESTRING_DIR = PACKAGE_ROOT / "tests" / "bytestring" / "txt"
+
+
+def load_recorded_stream() -> tuple[bytes, int]:
+    """
+    Rebuilds the inbound byte stream from every recorded bytestring file.
+    Returns the stream and the number of messages in it.
+    """
+    stream = bytearray()
+    count = 0
+    for path in sorted(BYTESTRING_DIR.glob("*.json")):
+        with open(path) as f:
+            bytestream = json.load(f)
+        for _, responses in bytestream:
+            for fields in responses:
+                if fields == ["eof"]:
+                    continue
+                msg = b"".join(field.encode("ascii") + b"\0" for field in fields)
+                stream += struct.pack("!I", len(msg)) + msg
+                count += 1
+    return bytes(stream), count
+
+
+def legacy_data_received(buffer: bytes, data: bytes, callback) -> bytes:
+    """
+    The previous Protocol.data_received implementation, kept as a baseline
+    """
+    buffer += data
+    while buffer:
+        _, msg, buffer = comm.read_msg(buffer)
+        if msg:
+            callback(msg)
+        else:
+            break
+    return buffer
+
+
+@pytest.mark.parametrize("chunk_size", [4096, 65536, 1048576])
+def test_framer_throughput(chunk_size):
+    stream, count = load_recorded_stream()
+    stream = stream * 200
+    count = count * 200
+    chunks = [stream[i : i + chunk_size] for i in range(0, len(stream), chunk_size)]
+
+    received = []
+    callback = received.append
+    framer = Framer()
+    start = time.perf_counter()
+    for chunk in chunks:
+        framer.feed(chunk)
+        framer.drain(callback)
+    elapsed = time.perf_counter() - start
+
+    assert len(received) == count
+    assert len(framer) == 0
+
+    legacy_received = []
+    legacy_callback = legacy_received.append
+    buffer = b""
+    start = time.perf_counter()
+    for chunk in chunks:
+        buffer = legacy_data_received(buffer, chunk, legacy_callback)
+    legacy_elapsed = time.perf_counter() - start
+
+    assert len(legacy_received) == count
+
+    mb = len(stream) / 1e6
+    print(
+        f"chunk_size={chunk_size} messages={count} "
+        f"framer={mb / elapsed:.1f}MB/s legacy={mb / legacy_elapsed:.1f}MB/s"
+    )
+
+
+def test_data_received_throughput(event_loop):
+    stream, count = load_recorded_stream()
+    stream = stream * 200
+    count = count * 200
+    chunks = [stream[i : i + 4096] for i in range(0, len(stream), 4096)]
+
+    fields_received_mock = Mock()
+    protocol = Protocol(
+        loop=event_loop,
+        connection_lost_callback=Mock(),
+        fields_received_callback=fields_received_mock,
+    )
+    protocol._log.bypass = True
+
+    start = time.perf_counter()
+    for chunk in chunks:
+        protocol.data_received(chunk)
+    elapsed = time.perf_counter() - start
+
+    assert fields_received_mock.call_count == count
+    assert len(protocol._framer) == 0
+
+    print(f"messages={count} protocol={count / elapsed:.0f}msg/s")
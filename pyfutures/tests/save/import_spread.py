@@ -10,6 +10,7 @@ from pyfutures.client.enums import BarSize
 from pyfutures.client.enums import Duration
 from pyfutures.client.enums import Frequency
 from pyfutures.client.enums import WhatToShow
+from pyfutures.client.pacing import PacingScheduler
 from pyfutures.logger import LoggerAdapter
 from pyfutures.logger import LoggerAttributes
 from pyfutures.tests.test_kit import SPREAD_FOLDER
@@ -35,6 +36,7 @@ async def write_spread(write: bool = False):
 
     cache = RequestsCache(Path.home() / "Desktop" / "download_cache3")
     cache.purge_errors(asyncio.TimeoutError)
+    pacing = PacingScheduler()
 
     rows = IBTestProviderStubs.universe_rows(
         filter=[
@@ -65,7 +67,7 @@ async def write_spread(write: bool = False):
                     end_time=open_time + pd.Timedelta(hours=1),
                     cache=cache,
                     as_dataframe=True,
-                    delay=0.5,
+                    pacing=pacing,
                 )
                 df = pd.concat([df, _df])
             if write:
@@ -112,7 +114,7 @@ async def find_spread_values():
         end_time=open_time.ceil(pd.Timedelta(hours=1)),
         cache=None,
         as_dataframe=True,
-        delay=0.5,
+        pacing=PacingScheduler(),
     )
     # df = await historic.request_quotes(
     #     contract=row.contract_cont,
@@ -3,6 +3,7 @@ import random
 from decimal import Decimal
 from unittest.mock import Mock
 
+import numpy as np
 import pandas as pd
 import pytest
 from ibapi.common import BarData
@@ -20,6 +21,7 @@ from nautilus_trader.test_kit.stubs.identifiers import TestIdStubs
 
 from pyfutures.adapter.config import InteractiveBrokersDataClientConfig
 from pyfutures.adapter.data import InteractiveBrokersDataClient
+from pyfutures.client.batching import QuoteTickBatch
 from pyfutures.client.client import InteractiveBrokersClient
 from pyfutures.client.enums import BarSize
 from pyfutures.client.enums import WhatToShow
@@ -83,6 +85,72 @@ class TestInteractiveBrokersDataClient:
             "instrument"
         ] == self.data_client.cache.instrument(self.instrument_id)
 
+    @pytest.mark.asyncio()
+    async def test_subscribe_quote_ticks(self):
+        # Arrange
+        self.data_client._client.subscribe_quote_ticks = Mock()
+
+        # Act
+        await self.data_client._subscribe_quote_ticks(self.instrument_id)
+
+        # Assert
+        self.data_client._client.subscribe_quote_ticks.assert_called_once()
+        sent_kwargs = self.data_client._client.subscribe_quote_ticks.call_args_list[0][
+            1
+        ]
+        assert sent_kwargs["contract"].tradingClass == "MES"
+        assert sent_kwargs["batch_size"] is None
+        assert sent_kwargs["batch_interval_ms"] is None
+        assert sent_kwargs["conflate"] is False
+        assert sent_kwargs["callback"].func == self.data_client._quote_tick_callback
+        assert self.instrument_id in self.data_client._quote_subscriptions
+
+    @pytest.mark.asyncio()
+    async def test_subscribe_quote_ticks_batched_when_configured(self):
+        # Arrange
+        self.data_client._config = InteractiveBrokersDataClientConfig(
+            quote_batch_size=256,
+            quote_batch_interval_ms=50,
+        )
+        self.data_client._client.subscribe_quote_ticks = Mock()
+
+        # Act
+        await self.data_client._subscribe_quote_ticks(self.instrument_id)
+
+        # Assert
+        sent_kwargs = self.data_client._client.subscribe_quote_ticks.call_args_list[0][
+            1
+        ]
+        assert sent_kwargs["batch_size"] == 256
+        assert sent_kwargs["batch_interval_ms"] == 50
+        assert (
+            sent_kwargs["callback"].func == self.data_client._quote_tick_batch_callback
+        )
+
+    @pytest.mark.asyncio()
+    async def test_quote_tick_batch_callback(self):
+        # Arrange
+        batch = QuoteTickBatch(
+            time=np.array([1700069390, 1700069391], dtype=np.int64),
+            bid_price=np.array([1.1, 1.2]),
+            ask_price=np.array([1.2, 1.3]),
+            bid_size=np.array([1.0, np.nan]),
+            ask_size=np.array([2.0, 3.0]),
+            mask=np.array([0, 0], dtype=np.int64),
+        )
+        instrument = self.data_client.cache.instrument(self.instrument_id)
+        self.data_client._handle_data = Mock()
+
+        # Act
+        self.data_client._quote_tick_batch_callback(batch=batch, instrument=instrument)
+
+        # Assert
+        assert self.data_client._handle_data.call_count == 2
+        tick = self.data_client._handle_data.call_args_list[1][0][0]
+        assert tick.bid_price == Price(1.2, instrument.price_precision)
+        assert tick.bid_size == Quantity(0, instrument.size_precision)
+        assert tick.ts_event == 1700069391 * 1_000_000_000
+
     @pytest.mark.asyncio()
     async def test_bar_callback(self):
         # Arrange
@@ -0,0 +1,89 @@
+import asyncio
+from decimal import Decimal
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+from ibapi.common import UNSET_DECIMAL
+
+from pyfutures.client.batching import QuoteTickBatcher
+
+
+class TestQuoteTickBatcher:
+    def setup_method(self):
+        self.batches = []
+        self.callback = Mock(side_effect=self._on_batch)
+
+    def _on_batch(self, batch):
+        # the arrays are reused, copy them
+        self.batches.append(
+            (batch.time.copy(), batch.bid_price.copy(), batch.bid_size.copy())
+        )
+
+    @staticmethod
+    def tick(i: int) -> tuple:
+        return (i, 1.0 + i, 2.0 + i, Decimal(i), Decimal(i), 0)
+
+    @pytest.mark.asyncio()
+    async def test_flushes_when_full(self):
+        # Arrange
+        batcher = QuoteTickBatcher(callback=self.callback, max_ticks=3)
+
+        # Act
+        for i in range(7):
+            batcher(self.tick(i))
+
+        # Assert
+        assert [list(b[0]) for b in self.batches] == [[0, 1, 2], [3, 4, 5]]
+        assert len(batcher) == 1
+
+    @pytest.mark.asyncio()
+    async def test_flushes_after_interval(self):
+        # Arrange
+        batcher = QuoteTickBatcher(
+            callback=self.callback, max_ticks=100, interval_seconds=0.01
+        )
+
+        # Act
+        batcher(self.tick(0))
+        batcher(self.tick(1))
+        await asyncio.sleep(0.05)
+
+        # Assert
+        assert [list(b[0]) for b in self.batches] == [[0, 1]]
+        assert len(batcher) == 0
+
+    @pytest.mark.asyncio()
+    async def test_conflate_keeps_latest(self):
+        # Arrange
+        batcher = QuoteTickBatcher(
+            callback=self.callback, interval_seconds=0.01, conflate=True
+        )
+
+        # Act
+        for i in range(5):
+            batcher(self.tick(i))
+        await asyncio.sleep(0.05)
+
+        # Assert
+        self.callback.assert_called_once()
+        assert list(self.batches[0][0]) == [4]
+        assert list(self.batches[0][1]) == [5.0]
+
+    @pytest.mark.asyncio()
+    async def test_close_flushes_remaining(self):
+        batcher = QuoteTickBatcher(callback=self.callback, interval_seconds=60)
+        batcher(self.tick(0))
+
+        batcher.close()
+
+        assert [list(b[0]) for b in self.batches] == [[0]]
+
+    @pytest.mark.asyncio()
+    async def test_unset_size_is_nan(self):
+        batcher = QuoteTickBatcher(callback=self.callback)
+        batcher((0, 1.0, 2.0, UNSET_DECIMAL, Decimal(1), 0))
+
+        batcher.flush()
+
+        assert np.isnan(self.batches[0][2][0])
@@ -0,0 +1,171 @@
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pandas as pd
+import pytest
+from ibapi.contract import Contract as IBContract
+
+from pyfutures.client.bulk import BulkDownloader
+from pyfutures.client.enums import BarSize
+from pyfutures.client.enums import WhatToShow
+from pyfutures.client.historic import InteractiveBrokersHistoricClient
+from pyfutures.client.objects import BulkProgress
+from pyfutures.tests.unit.client.stubs import ClientStubs
+
+
+class TestBulkDownloader:
+    def setup_method(self):
+        self.path = Path(tempfile.mkdtemp())
+        self.historic: InteractiveBrokersHistoricClient = ClientStubs.historic()
+        self.historic.request_bars = AsyncMock(side_effect=self.request_bars)
+        self.rows = [
+            SimpleNamespace(
+                uname=uname, contract_cont=IBContract(), market_schedule=None
+            )
+            for uname in ("DC", "ZC")
+        ]
+        self.kwargs = dict(
+            rows=self.rows,
+            start_time=pd.Timestamp("2023-01-03", tz="UTC"),
+            end_time=pd.Timestamp("2023-01-05", tz="UTC"),
+            bar_sizes=[BarSize._1_MINUTE, BarSize._1_HOUR],
+        )
+
+    @pytest.mark.asyncio()
+    async def test_run_writes_a_part_per_output(self):
+        # Arrange
+        downloader = BulkDownloader(historic=self.historic, path=self.path)
+        downloader.add(**self.kwargs, what_to_show=[WhatToShow.TRADES])
+
+        # Act
+        progress = await downloader.run()
+
+        # Assert
+        assert progress.finished == progress.total == 4
+        assert progress.rows == 8
+        assert len(list(self.path.glob("*/*-TRADES-*.parquet"))) == 4
+
+    @pytest.mark.asyncio()
+    async def test_run_splits_bid_ask_tasks(self):
+        downloader = BulkDownloader(historic=self.historic, path=self.path)
+        downloader.add(**self.kwargs)
+
+        await downloader.run()
+
+        sent = self.historic.request_bars.call_args_list
+        assert len(sent) == 4
+        assert all(call[1]["split_bid_ask"] for call in sent)
+        assert len(list(self.path.glob("DC/1-min-MIDPOINT-*.parquet"))) == 1
+
+    @pytest.mark.asyncio()
+    async def test_run_resumes_interrupted_tasks(self):
+        # Arrange
+        downloader = BulkDownloader(historic=self.historic, path=self.path)
+        downloader.add(**self.kwargs, what_to_show=[WhatToShow.TRADES])
+        downloader._checkpoint.take_next()  # interrupted while running
+        downloader.close()
+
+        downloader = BulkDownloader(historic=self.historic, path=self.path)
+        assert downloader.add(**self.kwargs, what_to_show=[WhatToShow.TRADES]) == 0
+
+        # Act
+        progress = await downloader.run()
+
+        # Assert
+        assert self.historic.request_bars.call_count == 4
+        assert progress.finished == 4
+
+    @pytest.mark.asyncio()
+    async def test_run_retries_failed_tasks(self):
+        # Arrange
+        downloader = BulkDownloader(
+            historic=self.historic, path=self.path, max_attempts=1
+        )
+        downloader.add(**self.kwargs, what_to_show=[WhatToShow.TRADES])
+        self.historic.request_bars.side_effect = [
+            RuntimeError("failed"),
+            *[self.bars() for _ in range(3)],
+        ]
+        await downloader.run()
+        assert list(downloader.failed().values()) == ["RuntimeError('failed')"]
+        self.historic.request_bars.reset_mock(side_effect=True)
+        self.historic.request_bars.side_effect = self.request_bars
+
+        # Act
+        progress = await downloader.run(retry_failed=True)
+
+        # Assert
+        self.historic.request_bars.assert_called_once()
+        assert progress.finished == 4
+        assert progress.failed == 0
+
+    @pytest.mark.asyncio()
+    async def test_run_requeues_task_with_timed_out_windows(self):
+        # Arrange
+        downloader = BulkDownloader(historic=self.historic, path=self.path)
+        downloader.add(
+            **{**self.kwargs, "rows": self.rows[:1]}, what_to_show=[WhatToShow.TRADES]
+        )
+        timed_out = True
+
+        async def request_bars(**kwargs):
+            nonlocal timed_out
+            if kwargs["bar_size"] == BarSize._1_HOUR and timed_out:
+                timed_out = False
+                kwargs["stats"].failed.append(
+                    (kwargs["start_time"], kwargs["end_time"])
+                )
+            return self.bars()
+
+        self.historic.request_bars.side_effect = request_bars
+
+        # Act
+        progress = await downloader.run()
+
+        # Assert
+        assert self.historic.request_bars.call_count == 3
+        assert progress.finished == 2
+        assert len(list(self.path.glob("DC/1-hour-TRADES-*.parquet"))) == 1
+
+    @pytest.mark.asyncio()
+    async def test_run_takes_highest_priority_first(self):
+        # Arrange
+        downloader = BulkDownloader(
+            historic=self.historic, path=self.path, concurrency=1
+        )
+        downloader.add(**self.kwargs, what_to_show=[WhatToShow.TRADES])
+
+        # Act
+        downloader.reprioritise(priority=1, uname="ZC", bar_size=BarSize._1_HOUR)
+        await downloader.run()
+
+        # Assert
+        first = self.historic.request_bars.call_args_list[0][1]
+        assert first["contract"] is self.rows[1].contract_cont
+        assert first["bar_size"] == BarSize._1_HOUR
+
+    def test_progress_eta(self):
+        progress = BulkProgress(
+            total=10, finished=4, finished_run=2, elapsed_seconds=60
+        )
+
+        assert progress.remaining == 6
+        assert progress.eta == pd.Timedelta(minutes=3)
+
+    @staticmethod
+    def bars() -> pd.DataFrame:
+        return pd.DataFrame(
+            {"timestamp": pd.date_range("2023-01-03", periods=2, tz="UTC")}
+        )
+
+    async def request_bars(self, **kwargs):
+        df = self.bars()
+        if kwargs.get("split_bid_ask"):
+            return {
+                WhatToShow.BID: df,
+                WhatToShow.ASK: df,
+                WhatToShow.MIDPOINT: df,
+            }
+        return df
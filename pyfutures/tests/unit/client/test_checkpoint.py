@@ -0,0 +1,31 @@
+import tempfile
+from pathlib import Path
+
+from pyfutures.client.checkpoint import DownloadCheckpoint
+
+
+class TestDownloadCheckpoint:
+    def setup_method(self):
+        self.path = Path(tempfile.mkdtemp()) / "checkpoint.sqlite"
+        self.checkpoint = DownloadCheckpoint(self.path)
+
+    def test_set_finished_persists(self):
+        # Arrange
+        self.checkpoint.set_finished("a", rows=10)
+        self.checkpoint.close()
+
+        # Act
+        checkpoint = DownloadCheckpoint(self.path)
+
+        # Assert
+        assert "a" in checkpoint
+        assert checkpoint.finished() == {"a": 10}
+
+    def test_reset_forgets_part(self):
+        self.checkpoint.set_finished("a", rows=10)
+        self.checkpoint.set_finished("b", rows=0)
+
+        self.checkpoint.reset("a")
+
+        assert "a" not in self.checkpoint
+        assert len(self.checkpoint) == 1
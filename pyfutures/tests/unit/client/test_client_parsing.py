@@ -1,5 +1,7 @@
+import numpy as np
 import pandas as pd
 import pytest
+from ibapi.common import BarData
 
 from pyfutures.client.parsing import ClientParser
 
@@ -10,7 +12,7 @@ from pyfutures.client.parsing import ClientParser
         # request_bars -> BarSize._1_DAY formatDate=2
         ("20231219", pd.Timestamp("2024-04-11 00:00:00", tz="UTC")),
         ("1704897000", pd.Timestamp("2025-04-20 17:35:00", tz="UTC")),
-20240327 10:20:00 US/Central
+        # 20240327 10:20:00 US/Central
         # 1704992718
     ],
 )
@@ -33,3 +35,57 @@ def test_parse_datetime(value, expected):
 
     expected = ClientParser.parse_datetime(value)
     print(expected)
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        ["20231219", "20231220"],
+        ["1704897000", "1704897060"],
+        ["20240327-10:20:00", "20240228-23:59:59"],
+        [1704897000, 1704897060],
+    ],
+)
+def test_parse_datetimes_matches_parse_datetime(values):
+    expected = [ClientParser.parse_datetime(value) for value in values]
+
+    parsed = ClientParser.parse_datetimes(np.array(values))
+
+    assert list(pd.DatetimeIndex(parsed).tz_localize("UTC")) == expected
+
+
+def test_parse_datetimes_empty():
+    assert len(ClientParser.parse_datetimes(np.array([], dtype=str))) == 0
+
+
+def test_parse_datetimes_mixed_formats_raises():
+    with pytest.raises(RuntimeError):
+        ClientParser.parse_datetimes(np.array(["20231219", "1704897000"]))
+
+
+def test_parse_datetime_int_epoch():
+    assert ClientParser.parse_datetime(1704897000) == pd.Timestamp(
+        "2024-01-10 14:30:00", tz="UTC"
+    )
+
+
+def test_parse_datetime_daily_date_is_memoised():
+    assert ClientParser.parse_datetime("20231219") is ClientParser.parse_datetime(
+        "20231219"
+    )
+
+
+def test_split_bid_ask_bar():
+    bar = BarData()
+    bar.date = 1704897000
+    bar.open = 1.0  # time average bid
+    bar.high = 1.4  # max ask
+    bar.low = 0.9  # min bid
+    bar.close = 1.2  # time average ask
+
+    bid, ask, mid = ClientParser.split_bid_ask_bar(bar)
+
+    assert (bid.open, bid.high, bid.low, bid.close) == (1.0, 1.0, 0.9, 1.0)
+    assert (ask.open, ask.high, ask.low, ask.close) == (1.2, 1.4, 1.2, 1.2)
+    assert (mid.open, mid.high, mid.low, mid.close) == (1.1, 1.1, 1.1, 1.1)
+    assert bid.date == ask.date == mid.date == 1704897000
@@ -0,0 +1,89 @@
+from unittest.mock import AsyncMock
+from unittest.mock import Mock
+
+import pandas as pd
+import pytest
+from ibapi.common import BarData
+from ibapi.contract import Contract as IBContract
+
+from pyfutures.client.enums import BarSize
+from pyfutures.client.enums import WhatToShow
+from pyfutures.client.objects import ClientSubscription
+from pyfutures.tests.unit.client.stubs import ClientStubs
+
+
+class TestClientReconnect:
+    def setup_method(self):
+        self.client = ClientStubs.client()
+        self.client._eclient.reqHistoricalData = Mock()
+        self.callback = Mock()
+        self.subscription = self.client.subscribe_bars(
+            contract=IBContract(),
+            what_to_show=WhatToShow.BID,
+            bar_size=BarSize._1_MINUTE,
+            callback=self.callback,
+        )
+        self.shared = self.client._subscriptions[self.subscription.id]
+
+    @pytest.mark.asyncio()
+    async def test_resubscribe_paces_and_skips_cancelled(self):
+        # Arrange
+        subscriptions = [
+            ClientSubscription(id=i, subscribe=Mock(), cancel=Mock(), callback=Mock())
+            for i in range(3)
+        ]
+        resubscribe = AsyncMock()
+        subscriptions[0].resubscribe = resubscribe
+        self.client._subscriptions.clear()
+        self.client._subscriptions.update({s.id: s for s in subscriptions[:2]})
+
+        # Act
+        await self.client.conn._resubscribe(subscriptions)
+
+        # Assert
+        resubscribe.assert_awaited_once()
+        subscriptions[0].subscribe.assert_not_called()
+        subscriptions[1].subscribe.assert_called_once()
+        subscriptions[2].subscribe.assert_not_called()
+
+    @pytest.mark.asyncio()
+    async def test_resubscribe_bars_backfills_missed_bars_before_live(self):
+        # Arrange
+        last = pd.Timestamp("2023-01-01 00:00:00", tz="UTC")
+        self.client.historicalDataUpdate(self.subscription.id, self.bar(last))
+        self.callback.reset_mock()
+
+        async def request_bars(**kwargs):
+            # a live update arrives while the backfill is in flight
+            self.client.historicalDataUpdate(
+                self.subscription.id, self.bar(last + pd.Timedelta(minutes=3))
+            )
+            return [self.bar(last + pd.Timedelta(minutes=i)) for i in range(4)]
+
+        self.client.request_bars = AsyncMock(side_effect=request_bars)
+
+        # Act
+        await self.shared.resubscribe()
+
+        # Assert
+        timestamps = [call[0][0].timestamp for call in self.callback.call_args_list]
+        # the bar in progress at the disconnect is delivered again with its final values
+        assert timestamps == [last + pd.Timedelta(minutes=i) for i in (0, 1, 2, 3)]
+        assert self.shared.backlog is None
+        assert self.client._eclient.reqHistoricalData.call_count == 2
+
+    @pytest.mark.asyncio()
+    async def test_resubscribe_bars_without_bars_does_not_backfill(self):
+        self.client.request_bars = AsyncMock()
+
+        await self.shared.resubscribe()
+
+        self.client.request_bars.assert_not_called()
+        assert self.client._eclient.reqHistoricalData.call_count == 2
+
+    @staticmethod
+    def bar(timestamp: pd.Timestamp) -> BarData:
+        bar = BarData()
+        bar.timestamp = timestamp
+        bar.date = int(timestamp.timestamp())
+        return bar
@@ -0,0 +1,106 @@
+import asyncio
+from decimal import Decimal
+from unittest.mock import Mock
+
+import pytest
+from ibapi.contract import Contract as IBContract
+from ibapi.contract import ContractDetails as IBContractDetails
+
+from pyfutures.tests.unit.client.stubs import ClientStubs
+
+
+class TestClientSingleFlight:
+    def setup_method(self):
+        self.client = ClientStubs.client()
+
+    @pytest.mark.asyncio()
+    async def test_concurrent_request_positions_share_one_request(self):
+        # Arrange
+        def send_mocked_response(*args, **kwargs):
+            def respond():
+                self.client.position("DU1234567", IBContract(), Decimal("1"), 1.0)
+                self.client.positionEnd()
+
+            asyncio.get_running_loop().call_soon(respond)
+
+        send_mock = Mock(side_effect=send_mocked_response)
+        self.client._eclient.reqPositions = send_mock
+
+        # Act
+        first, second = await asyncio.gather(
+            self.client.request_positions(),
+            self.client.request_positions(),
+        )
+
+        # Assert
+        send_mock.assert_called_once()
+        assert first == second
+        assert first is not second
+
+    @pytest.mark.asyncio()
+    async def test_identical_request_contract_details_share_one_request(self):
+        # Arrange
+        def send_mocked_response(reqId, contract):
+            def respond():
+                details = IBContractDetails()
+                details.contract = contract
+                self.client.contractDetails(reqId, details)
+                self.client.contractDetailsEnd(reqId)
+
+            asyncio.get_running_loop().call_soon(respond)
+
+        send_mock = Mock(side_effect=send_mocked_response)
+        self.client._eclient.reqContractDetails = send_mock
+
+        contract = IBContract()
+        contract.symbol = "DA"
+        contract.exchange = "CME"
+        other = IBContract()
+        other.symbol = "ZC"
+        other.exchange = "CBOT"
+
+        # Act
+        results = await asyncio.gather(
+            self.client.request_contract_details(contract),
+            self.client.request_contract_details(contract),
+            self.client.request_contract_details(other),
+        )
+
+        # Assert
+        assert send_mock.call_count == 2
+        assert [len(r) for r in results] == [1, 1, 1]
+
+    @pytest.mark.asyncio()
+    async def test_concurrent_request_next_order_id_returns_distinct_ids(self):
+        # Arrange
+        def send_mocked_response(*args, **kwargs):
+            asyncio.get_running_loop().call_soon(self.client.nextValidId, 5)
+
+        send_mock = Mock(side_effect=send_mocked_response)
+        self.client._eclient.reqIds = send_mock
+
+        # Act
+        order_ids = await asyncio.gather(
+            self.client.request_next_order_id(),
+            self.client.request_next_order_id(),
+            self.client.request_next_order_id(),
+        )
+
+        # Assert
+        send_mock.assert_called_once()
+        assert sorted(order_ids) == [5, 6, 7]
+
+    @pytest.mark.asyncio()
+    async def test_single_flight_propagates_exception_to_all_callers(self):
+        async def func():
+            await asyncio.sleep(0)
+            raise RuntimeError()
+
+        results = await asyncio.gather(
+            self.client._single_flight("key", func),
+            self.client._single_flight("key", func),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert self.client._single_flights == {}
@@ -0,0 +1,116 @@
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from ibapi.common import UNSET_DECIMAL
+from ibapi.common import BarData
+
+from pyfutures.client.columns import BarColumns
+
+
+class TestBarColumns:
+    def setup_method(self):
+        self.columns = BarColumns()
+        self.columns.extend(
+            date=(b"1711637220", b"1711637280", b"1711637340"),
+            open=(b"0.65320", b"0.65310", b"0.65300"),
+            high=(b"0.65340", b"0.65320", b"0.65310"),
+            low=(b"0.65310", b"0.65300", b"0.65290"),
+            close=(b"0.65310", b"0.65320", b"0.65300"),
+            volume=(b"-1", b"10", b"9223372036854775807"),
+            wap=(b"-1", b"0.65315", b"0.65305"),
+            barCount=(b"-1", b"4", b"2"),
+        )
+
+    def test_finish_parses_timestamps(self):
+        self.columns.finish()
+        assert list(self.columns["timestamp"]) == [
+            np.datetime64("2024-03-28T14:47:00", "ns"),
+            np.datetime64("2024-03-28T14:48:00", "ns"),
+            np.datetime64("2024-03-28T14:49:00", "ns"),
+        ]
+
+    def test_unset_decimal_is_nan(self):
+        self.columns.finish()
+        assert np.isnan(self.columns["volume"][2])
+        assert self.columns["volume"][0] == -1
+
+    def test_filter(self):
+        filtered = self.columns.filter(
+            start_time=pd.Timestamp("2024-03-28 14:48:00", tz="UTC"),
+            end_time=pd.Timestamp("2024-03-28 14:49:00", tz="UTC"),
+        )
+        assert len(filtered) == 1
+        assert filtered["date"][0] == "1711637280"
+
+    def test_to_dataframe(self):
+        df = self.columns.to_dataframe()
+        assert list(df.columns) == [
+            "timestamp",
+            "date",
+            "open",
+            "high",
+            "low",
+            "close",
+            "volume",
+            "wap",
+            "barCount",
+        ]
+        assert df.timestamp.iloc[0] == pd.Timestamp("2024-03-28 14:47:00", tz="UTC")
+
+    def test_to_arrow(self):
+        table = self.columns.to_arrow()
+        assert table.num_rows == 3
+        assert table.schema.field("timestamp").type == pa.timestamp("ns", tz="UTC")
+
+    def test_to_bars(self):
+        bars = self.columns.to_bars()
+        assert bars[1].timestamp == pd.Timestamp("2024-03-28 14:48:00", tz="UTC")
+        assert bars[1].date == "1711637280"
+        assert bars[1].close == 0.6532
+        assert bars[1].volume == Decimal("10")
+        assert bars[1].barCount == 4
+
+    def test_append_bar(self):
+        columns = BarColumns()
+        bar = BarData()
+        bar.date = "20240328"
+        bar.open = 1.0
+        bar.high = 2.0
+        bar.low = 0.5
+        bar.close = 1.5
+        bar.volume = Decimal("3")
+        bar.wap = Decimal("1.2")
+        bar.barCount = 5
+        columns.append(bar)
+        columns.finish()
+        assert columns["timestamp"][0] == np.datetime64("2024-03-28", "ns")
+        assert columns["volume"][0] == 3.0
+
+    def test_append_bar_unset_decimal_is_nan(self):
+        columns = BarColumns()
+        bar = BarData()
+        bar.date = "20240328"
+        bar.volume = UNSET_DECIMAL
+        bar.wap = UNSET_DECIMAL
+        columns.append(bar)
+        columns.finish()
+        assert np.isnan(columns["volume"][0])
+        assert np.isnan(columns["wap"][0])
+
+    def test_arrow_round_trip(self):
+        columns = BarColumns.from_arrow(self.columns.to_arrow())
+
+        pd.testing.assert_frame_equal(
+            columns.to_dataframe(), self.columns.to_dataframe()
+        )
+
+    def test_from_bars(self):
+        bars = self.columns.to_bars()
+
+        columns = BarColumns.from_bars(bars)
+
+        pd.testing.assert_frame_equal(
+            columns.to_dataframe(), self.columns.to_dataframe()
+        )
@@ -0,0 +1,138 @@
+from decimal import Decimal
+from unittest.mock import Mock
+
+import pytest
+from ibapi.common import UNSET_DECIMAL
+
+from pyfutures.client.decoder import FastDecoder
+
+
+def to_fields(values: list[str]) -> tuple[bytes]:
+    return tuple(v.encode() for v in values)
+
+
+class TestFastDecoder:
+    def setup_method(self):
+        self.fallback = Mock()
+        self.decoder = FastDecoder(fallback=self.fallback)
+
+    def test_historical_data(self):
+        # Arrange
+        handler = Mock()
+        self.decoder.register(17, handler)
+        fields = to_fields(
+            [
+                "17",
+                "-10",
+                "20240328-14:47:22",
+                "20240328-14:48:22",
+                "2",
+                "1711637220",
+                "0.65320",
+                "0.65340",
+                "0.65310",
+                "0.65310",
+                "-1",
+                "-1",
+                "-1",
+                "1711637280",
+                "0.65310",
+                "0.65320",
+                "0.65300",
+                "0.65320",
+                "10",
+                "0.65315",
+                "4",
+            ]
+        )
+
+        # Act
+        self.decoder.interpret(fields)
+
+        # Assert
+        handler.assert_called_once_with(
+            -10,
+            (
+                (b"1711637220", b"1711637280"),
+                (b"0.65320", b"0.65310"),
+                (b"0.65340", b"0.65320"),
+                (b"0.65310", b"0.65300"),
+                (b"0.65310", b"0.65320"),
+                (b"-1", b"10"),
+                (b"-1", b"0.65315"),
+                (b"-1", b"4"),
+            ),
+            "20240328-14:47:22",
+            "20240328-14:48:22",
+        )
+        self.fallback.interpret.assert_not_called()
+
+    def test_historical_data_update_reorders_to_historical_data_order(self):
+        # Arrange
+        handler = Mock()
+        self.decoder.register(90, handler)
+        fields = to_fields(["90", "-10", "-1", "1711637280", "0.65310", "0.65320", "0.65330", "0.65300", "-1", "-1"])
+
+        # Act
+        self.decoder.interpret(fields)
+
+        # Assert
+        handler.assert_called_once_with(
+            -10,
+            ("1711637280", 0.6531, 0.6533, 0.653, 0.6532, Decimal("-1"), Decimal("-1"), -1),
+        )
+
+    def test_historical_ticks_bid_ask(self):
+        # Arrange
+        handler = Mock()
+        self.decoder.register(97, handler)
+        fields = to_fields(["97", "-10", "1", "1711637220", "0", "0.6532", "0.6534", "3", "", "1"])
+
+        # Act
+        self.decoder.interpret(fields)
+
+        # Assert
+        handler.assert_called_once_with(
+            -10,
+            [(1711637220, 0.6532, 0.6534, Decimal("3"), UNSET_DECIMAL, 0)],
+            True,
+        )
+
+    def test_tick_by_tick_bid_ask(self):
+        # Arrange
+        handler = Mock()
+        self.decoder.register(99, handler)
+        fields = to_fields(["99", "-10", "3", "1711637220", "0.6532", "0.6534", "3", "4", "2"])
+
+        # Act
+        self.decoder.interpret(fields)
+
+        # Assert
+        handler.assert_called_once_with(-10, (1711637220, 0.6532, 0.6534, Decimal("3"), Decimal("4"), 2))
+
+    def test_tick_by_tick_other_tick_types_fall_back(self):
+        # Arrange
+        handler = Mock()
+        self.decoder.register(99, handler)
+        fields = to_fields(["99", "-10", "1", "1711637220", "0.6532", "1", "0", "", "", "0"])
+
+        # Act
+        self.decoder.interpret(fields)
+
+        # Assert
+        handler.assert_not_called()
+        self.fallback.interpret.assert_called_once_with(fields)
+
+    def test_unregistered_message_falls_back(self):
+        # Arrange
+        fields = to_fields(["4", "2", "-1", "2104", "Market data farm connection is OK:usfarm", ""])
+
+        # Act
+        self.decoder.interpret(fields)
+
+        # Assert
+        self.fallback.interpret.assert_called_once_with(fields)
+
+    def test_register_unknown_message_id_raises(self):
+        with pytest.raises(ValueError):
+            self.decoder.register(4, Mock())
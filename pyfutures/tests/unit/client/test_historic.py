@@ -1,16 +1,33 @@
 import asyncio
+import datetime
+import tempfile
+from collections import deque
 from decimal import Decimal
+from pathlib import Path
 from unittest.mock import AsyncMock
 from unittest.mock import Mock
 
 import pandas as pd
 import pytest
+import pytz
 from ibapi.common import BarData
+from ibapi.common import HistoricalTickBidAsk
 from ibapi.contract import Contract as IBContract
+from nautilus_trader.model.data import BarType
 
+from pyfutures.client.cache import BarRangeCache
+from pyfutures.client.cache import RequestsCache
 from pyfutures.client.enums import BarSize
+from pyfutures.client.enums import DuplicatePolicy
+from pyfutures.client.enums import Duration
+from pyfutures.client.enums import Frequency
 from pyfutures.client.enums import WhatToShow
 from pyfutures.client.historic import InteractiveBrokersHistoricClient
+from pyfutures.client.objects import SeamStats
+from pyfutures.client.pacing import PacingScheduler
+from pyfutures.client.planner import DurationPlanner
+from pyfutures.data.writer import BarParquetWriter
+from pyfutures.schedule.schedule import MarketSchedule
 from pyfutures.tests.unit.client.stubs import ClientStubs
 
 
@@ -40,6 +57,25 @@ class TestHistoric:
         )
         assert len(bars) == 60
 
+    @pytest.mark.asyncio()
+    async def test_request_bars_flushes_cache_when_finished(self):
+        # Arrange
+        self.historic._client.request_bars = AsyncMock(side_effect=self.request_bars)
+        cache = Mock(spec=RequestsCache)
+
+        # Act
+        await self.historic.request_bars(
+            contract=self.contract,
+            bar_size=BarSize._1_MINUTE,
+            what_to_show=WhatToShow.BID_ASK,
+            start_time=pd.Timestamp("2023-01-03 00:00:00", tz="UTC"),
+            end_time=pd.Timestamp("2023-01-04 00:00:00", tz="UTC"),
+            cache=cache,
+        )
+
+        # Assert
+        cache.flush.assert_called_once()
+
     @pytest.mark.asyncio()
     async def test_request_bars_returns_expected_dataframe(self):
         send_mock = AsyncMock(side_effect=self.request_bars)
@@ -88,6 +124,620 @@ class TestHistoric:
             pd.Timestamp("2023-01-04 00:00:00+0000", tz="UTC"),
         ]
 
+    @pytest.mark.asyncio()
+    async def test_request_bars_concurrency_returns_bars_in_order(self):
+        self.historic._client.request_bars = AsyncMock(side_effect=self.request_bars)
+
+        kwargs = dict(
+            contract=self.contract,
+            bar_size=BarSize._1_MINUTE,
+            what_to_show=WhatToShow.BID_ASK,
+            start_time=pd.Timestamp("2023-01-03 00:00:00", tz="UTC"),
+            end_time=pd.Timestamp("2023-01-05 02:00:00", tz="UTC"),
+        )
+        expected = await self.historic.request_bars(**kwargs)
+
+        bars = await self.historic.request_bars(**kwargs, concurrency=3)
+
+        assert [b.timestamp for b in bars] == [b.timestamp for b in expected]
+
+    @pytest.mark.asyncio()
+    async def test_request_bars_concurrency_limit(self):
+        self.historic._client.request_bars = AsyncMock(side_effect=self.request_bars)
+
+        bars = await self.historic.request_bars(
+            contract=self.contract,
+            bar_size=BarSize._1_MINUTE,
+            what_to_show=WhatToShow.BID_ASK,
+            start_time=pd.Timestamp("2023-01-03 00:00:00", tz="UTC"),
+            end_time=pd.Timestamp("2023-01-05 02:00:00", tz="UTC"),
+            limit=60,
+            concurrency=3,
+        )
+
+        assert len(bars) == 60
+        assert bars[-1].timestamp == pd.Timestamp("2023-01-05 00:59:00", tz="UTC")
+
+    @pytest.mark.asyncio()
+    async def test_request_bars_reports_seam_stats(self):
+        self.historic._client.request_bars = AsyncMock(side_effect=self.request_bars)
+        stats = SeamStats()
+
+        await self.historic.request_bars(
+            contract=self.contract,
+            bar_size=BarSize._1_MINUTE,
+            what_to_show=WhatToShow.BID_ASK,
+            start_time=pd.Timestamp("2023-01-03 00:00:00", tz="UTC"),
+            end_time=pd.Timestamp("2023-01-05 02:00:00", tz="UTC"),
+            stats=stats,
+        )
+
+        # each window holds the first hour of the day only
+        assert stats == SeamStats(seams=2, duplicates=0, gaps=2)
+
+    @pytest.mark.asyncio()
+    async def test_request_bars_serves_sub_range_from_bar_cache(self):
+        # Arrange
+        self.historic._bar_cache = BarRangeCache(Path(tempfile.mkdtemp()))
+        self.historic._client.request_bars = AsyncMock(side_effect=self.request_bars)
+        await self.historic.request_bars(
+            contract=self.contract,
+            bar_size=BarSize._1_MINUTE,
+            what_to_show=WhatToShow.BID_ASK,
+            start_time=pd.Timestamp("2023-01-03 00:00:00", tz="UTC"),
+            end_time=pd.Timestamp("2023-01-05 02:00:00", tz="UTC"),
+        )
+
+        # Act
+        bars = await self.historic.request_bars(
+            contract=self.contract,
+            bar_size=BarSize._1_MINUTE,
+            what_to_show=WhatToShow.BID_ASK,
+            start_time=pd.Timestamp("2023-01-04 00:00:00", tz="UTC"),
+            end_time=pd.Timestamp("2023-01-04 00:30:00", tz="UTC"),
+        )
+
+        # Assert
+        assert self.historic._client.request_bars.call_count == 3
+        assert len(bars) == 30
+        assert bars[0].timestamp == pd.Timestamp("2023-01-04 00:00:00", tz="UTC")
+
+    @pytest.mark.asyncio()
+    async def test_request_bars_downloads_uncovered_gap_only(self):
+        # Arrange
+        self.historic._bar_cache = BarRangeCache(Path(tempfile.mkdtemp()))
+        self.historic._client.request_bars = AsyncMock(side_effect=self.request_bars)
+        await self.historic.request_bars(
+            contract=self.contract,
+            bar_size=BarSize._1_MINUTE,
+            what_to_show=WhatToShow.BID_ASK,
+            start_time=pd.Timestamp("2023-01-03 00:00:00", tz="UTC"),
+            end_time=pd.Timestamp("2023-01-05 02:00:00", tz="UTC"),
+        )
+        self.historic._client.request_bars.reset_mock()
+
+        # Act
+        bars = await self.historic.request_bars(
+            contract=self.contract,
+            bar_size=BarSize._1_MINUTE,
+            what_to_show=WhatToShow.BID_ASK,
+            start_time=pd.Timestamp("2023-01-05 00:00:00", tz="UTC"),
+            end_time=pd.Timestamp("2023-01-07 00:00:00", tz="UTC"),
+        )
+
+        # Assert
+        self.historic._client.request_bars.assert_called_once()
+        sent_kwargs = self.historic._client.request_bars.call_args[1]
+        assert sent_kwargs["end_time"] == pd.Timestamp("2023-01-07", tz="UTC")
+        assert [b.timestamp.day for b in bars[::60]] == [5, 6]
+
+    @pytest.mark.asyncio()
+    async def test_request_bars_leaves_failed_window_uncovered_in_bar_cache(self):
+        # Arrange
+        self.historic._bar_cache = BarRangeCache(Path(tempfile.mkdtemp()))
+
+        async def request_bars(**kwargs):
+            if kwargs["end_time"] == pd.Timestamp("2023-01-05", tz="UTC"):
+                raise asyncio.TimeoutError
+            return await self.request_bars(**kwargs)
+
+        self.historic._client.request_bars = AsyncMock(side_effect=request_bars)
+        key = self.historic._bar_cache.build_key(
+            contract=self.contract,
+            bar_size=BarSize._1_MINUTE,
+            what_to_show=WhatToShow.BID_ASK,
+        )
+
+        # Act
+        await self.historic.request_bars(
+            contract=self.contract,
+            bar_size=BarSize._1_MINUTE,
+            what_to_show=WhatToShow.BID_ASK,
+            duration=Duration(step=1, freq=Frequency.DAY),
+            start_time=pd.Timestamp("2023-01-03", tz="UTC"),
+            end_time=pd.Timestamp("2023-01-05", tz="UTC"),
+        )
+
+        # Assert
+        assert self.historic._bar_cache.intervals(key) == [
+            (pd.Timestamp("2023-01-03", tz="UTC"), pd.Timestamp("2023-01-04", tz="UTC"))
+        ]
+
+    @pytest.mark.asyncio()
+    async def test_request_bars_reports_window_timed_out_with_fixed_duration(self):
+        # Arrange
+        async def request_bars(**kwargs):
+            if kwargs["end_time"] == pd.Timestamp("2023-01-05", tz="UTC"):
+                raise asyncio.TimeoutError
+            return await self.request_bars(**kwargs)
+
+        self.historic._client.request_bars = AsyncMock(side_effect=request_bars)
+        stats = SeamStats()
+
+        # Act
+        await self.historic.request_bars(
+            contract=self.contract,
+            bar_size=BarSize._1_MINUTE,
+            what_to_show=WhatToShow.BID_ASK,
+            duration=Duration(step=1, freq=Frequency.DAY),
+            start_time=pd.Timestamp("2023-01-03", tz="UTC"),
+            end_time=pd.Timestamp("2023-01-05", tz="UTC"),
+            stats=stats,
+        )
+
+        # Assert
+        calls = self.historic._client.request_bars.call_args_list
+        assert [str(c[1]["duration"]) for c in calls] == ["1 D", "1 D"]
+        assert stats.failed == [
+            (pd.Timestamp("2023-01-04", tz="UTC"), pd.Timestamp("2023-01-05", tz="UTC"))
+        ]
+
+    @pytest.mark.asyncio()
+    async def test_request_bars_retries_timed_out_window_with_shorter_duration(self):
+        # Arrange
+        async def request_bars(**kwargs):
+            if str(kwargs["duration"]) == "1 D":
+                raise asyncio.TimeoutError
+            return []
+
+        self.historic._client.request_bars = AsyncMock(side_effect=request_bars)
+
+        # Act
+        await self.historic.request_bars(
+            contract=self.contract,
+            bar_size=BarSize._1_MINUTE,
+            what_to_show=WhatToShow.BID_ASK,
+            start_time=pd.Timestamp("2023-01-04 00:00:00", tz="UTC"),
+            end_time=pd.Timestamp("2023-01-05 00:00:00", tz="UTC"),
+            planner=DurationPlanner(bar_size=BarSize._1_MINUTE),
+        )
+
+        # Assert
+        calls = [c[1] for c in self.historic._client.request_bars.call_args_list]
+        assert [str(c["duration"]) for c in calls] == ["1 D"] + ["28800 S"] * 3
+        assert [c["end_time"].hour for c in calls[1:]] == [0, 16, 8]
+        assert all(c["raise_timeout"] for c in calls)
+
+    @pytest.mark.asyncio()
+    async def test_request_bars_default_duration_and_timeout_without_planner(self):
+        # Arrange
+        self.historic._client.request_bars = AsyncMock(side_effect=self.request_bars)
+
+        # Act
+        await self.historic.request_bars(
+            contract=self.contract,
+            bar_size=BarSize._5_MINUTE,
+            what_to_show=WhatToShow.BID_ASK,
+            start_time=pd.Timestamp("2023-01-03 00:00:00", tz="UTC"),
+            end_time=pd.Timestamp("2023-01-05 00:00:00", tz="UTC"),
+        )
+
+        # Assert
+        calls = [c[1] for c in self.historic._client.request_bars.call_args_list]
+        assert all(
+            c["duration"] == BarSize._5_MINUTE.to_appropriate_duration() for c in calls
+        )
+        assert all(c["timeout_seconds"] is None for c in calls)
+        assert not any(c["raise_timeout"] for c in calls)
+
+    @pytest.mark.asyncio()
+    async def test_request_bars_skips_windows_without_sessions(self):
+        # Arrange
+        self.historic._client.request_bars = AsyncMock(side_effect=self.request_bars)
+        schedule = MarketSchedule(
+            name="test",
+            data=pd.DataFrame(
+                {
+                    "dayofweek": range(5),
+                    "open": [datetime.time(0, 0)] * 5,
+                    "close": [datetime.time(23, 59)] * 5,
+                }
+            ),
+            timezone=pytz.UTC,
+        )
+        stats = SeamStats()
+
+        # Act
+        await self.historic.request_bars(
+            contract=self.contract,
+            bar_size=BarSize._1_MINUTE,
+            what_to_show=WhatToShow.BID_ASK,
+            start_time=pd.Timestamp("2023-01-06 00:00:00", tz="UTC"),  # Friday
+            end_time=pd.Timestamp("2023-01-10 00:00:00", tz="UTC"),
+            schedule=schedule,
+            stats=stats,
+        )
+
+        # Assert
+        end_times = [
+            c[1]["end_time"] for c in self.historic._client.request_bars.call_args_list
+        ]
+        assert end_times == [
+            pd.Timestamp("2023-01-10", tz="UTC"),
+            pd.Timestamp("2023-01-07", tz="UTC"),
+        ]
+        assert stats.skipped == 2
+
+    @pytest.mark.asyncio()
+    async def test_request_bars_split_bid_ask_caches_each_output(self):
+        # Arrange
+        cache = RequestsCache(Path(tempfile.mkdtemp()))
+        self.historic._client.request_bars = AsyncMock(side_effect=self.request_bars)
+
+        # Act
+        results = await self.historic.request_bars(
+            contract=self.contract,
+            bar_size=BarSize._1_MINUTE,
+            what_to_show=WhatToShow.BID_ASK,
+            start_time=pd.Timestamp("2023-01-04 00:00:00", tz="UTC"),
+            end_time=pd.Timestamp("2023-01-05 00:00:00", tz="UTC"),
+            cache=cache,
+            split_bid_ask=True,
+        )
+
+        # Assert
+        self.historic._client.request_bars.assert_called_once()
+        assert list(results) == [WhatToShow.BID, WhatToShow.ASK, WhatToShow.MIDPOINT]
+        assert all(len(bars) == 60 for bars in results.values())
+        for what_to_show in results:
+            key = RequestsCache.build_key(
+                contract=self.contract,
+                bar_size=BarSize._1_MINUTE,
+                what_to_show=what_to_show,
+                duration=Duration(step=1, freq=Frequency.DAY),
+                end_time=pd.Timestamp("2023-01-05", tz="UTC"),
+            )
+            assert len(cache.get(key)) == 60
+
+    @pytest.mark.asyncio()
+    async def test_request_bars_split_bid_ask_writes_each_output(self):
+        # Arrange
+        path = Path(tempfile.mkdtemp())
+        self.historic._client.request_bars = AsyncMock(side_effect=self.request_bars)
+        writers = {
+            what_to_show: BarParquetWriter(
+                path=path / f"{what_to_show.name}.parquet",
+                bar_type=BarType.from_str(
+                    f"DA.CME-1-MINUTE-{what_to_show.name}-EXTERNAL"
+                ),
+                price_precision=2,
+                size_precision=0,
+            )
+            for what_to_show in (WhatToShow.BID, WhatToShow.ASK)
+        }
+
+        # Act
+        await self.historic.request_bars(
+            contract=self.contract,
+            bar_size=BarSize._1_MINUTE,
+            what_to_show=WhatToShow.BID_ASK,
+            start_time=pd.Timestamp("2023-01-04 00:00:00", tz="UTC"),
+            end_time=pd.Timestamp("2023-01-05 00:00:00", tz="UTC"),
+            split_bid_ask=True,
+            writers=writers,
+        )
+
+        # Assert
+        for what_to_show in writers:
+            df = pd.read_parquet(path / f"{what_to_show.name}.parquet")
+            assert len(df) == 60
+            assert df["ts_event"].is_monotonic_increasing
+
+    def test_merge_window_keep_existing_drops_incoming_duplicates(self):
+        total_bars = deque(self.bars("2023-01-01 00:02:00", count=3))
+        stats = SeamStats()
+
+        InteractiveBrokersHistoricClient._merge_window(
+            total_bars=total_bars,
+            bars=self.bars("2023-01-01 00:00:00", count=4),
+            interval=pd.Timedelta(minutes=1),
+            duplicates=DuplicatePolicy.KEEP_EXISTING,
+            stats=stats,
+        )
+
+        assert [b.open for b in total_bars] == [0, 1, 0, 1, 2]
+        assert stats == SeamStats(seams=1, duplicates=2, gaps=0)
+
+    def test_merge_window_keep_incoming_replaces_existing_duplicates(self):
+        total_bars = deque(self.bars("2023-01-01 00:02:00", count=3))
+        stats = SeamStats()
+
+        InteractiveBrokersHistoricClient._merge_window(
+            total_bars=total_bars,
+            bars=self.bars("2023-01-01 00:00:00", count=4),
+            interval=pd.Timedelta(minutes=1),
+            duplicates=DuplicatePolicy.KEEP_INCOMING,
+            stats=stats,
+        )
+
+        assert [b.open for b in total_bars] == [0, 1, 2, 3, 2]
+        assert stats == SeamStats(seams=1, duplicates=2, gaps=0)
+
+    def test_merge_window_counts_gap(self):
+        total_bars = deque(self.bars("2023-01-01 00:10:00", count=2))
+        stats = SeamStats()
+
+        InteractiveBrokersHistoricClient._merge_window(
+            total_bars=total_bars,
+            bars=self.bars("2023-01-01 00:00:00", count=2),
+            interval=pd.Timedelta(minutes=1),
+            duplicates=DuplicatePolicy.KEEP_EXISTING,
+            stats=stats,
+        )
+
+        assert len(total_bars) == 4
+        assert stats == SeamStats(seams=1, duplicates=0, gaps=1)
+
+    @staticmethod
+    def bars(start: str, count: int) -> list[BarData]:
+        bars = [BarData() for _ in range(count)]
+        for i, bar in enumerate(bars):
+            bar.timestamp = pd.Timestamp(start, tz="UTC") + pd.Timedelta(minutes=i)
+            bar.open = i
+        return bars
+
+    @pytest.mark.asyncio()
+    async def test_stream_bars_yields_windows_oldest_first(self):
+        self.historic._client.request_bars = AsyncMock(side_effect=self.request_bars)
+
+        kwargs = dict(
+            contract=self.contract,
+            bar_size=BarSize._1_MINUTE,
+            what_to_show=WhatToShow.BID_ASK,
+            start_time=pd.Timestamp("2023-01-03 00:00:00", tz="UTC"),
+            end_time=pd.Timestamp("2023-01-05 02:00:00", tz="UTC"),
+        )
+        expected = await self.historic.request_bars(**kwargs)
+
+        batches = [
+            bars async for bars in self.historic.stream_bars(**kwargs, concurrency=2)
+        ]
+
+        assert len(batches) == 3
+        assert [b.timestamp for bars in batches for b in bars] == [
+            b.timestamp for b in expected
+        ]
+
+    @pytest.mark.asyncio()
+    async def test_stream_quotes_paginates_backwards(self):
+        end_time = pd.Timestamp("2023-01-05 00:00:00", tz="UTC")
+
+        async def request_quote_ticks(end_time, **kwargs):
+            quotes = [
+                Mock(timestamp=end_time - pd.Timedelta(seconds=i)) for i in (2, 1)
+            ]
+            return quotes
+
+        self.historic._client.request_quote_ticks = AsyncMock(
+            side_effect=request_quote_ticks
+        )
+
+        pages = [
+            page
+            async for page in self.historic.stream_quotes(
+                contract=self.contract,
+                start_time=end_time - pd.Timedelta(seconds=5),
+                end_time=end_time,
+            )
+        ]
+
+        assert [[q.timestamp for q in page] for page in pages] == [
+            [end_time - pd.Timedelta(seconds=2), end_time - pd.Timedelta(seconds=1)],
+            [end_time - pd.Timedelta(seconds=4), end_time - pd.Timedelta(seconds=3)],
+            [end_time - pd.Timedelta(seconds=5)],
+        ]
+        sent = self.historic._client.request_quote_ticks.call_args_list[0][1]
+        assert sent["start_time"] is None
+
+    @pytest.mark.asyncio()
+    async def test_request_quotes_returns_pages_in_timestamp_order(self):
+        end_time = pd.Timestamp("2023-01-05 00:00:00", tz="UTC")
+        self.historic._client.request_quote_ticks = AsyncMock(
+            side_effect=self.request_ticks
+        )
+
+        quotes = await self.historic.request_quotes(
+            contract=self.contract,
+            start_time=end_time - pd.Timedelta(seconds=5),
+            end_time=end_time,
+        )
+
+        assert [q.timestamp for q in quotes] == [
+            end_time - pd.Timedelta(seconds=i) for i in (5, 4, 3, 2, 1)
+        ]
+
+    @pytest.mark.asyncio()
+    async def test_request_trades_uses_trade_ticks(self):
+        end_time = pd.Timestamp("2023-01-05 00:00:00", tz="UTC")
+        self.historic._client.request_quote_ticks = AsyncMock()
+        self.historic._client.request_trade_ticks = AsyncMock(
+            side_effect=self.request_ticks
+        )
+
+        trades = await self.historic.request_trades(
+            contract=self.contract,
+            start_time=end_time - pd.Timedelta(seconds=4),
+            end_time=end_time,
+        )
+
+        assert len(trades) == 4
+        self.historic._client.request_quote_ticks.assert_not_called()
+
+    @pytest.mark.asyncio()
+    async def test_request_quotes_writes_pages_in_timestamp_order(self):
+        end_time = pd.Timestamp("2023-01-05 00:00:00", tz="UTC")
+        self.historic._client.request_quote_ticks = AsyncMock(
+            side_effect=self.request_ticks
+        )
+        writer = Mock()
+
+        count = await self.historic.request_quotes(
+            contract=self.contract,
+            start_time=end_time - pd.Timedelta(seconds=4),
+            end_time=end_time,
+            writer=writer,
+        )
+
+        assert count == 4
+        assert writer.write_dataframe.call_count == 2
+        first, second = writer.write_dataframe.call_args_list
+        assert first[1]["append"] is False
+        assert second[1]["append"] is True
+        df = first[0][0]
+        timestamps = pd.concat([first[0][0], second[0][0]])["timestamp"]
+        assert timestamps.is_monotonic_increasing
+        assert timestamps.iloc[0] == end_time - pd.Timedelta(seconds=4)
+        assert list(df.columns) == [
+            "timestamp",
+            "time",
+            "bid_price",
+            "ask_price",
+            "bid_size",
+            "ask_size",
+        ]
+        assert df["bid_size"].dtype == float
+
+    @pytest.mark.asyncio()
+    async def test_download_ticks_writes_a_part_per_day_shard(self):
+        # Arrange
+        path = Path(tempfile.mkdtemp())
+        self.historic._client.request_quote_ticks = AsyncMock(
+            side_effect=self.request_day_end_ticks
+        )
+
+        # Act
+        parts = await self.historic.download_ticks(
+            contract=self.contract,
+            what_to_show=WhatToShow.BID_ASK,
+            start_time=pd.Timestamp("2023-01-03 12:00:00", tz="UTC"),
+            end_time=pd.Timestamp("2023-01-06 00:00:00", tz="UTC"),
+            path=path,
+            concurrency=2,
+        )
+
+        # Assert
+        assert len(parts) == 3
+        df = pd.concat([pd.read_parquet(part) for part in parts])
+        assert df.timestamp.is_monotonic_increasing
+        assert list(df.timestamp.dt.day) == [3, 3, 4, 4, 5, 5]
+
+    @pytest.mark.asyncio()
+    async def test_download_ticks_resumes_from_unfinished_shards(self):
+        # Arrange
+        path = Path(tempfile.mkdtemp())
+        failed = pd.Timestamp("2023-01-05 00:00:00", tz="UTC")
+        self.historic._pacing = PacingScheduler(identical_seconds=0)
+
+        async def request_quote_ticks(end_time, **kwargs):
+            if end_time == failed:
+                raise asyncio.TimeoutError
+            return await self.request_day_end_ticks(end_time, **kwargs)
+
+        self.historic._client.request_quote_ticks = AsyncMock(
+            side_effect=request_quote_ticks
+        )
+        kwargs = dict(
+            contract=self.contract,
+            what_to_show=WhatToShow.BID_ASK,
+            start_time=pd.Timestamp("2023-01-03 00:00:00", tz="UTC"),
+            end_time=pd.Timestamp("2023-01-06 00:00:00", tz="UTC"),
+            path=path,
+        )
+        assert len(await self.historic.download_ticks(**kwargs)) == 2
+        self.historic._client.request_quote_ticks = AsyncMock(
+            side_effect=self.request_day_end_ticks
+        )
+
+        # Act
+        parts = await self.historic.download_ticks(**kwargs)
+
+        # Assert
+        assert len(parts) == 3
+        sent = self.historic._client.request_quote_ticks.call_args_list
+        assert sent[0][1]["end_time"] == failed
+
+    def test_plan_shards_aligns_first_shard_to_day(self):
+        shards = self.historic._plan_shards(
+            start_time=pd.Timestamp("2023-01-03 12:34:56", tz="UTC"),
+            end_time=pd.Timestamp("2023-01-05 06:00:00", tz="UTC"),
+        )
+
+        assert shards == [
+            (
+                pd.Timestamp("2023-01-03", tz="UTC"),
+                pd.Timestamp("2023-01-04", tz="UTC"),
+            ),
+            (
+                pd.Timestamp("2023-01-04", tz="UTC"),
+                pd.Timestamp("2023-01-05", tz="UTC"),
+            ),
+            (
+                pd.Timestamp("2023-01-05", tz="UTC"),
+                pd.Timestamp("2023-01-05 06:00:00", tz="UTC"),
+            ),
+        ]
+
+    def test_plan_shards_on_session_opens(self):
+        # Arrange
+        schedule = MarketSchedule(
+            name="test",
+            data=pd.DataFrame(
+                {
+                    "dayofweek": [0, 0, 1, 1],
+                    "open": [datetime.time(8, 30), datetime.time(17, 0)] * 2,
+                    "close": [datetime.time(16, 0), datetime.time(23, 59)] * 2,
+                }
+            ),
+            timezone=pytz.timezone("America/Chicago"),
+        )
+
+        # Act
+        shards = self.historic._plan_shards(
+            start_time=pd.Timestamp("2023-01-02 15:00:00", tz="UTC"),
+            end_time=pd.Timestamp("2023-01-04 00:00:00", tz="UTC"),
+            schedule=schedule,
+        )
+
+        # Assert
+        assert shards == [
+            (
+                pd.Timestamp("2023-01-02 14:30:00", tz="UTC"),
+                pd.Timestamp("2023-01-02 23:00:00", tz="UTC"),
+            ),
+            (
+                pd.Timestamp("2023-01-02 23:00:00", tz="UTC"),
+                pd.Timestamp("2023-01-03 14:30:00", tz="UTC"),
+            ),
+            (
+                pd.Timestamp("2023-01-03 14:30:00", tz="UTC"),
+                pd.Timestamp("2023-01-03 23:00:00", tz="UTC"),
+            ),
+            (
+                pd.Timestamp("2023-01-03 23:00:00", tz="UTC"),
+                pd.Timestamp("2023-01-04 00:00:00", tz="UTC"),
+            ),
+        ]
+
     @pytest.mark.asyncio()
     async def test_first_request_not_use_cache(self):
         # the first request will have incomplete data because the end time is ceiled to the interval
@@ -173,6 +823,24 @@ class TestHistoric:
         self.historic.cache.assert_called_once()
         asyncio.sleep.assert_called_once()  # first request only
 
+    async def request_ticks(self, end_time, **kwargs) -> list:
+        # two ticks per page, one second apart
+        ticks = [HistoricalTickBidAsk() for _ in range(2)]
+        for tick, seconds in zip(ticks, (2, 1)):
+            tick.timestamp = end_time - pd.Timedelta(seconds=seconds)
+            tick.time = int(tick.timestamp.timestamp())
+            tick.priceBid = 1.0
+            tick.priceAsk = 1.1
+            tick.sizeBid = Decimal("1")
+            tick.sizeAsk = Decimal("1")
+        return ticks
+
+    async def request_day_end_ticks(self, end_time, **kwargs) -> list:
+        # a single page at the end of each day
+        if end_time != end_time.floor("D"):
+            return []
+        return await self.request_ticks(end_time=end_time)
+
     async def request_bars(self, **kwargs) -> list[BarData]:
         end_time = kwargs["end_time"]
         start_time = end_time - pd.Timedelta(hours=24)
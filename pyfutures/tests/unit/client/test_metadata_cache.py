@@ -0,0 +1,92 @@
+import asyncio
+import tempfile
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pandas as pd
+import pytest
+
+from pyfutures.client.cache import MetadataCache
+
+
+class TestMetadataCache:
+    def setup_method(self):
+        self.path = Path(tempfile.mkdtemp())
+        self.cache = MetadataCache(path=self.path)
+        self.fetch = AsyncMock(return_value="value")
+
+    @pytest.mark.asyncio()
+    async def test_fetches_once(self):
+        # Act
+        first = await self.cache.get_or_fetch("head_timestamp", ("A", 1), self.fetch)
+        second = await self.cache.get_or_fetch("head_timestamp", ("A", 1), self.fetch)
+
+        # Assert
+        assert first == second == "value"
+        self.fetch.assert_awaited_once()
+
+    @pytest.mark.asyncio()
+    async def test_reads_disk_after_restart(self):
+        await self.cache.get_or_fetch("head_timestamp", "A", self.fetch)
+
+        cache = MetadataCache(path=self.path)
+        value = await cache.get_or_fetch("head_timestamp", "A", AsyncMock())
+
+        assert value == "value"
+
+    @pytest.mark.asyncio()
+    async def test_stale_value_is_returned_and_refreshed(self):
+        # Arrange
+        cache = MetadataCache(path=self.path, ttls={"head_timestamp": pd.Timedelta(0)})
+        await cache.get_or_fetch("head_timestamp", "A", self.fetch)
+        refresh = AsyncMock(return_value="new")
+
+        # Act
+        value = await cache.get_or_fetch("head_timestamp", "A", refresh)
+        await asyncio.sleep(0)
+
+        # Assert
+        assert value == "value"
+        refresh.assert_awaited_once()
+        assert cache._entries[("head_timestamp", "A")].value == "new"
+
+    @pytest.mark.asyncio()
+    async def test_failed_refresh_keeps_stale_value(self):
+        cache = MetadataCache(path=self.path, ttls={"head_timestamp": pd.Timedelta(0)})
+        await cache.get_or_fetch("head_timestamp", "A", self.fetch)
+
+        await cache.get_or_fetch(
+            "head_timestamp", "A", AsyncMock(side_effect=asyncio.TimeoutError())
+        )
+        await asyncio.sleep(0)
+
+        assert await cache.get_or_fetch("head_timestamp", "A", AsyncMock()) == "value"
+
+    @pytest.mark.asyncio()
+    async def test_expired_value_is_fetched_again(self):
+        # Arrange
+        expired = pd.Timestamp.utcnow() - pd.Timedelta(seconds=1)
+        await self.cache.get_or_fetch(
+            "contract_details", "A", self.fetch, expires=lambda _: expired
+        )
+        fetch = AsyncMock(return_value="new")
+
+        # Act
+        value = await self.cache.get_or_fetch("contract_details", "A", fetch)
+
+        # Assert
+        assert value == "new"
+        fetch.assert_awaited_once()
+
+    @pytest.mark.asyncio()
+    async def test_memory_is_bounded(self):
+        cache = MetadataCache(path=self.path, max_entries=2)
+
+        for key in ("A", "B", "C"):
+            await cache.get_or_fetch("head_timestamp", key, self.fetch)
+
+        assert list(cache._entries) == [
+            ("head_timestamp", "B"),
+            ("head_timestamp", "C"),
+        ]
+        assert len(cache) == 3
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from pyfutures.client.metrics import Histogram
+from pyfutures.client.metrics import MetricsRegistry
+from pyfutures.client.metrics import Rate
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestHistogram:
+    def test_observe(self):
+        histogram = Histogram(buckets=(1.0, 2.0))
+        for value in (0.5, 1.5, 1.5, 3.0):
+            histogram.observe(value)
+
+        assert histogram.counts == [1, 2, 1]
+        assert histogram.count == 4
+        assert histogram.sum == 6.5
+        assert histogram.quantile(0.5) == 2.0
+        assert histogram.quantile(1.0) == float("inf")
+
+
+class TestRate:
+    def test_per_second_over_window(self):
+        clock = FakeClock()
+        rate = Rate(window_seconds=10, clock=clock)
+        for i in range(20):
+            clock.now = i * 0.5
+            rate.mark()
+
+        assert rate.per_second() == 2.0
+
+        clock.now = 100
+        assert rate.per_second() == 0
+        assert rate.count == 20
+
+
+class TestMetricsRegistry:
+    def setup_method(self):
+        self.metrics = MetricsRegistry(clock=FakeClock())
+
+    def test_request_latency_and_in_flight(self):
+        self.metrics.request_started("bars")
+        self.metrics.request_started("bars")
+        assert self.metrics.in_flight["bars"] == 2
+
+        self.metrics.request_finished("bars", seconds=0.3)
+        self.metrics.request_finished("bars", seconds=5, timed_out=True)
+
+        assert self.metrics.in_flight["bars"] == 0
+        assert self.metrics.latency["bars"].count == 1
+        assert self.metrics.timeouts["bars"] == 1
+
+    def test_message_received(self):
+        self.metrics.message_received(b"17", 100)
+        self.metrics.message_received(b"17", 50)
+
+        assert self.metrics.messages["17"] == 2
+        assert self.metrics.message_bytes["17"] == 150
+
+    def test_render(self):
+        self.metrics.request_started("bars")
+        self.metrics.request_finished("bars", seconds=0.3)
+        self.metrics.error_received(162)
+        self.metrics.message_received(b"17", 100)
+        self.metrics.callback_called("quote_ticks")
+
+        text = self.metrics.render()
+
+        assert (
+            'pyfutures_request_latency_seconds_bucket{request="bars",le="0.5"} 1'
+            in text
+        )
+        assert 'pyfutures_request_latency_seconds_count{request="bars"} 1' in text
+        assert 'pyfutures_errors_total{code="162"} 1' in text
+        assert 'pyfutures_message_bytes_total{msg_id="17"} 100' in text
+        assert 'pyfutures_callbacks_total{subscription="quote_ticks"} 1' in text
+
+    @pytest.mark.asyncio()
+    async def test_serve(self):
+        self.metrics.error_received(162)
+        port = await self.metrics.serve(port=0)
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            response = await reader.read()
+            writer.close()
+        finally:
+            self.metrics.close()
+
+        assert response.startswith(b"HTTP/1.1 200 OK")
+        assert b'pyfutures_errors_total{code="162"} 1' in response
@@ -0,0 +1,96 @@
+from unittest.mock import Mock
+
+from pyfutures.client.multiplexer import SubscriptionMultiplexer
+from pyfutures.client.objects import ClientSubscription
+
+
+class TestSubscriptionMultiplexer:
+    def setup_method(self):
+        self.multiplexer = SubscriptionMultiplexer()
+        self.cancel = Mock()
+        self.open_subscription = Mock(side_effect=self._open_subscription)
+
+    def _open_subscription(self, callback):
+        self.fan_out = callback
+        return ClientSubscription(
+            id=-10,
+            subscribe=Mock(),
+            cancel=self.cancel,
+            callback=callback,
+        )
+
+    def test_same_key_opens_one_subscription(self):
+        # Act
+        first = self.multiplexer.subscribe("key", Mock(), self.open_subscription)
+        second = self.multiplexer.subscribe("key", Mock(), self.open_subscription)
+
+        # Assert
+        self.open_subscription.assert_called_once()
+        assert first.id == second.id == -10
+        assert self.multiplexer.consumer_count("key") == 2
+
+    def test_different_keys_open_separate_subscriptions(self):
+        self.multiplexer.subscribe("key1", Mock(), self.open_subscription)
+        self.multiplexer.subscribe("key2", Mock(), self.open_subscription)
+
+        assert self.open_subscription.call_count == 2
+
+    def test_updates_fan_out_to_every_consumer(self):
+        # Arrange
+        callbacks = [Mock(), Mock()]
+        for callback in callbacks:
+            self.multiplexer.subscribe("key", callback, self.open_subscription)
+
+        # Act
+        self.fan_out("bar")
+
+        # Assert
+        for callback in callbacks:
+            callback.assert_called_once_with("bar")
+
+    def test_cancel_only_on_last_consumer(self):
+        # Arrange
+        first = self.multiplexer.subscribe("key", Mock(), self.open_subscription)
+        second = self.multiplexer.subscribe("key", Mock(), self.open_subscription)
+
+        # Act & Assert
+        first.cancel()
+        self.cancel.assert_not_called()
+        assert "key" in self.multiplexer
+
+        second.cancel()
+        self.cancel.assert_called_once()
+        assert "key" not in self.multiplexer
+
+    def test_cancel_twice_is_ignored(self):
+        first = self.multiplexer.subscribe("key", Mock(), self.open_subscription)
+        self.multiplexer.subscribe("key", Mock(), self.open_subscription)
+
+        first.cancel()
+        first.cancel()
+
+        self.cancel.assert_not_called()
+        assert self.multiplexer.consumer_count("key") == 1
+
+    def test_cancelled_consumer_stops_receiving(self):
+        callback = Mock()
+        subscription = self.multiplexer.subscribe(
+            "key", callback, self.open_subscription
+        )
+        self.multiplexer.subscribe("key", Mock(), self.open_subscription)
+
+        subscription.cancel()
+        self.fan_out("bar")
+
+        callback.assert_not_called()
+
+    def test_callback_exception_does_not_stop_fan_out(self):
+        callback = Mock()
+        self.multiplexer.subscribe(
+            "key", Mock(side_effect=RuntimeError()), self.open_subscription
+        )
+        self.multiplexer.subscribe("key", callback, self.open_subscription)
+
+        self.fan_out("bar")
+
+        callback.assert_called_once_with("bar")
@@ -0,0 +1,122 @@
+import asyncio
+import tempfile
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pandas as pd
+import pytest
+
+from pyfutures.client.cache import NegativeCache
+from pyfutures.client.cache import NegativeCachedFunc
+from pyfutures.client.objects import ClientException
+from pyfutures.client.objects import NegativeCachePolicy
+
+
+class TestNegativeCachePolicy:
+    def setup_method(self):
+        self.policy = NegativeCachePolicy()
+
+    def test_no_data_is_permanent(self):
+        ex = ClientException(
+            code=162,
+            message="Historical Market Data Service error message:HMDS query returned no data",
+        )
+        assert self.policy.ttl(ex) is None
+
+    def test_no_security_definition_is_permanent(self):
+        ex = ClientException(code=200, message="No security definition has been found")
+        assert self.policy.ttl(ex) is None
+
+    def test_pacing_violation_matches_message_before_code(self):
+        ex = ClientException(
+            code=162,
+            message="Historical Market Data Service error message:Historical data request pacing violation",
+        )
+        assert self.policy.ttl(ex) == pd.Timedelta(minutes=10)
+
+    def test_other_hmds_error_expires(self):
+        ex = ClientException(
+            code=162,
+            message="Historical Market Data Service error message:No market data permissions for CME FUT",
+        )
+        assert self.policy.ttl(ex) == pd.Timedelta(hours=1)
+
+    def test_timeout(self):
+        assert self.policy.ttl(asyncio.TimeoutError()) == pd.Timedelta(minutes=5)
+
+    def test_unknown_code_uses_default(self):
+        ex = ClientException(code=1, message="test")
+        assert self.policy.ttl(ex) == pd.Timedelta(hours=1)
+
+
+class TestNegativeCache:
+    def setup_method(self):
+        self.path = Path(tempfile.mkdtemp())
+        self.cache = NegativeCache(path=self.path)
+        self.no_data = ClientException(code=162, message="HMDS query returned no data")
+
+    def test_permanent_error_round_trip(self):
+        self.cache.set("key", self.no_data)
+
+        cache = NegativeCache(path=self.path)
+
+        assert cache.get("key") == self.no_data
+        assert len(cache) == 1
+
+    def test_transient_error_expires(self):
+        # Arrange
+        self.cache.set("key", asyncio.TimeoutError())
+        now = pd.Timestamp.utcnow() + pd.Timedelta(minutes=6)
+
+        # Act
+        self.cache._now_ns = lambda: now.value
+
+        # Assert
+        assert self.cache.get("key") is None
+        assert len(self.cache) == 0
+
+    def test_zero_ttl_is_not_cached(self):
+        self.cache.set("key", ClientException(code=366, message="test"))
+        assert self.cache.get("key") is None
+
+    def test_purge_code(self):
+        self.cache.set("key1", self.no_data)
+        self.cache.set("key2", ClientException(code=200, message="test"))
+
+        self.cache.purge(code=162)
+
+        assert self.cache.get("key1") is None
+        assert self.cache.get("key2") is not None
+
+
+class TestNegativeCachedFunc:
+    def setup_method(self):
+        self.cache = NegativeCache(path=Path(tempfile.mkdtemp()))
+        self.func = AsyncMock(
+            side_effect=ClientException(code=162, message="HMDS query returned no data")
+        )
+        self.cached_func = NegativeCachedFunc(
+            func=self.func,
+            cache=self.cache,
+            build_key=lambda **kwargs: kwargs["key"],
+        )
+
+    @pytest.mark.asyncio()
+    async def test_permanent_error_skips_request(self):
+        # Arrange
+        with pytest.raises(ClientException):
+            await self.cached_func(key="key")
+
+        # Act & Assert
+        with pytest.raises(ClientException):
+            await self.cached_func(key="key")
+        self.func.assert_awaited_once()
+        assert self.cached_func.is_cached(key="key")
+
+    @pytest.mark.asyncio()
+    async def test_result_is_not_cached(self):
+        self.func.side_effect = None
+        self.func.return_value = [1]
+
+        assert await self.cached_func(key="key") == [1]
+        assert not self.cached_func.is_cached(key="key")
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from pyfutures.client.pacing import PacingScheduler
+from pyfutures.client.pacing import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTokenBucket:
+    def test_wait_seconds_after_capacity_consumed(self):
+        clock = FakeClock()
+        bucket = TokenBucket(capacity=6, period_seconds=2, clock=clock)
+        for _ in range(6):
+            assert bucket.wait_seconds() == 0
+            bucket.consume()
+        assert bucket.wait_seconds() == pytest.approx(2 / 6)
+
+        clock.now = 2 / 6
+        assert bucket.wait_seconds() == 0
+
+
+class TestPacingScheduler:
+    def setup_method(self):
+        self.clock = FakeClock()
+        self.pacing = PacingScheduler(
+            max_requests=3,
+            window_seconds=600,
+            identical_seconds=15,
+            burst_requests=2,
+            burst_seconds=2,
+            max_concurrent=2,
+            clock=self.clock,
+        )
+
+    @pytest.mark.asyncio()
+    async def test_sliding_window(self):
+        for i in range(3):
+            self.clock.now = i
+            await self.pacing.acquire(key=i)
+            self.pacing.release()
+
+        self.clock.now = 10
+        assert self.pacing.wait_seconds(key=3) == 590
+
+        self.clock.now = 600
+        assert self.pacing.wait_seconds(key=3) == 0
+
+    @pytest.mark.asyncio()
+    async def test_identical_requests(self):
+        await self.pacing.acquire(key="a")
+        self.pacing.release()
+
+        self.clock.now = 5
+        assert self.pacing.wait_seconds(key="a") == 10
+        assert self.pacing.wait_seconds(key="b") == 0
+
+    @pytest.mark.asyncio()
+    async def test_burst_key(self):
+        await self.pacing.acquire(key=1, burst_key="DA")
+        self.pacing.release()
+        await self.pacing.acquire(key=2, burst_key="DA")
+        self.pacing.release()
+
+        assert self.pacing.wait_seconds(key=3, burst_key="DA") == pytest.approx(2)
+        assert self.pacing.wait_seconds(key=3, burst_key="ZC") == 0
+
+    @pytest.mark.asyncio()
+    async def test_burst_key_allows_fewer_than_6_requests_in_any_2_seconds(self):
+        # Arrange
+        pacing = PacingScheduler(clock=self.clock)
+        sent = []
+
+        # Act
+        for i in range(10):
+            self.clock.now += pacing.wait_seconds(key=i, burst_key="DA")
+            await pacing.acquire(key=i, burst_key="DA")
+            pacing.release()
+            sent.append(self.clock.now)
+
+        # Assert
+        for start in sent:
+            assert sum(start <= t < start + 2 for t in sent) <= 5
+
+    @pytest.mark.asyncio()
+    async def test_max_concurrent(self):
+        await self.pacing.acquire(key=1)
+        await self.pacing.acquire(key=2)
+        assert self.pacing.in_flight == 2
+
+        task = asyncio.create_task(self.pacing.acquire(key=3))
+        await asyncio.sleep(0)
+        assert not task.done()
+
+        self.pacing.release()
+        await asyncio.wait_for(task, 1)
+        assert self.pacing.in_flight == 2
+
+    @pytest.mark.asyncio()
+    async def test_slot_releases_on_exception(self):
+        with pytest.raises(RuntimeError):
+            async with self.pacing.slot(key=1):
+                raise RuntimeError()
+        assert self.pacing.in_flight == 0
+
+    @pytest.mark.asyncio()
+    async def test_acquire_waits_until_allowed(self):
+        pacing = PacingScheduler(identical_seconds=0.05)
+        await pacing.acquire(key="a")
+        pacing.release()
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await pacing.acquire(key="a")
+        pacing.release()
+        assert loop.time() - start >= 0.04
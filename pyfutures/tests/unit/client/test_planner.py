@@ -0,0 +1,70 @@
+import pandas as pd
+
+from pyfutures.client.enums import BarSize
+from pyfutures.client.enums import Duration
+from pyfutures.client.enums import Frequency
+from pyfutures.client.planner import DurationPlanner
+
+
+class TestDurationPlanner:
+    def test_allowed_durations_follow_bar_size_limits(self):
+        assert str(BarSize._1_SECOND.allowed_durations()[-1]) == "1800 S"
+        assert str(BarSize._1_MINUTE.allowed_durations()[-1]) == "1 D"
+        assert str(BarSize._1_HOUR.allowed_durations()[0]) == "3600 S"
+        assert str(BarSize._1_DAY.allowed_durations()[-1]) == "365 D"
+
+    def test_plan_chooses_fewest_requests(self):
+        # Arrange
+        planner = DurationPlanner(bar_size=BarSize._5_MINUTE)
+
+        # Act
+        duration = planner.plan(
+            start_time=pd.Timestamp("2023-01-01", tz="UTC"),
+            end_time=pd.Timestamp("2023-01-03", tz="UTC"),
+        )
+
+        # Assert
+        assert str(duration) == "2 D"
+
+    def test_on_timeout_shrinks_and_caps_duration(self):
+        # Arrange
+        planner = DurationPlanner(bar_size=BarSize._1_MINUTE)
+        start_time = pd.Timestamp("2023-01-01", tz="UTC")
+        end_time = pd.Timestamp("2023-01-10", tz="UTC")
+        planner.plan(start_time, end_time)
+
+        # Act
+        shrunk = planner.on_timeout()
+        planner.plan(start_time, end_time)
+
+        # Assert
+        assert shrunk
+        assert str(planner.duration) == "28800 S"
+
+    def test_on_timeout_returns_false_at_shortest_duration(self):
+        planner = DurationPlanner(
+            bar_size=BarSize._1_MINUTE,
+            durations=[Duration(step=60, freq=Frequency.SECOND)],
+        )
+        assert not planner.on_timeout()
+
+    def test_on_response_grows_back_to_planned_duration(self):
+        # Arrange
+        planner = DurationPlanner(bar_size=BarSize._1_MINUTE, fast_seconds=5)
+        planner.plan(
+            start_time=pd.Timestamp("2023-01-01", tz="UTC"),
+            end_time=pd.Timestamp("2023-01-10", tz="UTC"),
+        )
+        planner.on_timeout()
+        planner.on_timeout()
+
+        # Act
+        planner.on_response(seconds=10)
+        slow = str(planner.duration)
+        planner.on_response(seconds=1)
+        planner.on_response(seconds=1)
+        planner.on_response(seconds=1)
+
+        # Assert
+        assert slow == "14400 S"
+        assert str(planner.duration) == "1 D"
@@ -0,0 +1,89 @@
+import asyncio
+from unittest.mock import AsyncMock
+from unittest.mock import Mock
+
+import pytest
+from ibapi.contract import Contract as IBContract
+
+from pyfutures.client.enums import BarSize
+from pyfutures.client.enums import WhatToShow
+from pyfutures.client.pool import InteractiveBrokersClientPool
+
+
+class TestClientPool:
+    def setup_method(self):
+        self.pool = InteractiveBrokersClientPool(
+            loop=asyncio.get_event_loop(),
+            client_ids=(1, 2, 3),
+        )
+
+    def test_clients_use_distinct_client_ids(self):
+        assert self.pool.order_client.conn.protocol.client_id == 1
+        assert [c.conn.protocol.client_id for c in self.pool.data_clients] == [2, 3]
+
+    def test_duplicate_client_ids_raises(self):
+        with pytest.raises(ValueError):
+            InteractiveBrokersClientPool(
+                loop=asyncio.get_event_loop(), client_ids=(1, 1)
+            )
+
+    def test_next_client_never_returns_order_client(self):
+        clients = [self.pool.next_client() for _ in range(10)]
+        assert self.pool.order_client not in clients
+        assert set(clients) == set(self.pool.data_clients)
+
+    def test_next_client_returns_least_loaded(self):
+        busy, idle = self.pool.data_clients
+        busy._requests[-10] = Mock()
+        assert all(self.pool.next_client() is idle for _ in range(4))
+
+    @pytest.mark.asyncio()
+    async def test_request_bars_routes_to_data_client(self):
+        for client in self.pool.clients:
+            client.request_bars = AsyncMock(return_value=[])
+
+        await self.pool.request_bars(
+            contract=IBContract(),
+            bar_size=BarSize._1_MINUTE,
+            what_to_show=WhatToShow.BID,
+        )
+
+        self.pool.order_client.request_bars.assert_not_called()
+        assert sum(c.request_bars.call_count for c in self.pool.data_clients) == 1
+
+    @pytest.mark.asyncio()
+    async def test_subscription_cancels_on_subscribing_client(self):
+        for client in self.pool.clients:
+            client._eclient.reqTickByTickData = Mock()
+            client._eclient.cancelTickByTickData = Mock()
+
+        subscription = self.pool.subscribe_quote_ticks(
+            contract=IBContract(),
+            callback=Mock(),
+        )
+        client = next(
+            c for c in self.pool.data_clients if subscription.id in c._subscriptions
+        )
+
+        subscription.cancel()
+
+        client._eclient.cancelTickByTickData.assert_called_once_with(
+            reqId=subscription.id
+        )
+        assert subscription.id not in client._subscriptions
+        for other in self.pool.clients:
+            if other is not client:
+                other._eclient.cancelTickByTickData.assert_not_called()
+
+    def test_same_subscription_shares_data_client(self):
+        for client in self.pool.clients:
+            client._eclient.reqTickByTickData = Mock()
+
+        contract = IBContract()
+        contract.conId = 1
+        first = self.pool.subscribe_quote_ticks(contract=contract, callback=Mock())
+        second = self.pool.subscribe_quote_ticks(contract=contract, callback=Mock())
+
+        assert first.id == second.id
+        calls = [c._eclient.reqTickByTickData.call_count for c in self.pool.clients]
+        assert sum(calls) == 1
@@ -4,7 +4,9 @@ from unittest.mock import call
 
 import pytest
 
+from pyfutures.client.protocol import Framer
 from pyfutures.client.protocol import Protocol
+from pyfutures.client.protocol import parse_buffer
 
 
 @pytest.mark.asyncio()
@@ -52,7 +54,7 @@ async def test_data_received_max_limit(event_loop):
     assert (
         fields_received_mock.call_args_list[0] == fields_received_mock.call_args_list[1]
     )
-    assert protocol._buffer == b""
+    assert len(protocol._framer) == 0
 
 
 @pytest.mark.asyncio()
@@ -272,3 +274,51 @@ async def test_data_received_multiple(event_loop):
     #     "reqId": -10,
     #     "contract": contract,
     # }
+
+
+def test_framer_keeps_incomplete_message_until_next_feed():
+    msg = b"\x00\x00\x00\t64\x001\x00-10\x00"
+    framer = Framer()
+    received = []
+
+    framer.feed(msg[:6])
+    assert framer.drain(lambda m: received.append(m.tobytes())) == 0
+    assert len(framer) == 6
+
+    framer.feed(msg[6:])
+    assert framer.drain(lambda m: received.append(m.tobytes())) == 1
+    assert received == [b"64\x001\x00-10\x00"]
+    assert len(framer) == 0
+
+
+def test_framer_compacts_consumed_bytes():
+    msg = b"\x00\x00\x00\t64\x001\x00-10\x00"
+    framer = Framer(compact_threshold=len(msg) * 2)
+
+    framer.feed(msg * 3 + msg[:2])
+    assert framer.drain(Mock()) == 3
+
+    # consumed bytes past the threshold are removed, the partial message is kept
+    assert framer._offset == 0
+    assert bytes(framer._buffer) == msg[:2]
+
+
+def test_parse_buffer_returns_messages_without_size_prefix():
+    buf = b"\x00\x00\x00\t64\x001\x00-10\x00\x00\x00\x00\t52\x001\x00-10\x00"
+    assert parse_buffer(buf) == [b"64\x001\x00-10\x00", b"52\x001\x00-10\x00"]
+
+
+def test_framer_drain_fields_splits_messages_in_place():
+    buf = b"\x00\x00\x00\x0863\x00\x00GBP\x00\x00\x00\x00\t52\x001\x00-10\x00"
+    framer = Framer()
+    received = []
+
+    framer.feed(buf)
+    count = framer.drain_fields(lambda fields, size: received.append((fields, size)))
+
+    assert count == 2
+    assert received == [
+        ((b"63", b"", b"GBP"), 8),
+        ((b"52", b"1", b"-10"), 9),
+    ]
+    assert len(framer) == 0
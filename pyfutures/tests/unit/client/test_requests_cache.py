@@ -1,15 +1,22 @@
 import asyncio
+import copy
 import tempfile
 from decimal import Decimal
 from pathlib import Path
 from unittest.mock import Mock
 
 import pandas as pd
+import pyarrow.parquet as pq
 import pytest
+from ibapi.common import UNSET_DECIMAL
 from ibapi.common import BarData
 from ibapi.contract import Contract as IBContract
 
+from pyfutures.client.cache import BarRangeCache
+from pyfutures.client.cache import CachedFunc
+from pyfutures.client.cache import IndexedRequestsCache
 from pyfutures.client.cache import RequestsCache
+from pyfutures.client.columns import BarColumns
 from pyfutures.client.enums import BarSize
 from pyfutures.client.enums import WhatToShow
 from pyfutures.client.objects import ClientException
@@ -59,6 +66,48 @@ class TestRequestsCache:
         cached = self.cache.get(key="test")
         assert isinstance(cached, asyncio.TimeoutError)
 
+    def test_get_columns_reads_bar_data(self):
+        self.cache.set(key="test", value=[self.bar])
+
+        columns = self.cache.get_columns(key="test")
+
+        df = columns.to_dataframe()
+        assert df.timestamp.iloc[0] == self.bar.timestamp
+        assert df.volume.iloc[0] == 1.0
+        assert df.volume.dtype == "float64"
+
+    def test_columns_round_trip(self):
+        self.cache.set(key="test", value=BarColumns.from_bars([self.bar]))
+
+        columns = self.cache.get_columns(key="test")
+        bars = self.cache.get(key="test")
+
+        assert len(columns) == 1
+        assert bars[0].timestamp == self.bar.timestamp
+        assert bars[0].volume == self.bar.volume
+
+    def test_get_returns_decimal_volume_for_columns(self):
+        # Arrange
+        bar = copy.copy(self.bar)
+        bar.volume = Decimal("2.5")
+        bar.wap = UNSET_DECIMAL
+        self.cache.set(key="columns", value=BarColumns.from_bars([bar]))
+        self.cache.set(key="bars", value=[bar])
+
+        # Act
+        cached = [self.cache.get(key=key)[0] for key in ("columns", "bars")]
+
+        # Assert
+        for cached_bar in cached:
+            assert isinstance(cached_bar.volume, Decimal)
+            assert cached_bar.volume == Decimal("2.5")
+            assert cached_bar.wap == UNSET_DECIMAL
+
+    def test_get_columns_returns_exception(self):
+        ex = ClientException(code=123, message="test")
+        self.cache.set(key="test", value=ex)
+        assert self.cache.get_columns(key="test") == ex
+
     def test_purge_timeout_error(self):
         self.cache.set(key="test_bar", value=[self.bar])
         self.cache.set(key="test_exception", value=asyncio.TimeoutError())
@@ -77,6 +126,236 @@ class TestRequestsCache:
         assert (self.cache.path / "test_bar.parquet").exists()
 
 
+class TestIndexedRequestsCache:
+    def setup_method(self):
+        self.bars = []
+        for i in range(3):
+            bar = BarData()
+            bar.timestamp = pd.Timestamp("2023-11-15 17:29:00+00:00", tz="UTC")
+            bar.timestamp += pd.Timedelta(minutes=i)
+            bar.date = int(bar.timestamp.timestamp())
+            bar.open = 1.0
+            bar.high = 2.0
+            bar.low = 0.5
+            bar.close = 1.5
+            bar.volume = Decimal("1.5")
+            bar.wap = Decimal("1")
+            bar.barCount = i
+            self.bars.append(bar)
+
+        self.path = Path(tempfile.mkdtemp())
+        self.cache = IndexedRequestsCache(path=self.path)
+
+    def test_get_returns_none_if_not_cached(self):
+        assert self.cache.get(key="test") is None
+
+    def test_bar_data_round_trip_before_and_after_flush(self):
+        self.cache.set(key="A=test", value=self.bars)
+        pending = self.cache.get(key="A=test")
+
+        self.cache.flush()
+        flushed = self.cache.get(key="A=test")
+
+        for bars in (pending, flushed):
+            assert [b.timestamp for b in bars] == [b.timestamp for b in self.bars]
+            assert [b.barCount for b in bars] == [0, 1, 2]
+            assert bars[0].volume == Decimal("1.5")
+            assert bars[0].close == 1.5
+
+    def test_flush_packs_keys_into_one_part_per_partition(self):
+        # Arrange
+        self.cache.set(key="A=1", value=self.bars)
+        self.cache.set(key="A=2", value=self.bars[:1])
+        self.cache.set(key="B=1", value=self.bars)
+
+        # Act
+        self.cache.flush()
+
+        # Assert
+        assert len(list((self.path / "parts" / "A").glob("*.parquet"))) == 1
+        assert len(list((self.path / "parts" / "B").glob("*.parquet"))) == 1
+        assert len(self.cache.get(key="A=2")) == 1
+
+    def test_flush_after_flush_rows(self):
+        cache = IndexedRequestsCache(path=self.path, flush_rows=5)
+
+        cache.set(key="A=1", value=self.bars)
+        assert not (self.path / "parts").exists()
+        cache.set(key="A=2", value=self.bars)
+
+        assert len(list((self.path / "parts" / "A").glob("*.parquet"))) == 1
+
+    def test_flush_after_flush_seconds(self):
+        # Arrange
+        clock = Mock(return_value=0)
+        cache = IndexedRequestsCache(path=self.path, flush_seconds=30, clock=clock)
+        cache.set(key="A=1", value=self.bars)
+
+        # Act
+        clock.return_value = 30
+        cache.set(key="A=2", value=self.bars)
+
+        # Assert
+        assert len(list((self.path / "parts" / "A").glob("*.parquet"))) == 1
+        assert cache._pending == {}
+
+    def test_compact_keeps_only_referenced_row_groups(self):
+        # Arrange
+        self.cache.set(key="A=1", value=self.bars)
+        self.cache.set(key="A=2", value=self.bars[:1])
+        self.cache.set(key="A=3", value=self.bars[:2])
+        self.cache.set(key="B=1", value=self.bars)
+        self.cache.flush()
+        self.cache.set(key="A=1", value=self.bars[:2])
+        self.cache.set(key="A=2", value=ClientException(code=162, message="test"))
+        self.cache.set(key="B=1", value=[])
+        self.cache.flush()
+
+        # Act
+        self.cache.compact()
+
+        # Assert
+        parts = list((self.path / "parts").rglob("*.parquet"))
+        assert len(parts) == 2
+        assert sum(pq.ParquetFile(p).num_row_groups for p in parts) == 2
+        assert len(self.cache.get(key="A=1")) == 2
+        assert len(self.cache.get(key="A=3")) == 2
+        assert self.cache.get(key="A=2") == ClientException(code=162, message="test")
+        assert self.cache.get(key="B=1") == []
+
+    def test_index_persists_after_close(self):
+        # Arrange
+        self.cache.set(key="A=1", value=self.bars)
+        self.cache.set(key="A=2", value=ClientException(code=162, message="test"))
+        self.cache.close()
+
+        # Act
+        cache = IndexedRequestsCache(path=self.path)
+
+        # Assert
+        assert len(cache) == 2
+        assert len(cache.get(key="A=1")) == 3
+        assert cache.get(key="A=2") == ClientException(code=162, message="test")
+
+    def test_len_counts_pending_once(self):
+        self.cache.set(key="A=1", value=self.bars)
+        self.cache.flush()
+        self.cache.set(key="A=1", value=self.bars)
+        self.cache.set(key="A=2", value=[])
+
+        assert len(self.cache) == 2
+
+    def test_empty_list_round_trip(self):
+        self.cache.set(key="test", value=[])
+        assert self.cache.get(key="test") == []
+        assert len(self.cache.get_columns(key="test")) == 0
+
+    def test_get_columns_from_part_file(self):
+        self.cache.set(key="A=1", value=self.bars)
+        self.cache.flush()
+
+        df = self.cache.get_columns(key="A=1").to_dataframe()
+
+        assert list(df.barCount) == [0, 1, 2]
+        assert list(df.timestamp) == [b.timestamp for b in self.bars]
+
+    def test_time_range(self):
+        self.cache.set(key="A=1", value=self.bars)
+
+        assert self.cache.time_range("A=1") == (
+            self.bars[0].timestamp,
+            self.bars[-1].timestamp,
+        )
+
+    def test_purge_errors_by_class(self):
+        # Arrange
+        self.cache.set(key="bars", value=self.bars)
+        self.cache.set(key="timeout", value=asyncio.TimeoutError())
+        self.cache.set(key="client", value=ClientException(code=123, message="test"))
+
+        # Act
+        self.cache.purge_errors(ClientException)
+
+        # Assert
+        assert "client" not in self.cache
+        assert isinstance(self.cache.get(key="timeout"), asyncio.TimeoutError)
+        assert "bars" in self.cache
+
+    def test_import_cache(self):
+        # Arrange
+        source = RequestsCache(path=Path(tempfile.mkdtemp()))
+        source.set(key="A=1", value=self.bars)
+        source.set(key="A=2", value=ClientException(code=123, message="test"))
+
+        # Act
+        self.cache.import_cache(source)
+
+        # Assert
+        assert len(self.cache) == 2
+        assert len(self.cache.get(key="A=1")) == 3
+        assert isinstance(self.cache.get(key="A=2"), ClientException)
+
+
+class TestBarRangeCache:
+    def setup_method(self):
+        self.path = Path(tempfile.mkdtemp())
+        self.cache = BarRangeCache(path=self.path)
+        self.key = "A"
+
+    @staticmethod
+    def bars(start: str, count: int) -> list[BarData]:
+        bars = []
+        for i in range(count):
+            bar = BarData()
+            bar.timestamp = pd.Timestamp(start, tz="UTC") + pd.Timedelta(minutes=i)
+            bar.date = int(bar.timestamp.timestamp())
+            bar.open = 1.0
+            bar.high = 2.0
+            bar.low = 0.5
+            bar.close = 1.5
+            bar.volume = Decimal("1")
+            bar.wap = Decimal("1")
+            bar.barCount = i
+            bars.append(bar)
+        return bars
+
+    def test_add_touching_interval_writes_own_chunk(self):
+        # Arrange
+        t0 = pd.Timestamp("2023-01-03 00:00", tz="UTC")
+        t1 = pd.Timestamp("2023-01-03 00:10", tz="UTC")
+        t2 = pd.Timestamp("2023-01-03 00:20", tz="UTC")
+        self.cache.add(self.key, t0, t1, self.bars("2023-01-03 00:00", 10))
+
+        # Act
+        self.cache.add(self.key, t1, t2, self.bars("2023-01-03 00:10", 10))
+
+        # Assert
+        assert self.cache.intervals(self.key) == [(t0, t1), (t1, t2)]
+        assert len(list((self.path / self.key).glob("*.parquet"))) == 2
+        assert self.cache.gaps(self.key, t0, t2) == []
+        bars = self.cache.get(self.key, t0 + pd.Timedelta(minutes=5), t2)
+        assert len(bars) == 15
+
+    def test_add_overlapping_interval_merges_chunks(self):
+        # Arrange
+        t0 = pd.Timestamp("2023-01-03 00:00", tz="UTC")
+        t1 = pd.Timestamp("2023-01-03 00:10", tz="UTC")
+        t2 = pd.Timestamp("2023-01-03 00:20", tz="UTC")
+        self.cache.add(self.key, t0, t1, self.bars("2023-01-03 00:00", 10))
+
+        # Act
+        self.cache.add(
+            self.key,
+            t0 + pd.Timedelta(minutes=5),
+            t2,
+            self.bars("2023-01-03 00:05", 15),
+        )
+
+        # Assert
+        assert self.cache.intervals(self.key) == [(t0, t2)]
+        assert len(self.cache.get(self.key, t0, t2)) == 20
+
+
 class TestRequestsCachedFunc:
     def setup_method(self):
         bar = BarData()
@@ -160,6 +439,26 @@ class TestRequestsCachedFunc:
         key = self.cached_func._cache.build_key(**self.cached_func_kwargs)
         assert self.cached_func._cache.get(key) is not None
 
+    @pytest.mark.asyncio()
+    async def test_columnar_call_returns_cached_columns(self):
+        # Arrange
+        self.cached_func._cache.set(
+            key=self.cached_func._cache.build_key(**self.cached_func_kwargs),
+            value=[self.bar],
+        )
+        func = Mock()
+        cached_func = CachedFunc(
+            func=func, cache=self.cached_func._cache, columnar=True
+        )
+
+        # Act
+        columns = await cached_func(**self.cached_func_kwargs)
+
+        # Assert
+        func.assert_not_called()
+        assert isinstance(columns, BarColumns)
+        assert columns.to_dataframe().timestamp.iloc[0] == self.bar.timestamp
+
     @pytest.mark.asyncio()
     async def test_is_cached(self):
         await self.cached_func(**self.cached_func_kwargs)
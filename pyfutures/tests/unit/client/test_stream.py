@@ -0,0 +1,192 @@
+import asyncio
+from decimal import Decimal
+from unittest.mock import Mock
+
+import pandas as pd
+import pytest
+from ibapi.common import HistoricalTickBidAsk
+from ibapi.common import TickAttribBidAsk
+from ibapi.contract import Contract as IBContract
+
+from pyfutures.client.objects import ClientException
+from pyfutures.client.objects import StreamOverflow
+from pyfutures.client.stream import StreamBuffer
+from pyfutures.tests.unit.client.stubs import ClientStubs
+
+
+class TestStreamBuffer:
+    def setup_method(self):
+        self.buffer = StreamBuffer(max_batches=4)
+
+    @pytest.mark.asyncio()
+    async def test_get_returns_batches_in_order(self):
+        # Arrange
+        self.buffer.extend([1, 2])
+        self.buffer.extend([3])
+        self.buffer.close()
+
+        # Act
+        batches = [await self.buffer.get() for _ in range(3)]
+
+        # Assert
+        assert batches == [[1, 2], [3], None]
+
+    @pytest.mark.asyncio()
+    async def test_get_waits_for_extend(self):
+        # Arrange
+        asyncio.get_running_loop().call_soon(self.buffer.extend, [1])
+
+        # Act
+        batch = await self.buffer.get()
+
+        # Assert
+        assert batch == [1]
+
+    def test_extend_empty_batch_is_ignored(self):
+        self.buffer.extend([])
+        assert len(self.buffer) == 0
+
+    @pytest.mark.asyncio()
+    async def test_extend_full_buffer_overflows(self):
+        # Arrange
+        for i in range(4):
+            self.buffer.extend([i])
+        assert not self.buffer.overflowed
+
+        # Act
+        self.buffer.extend([4])
+        self.buffer.extend([5])
+
+        # Assert
+        assert self.buffer.overflowed
+        assert len(self.buffer) == 0
+        assert await self.buffer.get() is None
+
+    @pytest.mark.asyncio()
+    async def test_extend_below_max_batches_after_get(self):
+        for i in range(4):
+            self.buffer.extend([i])
+
+        await self.buffer.get()
+        self.buffer.extend([4])
+
+        assert not self.buffer.overflowed
+        assert len(self.buffer) == 4
+
+
+class TestClientStream:
+    def setup_method(self):
+        self.client = ClientStubs.client()
+        self.contract = IBContract()
+
+    @pytest.mark.asyncio()
+    async def test_stream_quote_ticks_yields_each_message(self):
+        # Arrange
+        def send_mocked_response(reqId, **kwargs):
+            loop = asyncio.get_running_loop()
+            loop.call_soon(
+                self.client.historicalTicksBidAsk, reqId, [self._tick(1)], False
+            )
+            loop.call_soon(
+                self.client.historicalTicksBidAsk,
+                reqId,
+                [self._tick(2), self._tick(3)],
+                True,
+            )
+
+        self.client._eclient.reqHistoricalTicks = Mock(side_effect=send_mocked_response)
+
+        # Act
+        batches = [
+            batch
+            async for batch in self.client.stream_quote_ticks(
+                contract=self.contract,
+                start_time=None,
+                end_time=pd.Timestamp("2023-01-01", tz="UTC"),
+            )
+        ]
+
+        # Assert
+        assert [[t.time for t in batch] for batch in batches] == [[1], [2, 3]]
+        assert self.client._requests == {}
+        sent = self.client._eclient.reqHistoricalTicks.call_args[1]
+        assert sent["startDateTime"] == ""
+        assert sent["whatToShow"] == "BID_ASK"
+
+    @pytest.mark.asyncio()
+    async def test_stream_quote_ticks_raises_client_exception(self):
+        # Arrange
+        def send_mocked_response(reqId, **kwargs):
+            asyncio.get_running_loop().call_soon(
+                self.client.error, reqId, 162, "HMDS query returned no data"
+            )
+
+        self.client._eclient.reqHistoricalTicks = Mock(side_effect=send_mocked_response)
+
+        # Act & Assert
+        with pytest.raises(ClientException):
+            async for _ in self.client.stream_quote_ticks(
+                contract=self.contract,
+                start_time=None,
+                end_time=pd.Timestamp("2023-01-01", tz="UTC"),
+            ):
+                pass
+
+        assert self.client._requests == {}
+
+    @pytest.mark.asyncio()
+    async def test_stream_removes_request_when_consumer_stops_early(self):
+        # Arrange
+        def send_mocked_response(reqId, **kwargs):
+            loop = asyncio.get_running_loop()
+            loop.call_soon(
+                self.client.historicalTicksBidAsk, reqId, [self._tick(1)], False
+            )
+
+        self.client._eclient.reqHistoricalTicks = Mock(side_effect=send_mocked_response)
+        stream = self.client.stream_quote_ticks(
+            contract=self.contract,
+            start_time=None,
+            end_time=pd.Timestamp("2023-01-01", tz="UTC"),
+        )
+
+        # Act
+        async for _ in stream:
+            break
+        await stream.aclose()
+
+        # Assert
+        assert self.client._requests == {}
+        assert self.client.metrics.in_flight["quote_ticks"] == 0
+
+    @pytest.mark.asyncio()
+    async def test_stream_raises_stream_overflow_for_slow_consumer(self):
+        # Arrange
+        def send_mocked_response(reqId, **kwargs):
+            for i in range(3):
+                self.client.historicalTicksBidAsk(reqId, [self._tick(i)], False)
+
+        self.client._eclient.reqHistoricalTicks = Mock(side_effect=send_mocked_response)
+
+        # Act & Assert
+        with pytest.raises(StreamOverflow):
+            async for _ in self.client.stream_quote_ticks(
+                contract=self.contract,
+                start_time=None,
+                end_time=pd.Timestamp("2023-01-01", tz="UTC"),
+                max_batches=2,
+            ):
+                pass
+
+        assert self.client._requests == {}
+
+    @staticmethod
+    def _tick(time: int) -> HistoricalTickBidAsk:
+        tick = HistoricalTickBidAsk()
+        tick.time = time
+        tick.tickAttribBidAsk = TickAttribBidAsk()
+        tick.priceBid = 1.0
+        tick.priceAsk = 1.1
+        tick.sizeBid = Decimal("1")
+        tick.sizeAsk = Decimal("1")
+        return tick
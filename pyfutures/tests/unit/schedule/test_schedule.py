@@ -68,6 +68,34 @@ def test_from_detail():
     assert schedule.data.loc[2].close == datetime.time(23, 59)
 
 
+def test_is_open_between():
+    schedule = MarketSchedule(
+        name="test",
+        data=pd.DataFrame(
+            {
+                "dayofweek": [0, 4],
+                "open": [time(8, 30), time(8, 30)],
+                "close": [time(16, 0), time(16, 0)],
+            }
+        ),
+        timezone=pytz.timezone("US/Central"),
+    )
+
+    # Friday 2024-03-15 session is 13:30 -> 21:00 UTC
+    assert schedule.is_open_between(
+        pd.Timestamp("2024-03-15 20:00", tz="UTC"),
+        pd.Timestamp("2024-03-16 00:00", tz="UTC"),
+    )
+    assert not schedule.is_open_between(
+        pd.Timestamp("2024-03-15 21:00", tz="UTC"),
+        pd.Timestamp("2024-03-18 13:30", tz="UTC"),
+    )
+    assert schedule.is_open_between(
+        pd.Timestamp("2024-03-15 21:00", tz="UTC"),
+        pd.Timestamp("2024-03-18 13:31", tz="UTC"),
+    )
+
+
 def test_parse_detail_range():
     ib_range = "20240314:1700-20240315:1355"
     sc_ranges = MarketSchedule._parse_detail_range(ib_range)